@@ -0,0 +1,217 @@
+"""In-memory group availability engine.
+
+Availability is worked out in Python from (user_id, start, end) busy
+intervals, which come from the busy index (see busy_index.py), so the number
+of database round trips does not depend on group size or on how many weeks
+are requested.
+
+Zero-length events (reminders, deadlines) are points in time. A point
+blocks any window that contains it strictly inside, and leaves free the
+windows that start or end on it, just as an event ending or starting there
+would. Every function below follows that rule.
+"""
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+def requested_dates(days_of_week, weeks_ahead, today):
+    """Dates in the next `weeks_ahead` weeks that fall on one of `days_of_week` (0=Sunday)"""
+    dates = []
+    for days_ahead in range(7 * weeks_ahead):
+        check_date = today + timedelta(days=days_ahead)
+        # weekday() is 0=Monday, convert to our format (0=Sunday, 1=Monday, etc.)
+        if (check_date.weekday() + 1) % 7 in days_of_week:
+            dates.append(check_date)
+    return dates
+
+
+def daily_windows(dates, start_time, end_time):
+    """Build sorted (date_str, window_start, window_end) tuples from HH:MM bounds"""
+    start_t = datetime.strptime(start_time, '%H:%M').time()
+    end_t = datetime.strptime(end_time, '%H:%M').time()
+    return [
+        (d.strftime('%Y-%m-%d'), datetime.combine(d, start_t), datetime.combine(d, end_t))
+        for d in sorted(dates)
+    ]
+
+
+def busy_members_by_window(events, windows):
+    """Map each window key to the set of user ids with a conflicting event.
+
+    An event conflicts with a window when the two overlap, and a zero-length
+    event when it falls strictly inside the window. Windows are sorted and
+    disjoint, so each event only visits the windows it touches.
+    """
+    window_ends = [w[2] for w in windows]
+    busy = defaultdict(set)
+    for user_id, start, end in events:
+        if start == end:
+            i = bisect_right(window_ends, start)
+            if i < len(windows) and windows[i][1] < start:
+                busy[windows[i][0]].add(user_id)
+            continue
+
+        i = bisect_right(window_ends, start)
+        while i < len(windows) and windows[i][1] < end:
+            busy[windows[i][0]].add(user_id)
+            i += 1
+    return busy
+
+
+def merge_intervals(intervals):
+    """Coalesce overlapping or touching (start, end) intervals into a sorted list"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def best_meeting_slots(events, member_ids, windows, duration, limit):
+    """Top `limit` meeting windows ranked by free members, then earliest start.
+
+    Each member's busy time is merged and inverted into free gaps per day
+    window, keeping only gaps of at least `duration`. The best windows start
+    where some attendee's gap starts: a window can slide earlier until it
+    meets the latest gap start among its attendees without losing anyone. So
+    the sweep visits each gap start, counts the members whose gap lasts until
+    start + duration, and keeps (count, start) in a heap bounded at `limit`
+    entries; the cost follows the number of events rather than the number of
+    slots. A window's end is the earliest end among its attendees' gaps.
+    A zero-length event splits the gap it falls in two, so a meeting may end
+    or start on it but not span it.
+    """
+    window_ends = [w[2] for w in windows]
+    members = set(member_ids)
+    busy = defaultdict(lambda: defaultdict(list))
+    for user_id, start, end in events:
+        if end < start or user_id not in members:
+            continue
+        i = bisect_right(window_ends, start)
+        while i < len(windows) and windows[i][1] < end:
+            _, win_start, win_end = windows[i]
+            busy[i][user_id].append((max(start, win_start), min(end, win_end)))
+            i += 1
+
+    heap = []
+    gaps_by_window = []
+    for i, (_, win_start, win_end) in enumerate(windows):
+        gaps = []
+        for member_id in member_ids:
+            gap_start = win_start
+            for start, end in merge_intervals(busy[i].get(member_id, ())):
+                if start - gap_start >= duration:
+                    gaps.append((gap_start, start, member_id))
+                gap_start = max(gap_start, end)
+            if win_end - gap_start >= duration:
+                gaps.append((gap_start, win_end, member_id))
+        gaps.sort()
+        gaps_by_window.append(gaps)
+
+        # Ends of every gap opened so far; a member's gaps never overlap, so
+        # those ending at or after point + duration are one per free member
+        open_ends = []
+        j = 0
+        while j < len(gaps):
+            point = gaps[j][0]
+            while j < len(gaps) and gaps[j][0] == point:
+                insort(open_ends, gaps[j][1])
+                j += 1
+            available = len(open_ends) - bisect_left(open_ends, point + duration)
+            entry = (available, -point.timestamp(), i, point)
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+    slots = []
+    for _, _, i, slot_start in sorted(heap, reverse=True):
+        attending = [
+            (gap_end, member_id) for gap_start, gap_end, member_id in gaps_by_window[i]
+            if gap_start <= slot_start and gap_end >= slot_start + duration
+        ]
+        slots.append({
+            "start": slot_start,
+            "end": min(attending)[0],
+            "member_ids": sorted(member_id for _, member_id in attending),
+            "available_count": len(attending),
+        })
+    return slots
+
+
+def calculate_continuous_availability(events, member_ids, dates, start_time, end_time, min_hours, slot_minutes=15):
+    """Most members free for an unbroken `min_hours` block, per requested date.
+
+    Every requested date is handled in one batch: events are painted onto a
+    (day, member, slot) busy matrix through a difference array, and a sliding
+    window over its cumulative sum gives the free members for every candidate
+    block at once. Events are placed by their full datetimes, so events that
+    cross midnight block the following day too. A zero-length event inside a
+    slot makes that slot busy; one on the boundary between two slots is
+    counted separately and only blocks the blocks that span that boundary.
+    """
+    windows = daily_windows(dates, start_time, end_time)
+    keys = [w[0] for w in windows]
+    if not windows:
+        return {}
+
+    slot = slot_minutes * 60
+    window_length = (windows[0][2] - windows[0][1]).total_seconds()
+    n_slots = max(0, int(-(-window_length // slot)))
+    required = int(min_hours * 60 // slot_minutes)
+
+    if not member_ids or n_slots < required:
+        return {key: 0 for key in keys}
+
+    # The slot grid may run past end_time when the window is not a whole number of slots
+    grid_starts = [w[1] for w in windows]
+    grid_ends = [w[1] + timedelta(seconds=n_slots * slot) for w in windows]
+    member_index = {m: i for i, m in enumerate(member_ids)}
+    rows = []
+    for user_id, start, end in events:
+        if user_id not in member_index:
+            continue
+        i = bisect_right(grid_ends, start)
+        while i < len(windows) and grid_starts[i] <= end:
+            rows.append((
+                i, member_index[user_id],
+                int((start - grid_starts[i]).total_seconds()),
+                int((end - grid_starts[i]).total_seconds())
+            ))
+            i += 1
+
+    shape = (len(keys), len(member_ids), n_slots)
+    # Zero-length events on slot boundary k, for k in 0..n_slots
+    boundary_points = np.zeros(shape[:2] + (n_slots + 1,), dtype=np.int16)
+    if rows:
+        day, member, ev_start, ev_end = np.array(rows, dtype=np.int64).T
+        # A slot is busy when it overlaps the event: [first, last) slot indexes
+        first = np.clip(ev_start // slot, 0, n_slots)
+        last = np.clip(-(-ev_end // slot), 0, n_slots)
+        keep = first < last
+        diff = np.zeros(shape[:2] + (n_slots + 1,), dtype=np.int16)
+        np.add.at(diff, (day[keep], member[keep], first[keep]), 1)
+        np.add.at(diff, (day[keep], member[keep], last[keep]), -1)
+        busy = np.cumsum(diff[..., :n_slots], axis=2, dtype=np.int16) > 0
+        on_boundary = (ev_start == ev_end) & (ev_start % slot == 0) & (ev_start <= n_slots * slot)
+        np.add.at(boundary_points, (day[on_boundary], member[on_boundary], ev_start[on_boundary] // slot), 1)
+    else:
+        busy = np.zeros(shape, dtype=bool)
+
+    # Busy slots inside each block of `required` slots, for every member and start slot
+    busy_runs = np.zeros(shape[:2] + (n_slots + 1,), dtype=np.int16)
+    np.cumsum(busy, axis=2, dtype=np.int16, out=busy_runs[..., 1:])
+    busy_in_block = busy_runs[..., required:] - busy_runs[..., :n_slots + 1 - required]
+    # Plus points on the boundaries strictly inside the block starting at slot j: j+1 .. j+required-1
+    point_runs = np.cumsum(boundary_points, axis=2, dtype=np.int16)
+    busy_in_block += point_runs[..., required - 1:n_slots] - point_runs[..., :n_slots + 1 - required]
+    free_members = (busy_in_block == 0).sum(axis=1)
+
+    return {key: int(best) for key, best in zip(keys, free_members.max(axis=1))}
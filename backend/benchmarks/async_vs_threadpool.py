@@ -0,0 +1,142 @@
+"""Throughput and tail latency of async vs threadpool handlers under load.
+
+Serves the same read query through two minimal apps, one with a plain `def`
+handler on the blocking pool (runs in Starlette's threadpool) and one with an
+`async def` handler on the aiomysql pool, and drives each with N concurrent
+clients over an in-process ASGI transport.
+
+    # against the MySQL configured in backend/.env
+    python benchmarks/async_vs_threadpool.py --clients 500 --requests 20000
+
+    # without a database: the query is replaced by a fixed delay
+    python benchmarks/async_vs_threadpool.py --simulated-latency-ms 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+from dotenv import load_dotenv
+from fastapi import FastAPI
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+
+from db import AsyncConnectionPool, ConnectionPool  # noqa: E402
+
+QUERY = "SELECT id, title, start, end_time FROM events ORDER BY id LIMIT 50"
+
+
+def connect_args(async_driver):
+    args = {
+        "host": os.getenv("DB_HOST"),
+        "port": int(os.getenv("DB_PORT") or 3306),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+    }
+    args["db" if async_driver else "database"] = os.getenv("DB_NAME")
+    return args
+
+
+def threadpool_app(pool_size, latency):
+    app = FastAPI()
+    pool = None if latency else ConnectionPool(size=pool_size, timeout=60, **connect_args(False))
+
+    @app.get("/events")
+    def events():
+        if latency:
+            time.sleep(latency)
+            return []
+        db = pool.get_connection()
+        cursor = db.cursor(dictionary=True)
+        try:
+            cursor.execute(QUERY)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            db.close()
+
+    return app, pool
+
+
+def async_app(pool_size, latency):
+    app = FastAPI()
+    pool = None if latency else AsyncConnectionPool(size=pool_size, timeout=60, **connect_args(True))
+
+    @app.get("/events")
+    async def events():
+        if latency:
+            await asyncio.sleep(latency)
+            return []
+        import aiomysql
+        conn = await pool.acquire()
+        try:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(QUERY)
+                return await cursor.fetchall()
+        finally:
+            pool.release(conn)
+
+    return app, pool
+
+
+async def drive(app, clients, total):
+    latencies = []
+    remaining = iter(range(total))
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get("/events")
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "throughput_rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def run(model, args):
+    latency = args.simulated_latency_ms / 1000 if args.simulated_latency_ms else 0
+    app, pool = (async_app if model == "async" else threadpool_app)(args.pool_size, latency)
+    if isinstance(pool, AsyncConnectionPool):
+        await pool.start()
+    try:
+        return await drive(app, args.clients, args.requests)
+    finally:
+        if isinstance(pool, AsyncConnectionPool):
+            await pool.close()
+        elif pool is not None:
+            pool.close_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--pool-size", type=int, default=20)
+    parser.add_argument("--simulated-latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients, {args.requests} requests, pool size {args.pool_size}")
+    print(f"{'model':<12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for model in ("threadpool", "async"):
+        result = asyncio.run(run(model, args))
+        print(f"{model:<12}{result['throughput_rps']:>10.0f}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
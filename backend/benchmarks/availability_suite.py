@@ -0,0 +1,214 @@
+"""Availability engine and event list benchmark suite
+
+Times the availability engine functions directly, and the availability and
+event list endpoints end to end (routing, SQL, serialization) against the
+SQLite stand-in from standin_db.py, on datasets from synthetic.py. Results
+are written as JSON; pass an earlier file to --compare to flag regressions.
+
+    python benchmarks/availability_suite.py                      # quick profile
+    python benchmarks/availability_suite.py --profile full --output full.json
+    python benchmarks/availability_suite.py --compare benchmarks/results/base.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import main  # noqa: E402
+import standin_db  # noqa: E402
+from availability import (  # noqa: E402
+    best_meeting_slots, busy_members_by_window, calculate_continuous_availability,
+    daily_windows, requested_dates
+)
+from synthetic import event_intervals, generate_group  # noqa: E402
+
+PROFILES = {
+    "quick": {"group_sizes": [5, 25, 100], "events_per_week": [0, 10, 50], "weeks": [1, 4, 12]},
+    "full": {"group_sizes": [5, 25, 100, 1000], "events_per_week": [0, 5, 20, 50], "weeks": [1, 4, 12, 52]},
+}
+WEEKDAYS = [1, 2, 3, 4, 5]
+START_TIME, END_TIME = "09:00", "17:00"
+
+
+def timed(fn, repeat):
+    """Run fn `repeat` times; return per-run milliseconds"""
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - started) * 1000)
+    return runs
+
+
+def summarize(name, params, runs):
+    return {
+        "name": name,
+        "params": params,
+        "runs": len(runs),
+        "ms_min": round(min(runs), 3),
+        "ms_median": round(statistics.median(runs), 3),
+    }
+
+
+def engine_cases(size, rate, weeks, start, repeat, seed):
+    dataset = generate_group(size, rate, weeks, start, seed)
+    events = event_intervals(dataset["events"]())
+    member_ids = [m["user_id"] for m in dataset["members"]]
+    dates = requested_dates(WEEKDAYS, weeks, start)
+    windows = daily_windows(dates, START_TIME, END_TIME)
+    params = {"group_size": size, "events_per_week": rate, "weeks": weeks, "events": len(events)}
+
+    yield summarize("engine.window_counts", params, timed(
+        lambda: busy_members_by_window(events, windows), repeat))
+    yield summarize("engine.continuous", params, timed(
+        lambda: calculate_continuous_availability(events, member_ids, dates, START_TIME, END_TIME, 2), repeat))
+    yield summarize("engine.best_slots", params, timed(
+        lambda: best_meeting_slots(events, member_ids, windows, timedelta(hours=1), 10), repeat))
+
+
+async def endpoint_cases(size, rate, weeks, start, repeat, seed):
+    db = standin_db.StandInDatabase()
+    dataset = generate_group(size, rate, weeks, start, seed)
+    db.load(dataset)
+    standin_db.install(main, db)
+    member_id = dataset["members"][0]["user_id"]
+    group_id = dataset["group"]["id"]
+    main.app.dependency_overrides[main.get_current_user] = lambda: member_id
+    params = {"group_size": size, "events_per_week": rate, "weeks": weeks}
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def timed_requests(method, path, body=None, before=None, **kwargs):
+            runs = []
+            for _ in range(repeat):
+                if before:
+                    before()
+                started = time.perf_counter()
+                response = await client.request(method, path, json=body, **kwargs)
+                runs.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            return runs
+
+        for hours in (None, 2):
+            body = {
+                "start_time": START_TIME, "end_time": END_TIME, "days_of_week": WEEKDAYS,
+                "weeks_ahead": weeks, "min_continuous_hours": hours,
+            }
+            mode = "continuous" if hours else "any_time"
+            yield summarize(f"endpoint.availability.{mode}.cold", params, await timed_requests(
+                "POST", f"/groups/{group_id}/availability", body, before=lambda: standin_db.reset_caches(main)))
+            # Busy index already loaded, availability computed afresh
+            yield summarize(f"endpoint.availability.{mode}.indexed", params, await timed_requests(
+                "POST", f"/groups/{group_id}/availability", body,
+                before=lambda: main.availability_cache.__init__(main.availability_cache.max_size)))
+            yield summarize(f"endpoint.availability.{mode}.warm", params, await timed_requests(
+                "POST", f"/groups/{group_id}/availability", body))
+
+        window_start = datetime.combine(start, datetime.min.time())
+        window = {"from": window_start.isoformat(), "to": (window_start + timedelta(weeks=weeks)).isoformat()}
+        yield summarize("endpoint.events", params, await timed_requests("GET", "/events", params=window))
+        yield summarize("endpoint.group_events", params, await timed_requests(
+            "GET", f"/groups/{group_id}/events", params=window))
+
+    main.app.dependency_overrides.clear()
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print median ratios against a baseline file; return the regressed cases"""
+    with open(baseline_path) as f:
+        baseline = {
+            (r["name"], json.dumps(r["params"], sort_keys=True)): r
+            for r in json.load(f)["results"]
+        }
+    regressions = []
+    print(f"\n{'case':<48}{'base ms':>10}{'now ms':>10}{'ratio':>8}")
+    for result in results:
+        key = (result["name"], json.dumps(result["params"], sort_keys=True))
+        if key not in baseline:
+            continue
+        before, now = baseline[key]["ms_median"], result["ms_median"]
+        ratio = now / before if before else float("inf")
+        flag = "  REGRESSION" if ratio > threshold and now - before > 1 else ""
+        label = f"{result['name']} {'/'.join(str(v) for v in result['params'].values())}"
+        print(f"{label:<48}{before:>10.2f}{now:>10.2f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(result)
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profile", choices=PROFILES, default="quick")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-events", type=int, default=1_000_000,
+                        help="skip cases whose dataset would exceed this many events")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="median slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    # Availability is computed from today, so lay the data out from today too
+    start = date.today()
+    results = []
+
+    for size in profile["group_sizes"]:
+        for rate in profile["events_per_week"]:
+            for weeks in profile["weeks"]:
+                if size * rate * weeks > args.max_events:
+                    continue
+                print(f"group_size={size} events_per_week={rate} weeks={weeks}", flush=True)
+                results.extend(engine_cases(size, rate, weeks, start, args.repeat, args.seed))
+
+                async def collect():
+                    return [r async for r in endpoint_cases(size, rate, weeks, start, args.repeat, args.seed)]
+                results.extend(asyncio.run(collect()))
+
+    output = args.output or os.path.join(
+        BENCH_DIR, "results", f"availability-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "profile": args.profile,
+                "seed": args.seed,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"\nWrote {len(results)} results to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,88 @@
+"""Payload size and encoding time of event lists, before and after the fast path
+
+Compares FastAPI's default handling (validate against response_model, then
+jsonable_encoder + json.dumps) with the orjson path used by
+serialization.json_response, and the cost and effect of compressing the
+result. Needs no database.
+
+    python benchmarks/bench_serialization.py --rows 5000
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import brotli
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import EventOut  # noqa: E402
+from serialization import BROTLI_QUALITY, GZIP_LEVEL  # noqa: E402
+
+TITLES = ["Standup", "Lecture", "Gym", "Dentist", "Team sync", "Lunch with Sam", "Study group"]
+LOCATIONS = ["", "Room 101", "Library", "Zoom", "Campus Center"]
+
+
+def synthetic_rows(count, seed=1):
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 5, 8)
+    rows = []
+    for i in range(count):
+        event_start = start + timedelta(minutes=15 * rng.randrange(0, 35000))
+        rows.append({
+            "id": i + 1,
+            "title": rng.choice(TITLES),
+            "start": event_start,
+            "end_time": event_start + timedelta(minutes=rng.choice([30, 60, 90])) if rng.random() > 0.1 else None,
+            "location": rng.choice(LOCATIONS),
+            "color": rng.choice(["#1a73e8", "#4285f4", "#e67c73"]),
+            "group_id": None,
+            "google_event_id": f"{rng.getrandbits(64):016x}" if rng.random() > 0.5 else None,
+        })
+    return rows
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    adapter = TypeAdapter(list[EventOut])
+
+    def default_path():
+        return json.dumps(jsonable_encoder(adapter.validate_python(rows)), ensure_ascii=False).encode()
+
+    before, before_ms = timed(default_path, args.repeat)
+    after, after_ms = timed(lambda: orjson.dumps(rows), args.repeat)
+    assert json.loads(before) == json.loads(after)
+    gzipped, gzip_ms = timed(lambda: gzip.compress(after, compresslevel=GZIP_LEVEL), args.repeat)
+    brotlied, brotli_ms = timed(lambda: brotli.compress(after, quality=BROTLI_QUALITY), args.repeat)
+
+    print(f"{args.rows} events")
+    print(f"{'path':<34}{'bytes':>10}{'ms':>9}")
+    print(f"{'response_model + json.dumps':<34}{len(before):>10}{before_ms:>9.2f}")
+    print(f"{'orjson':<34}{len(after):>10}{after_ms:>9.2f}")
+    print(f"{'orjson + gzip -' + str(GZIP_LEVEL):<34}{len(gzipped):>10}{after_ms + gzip_ms:>9.2f}")
+    print(f"{'orjson + brotli q' + str(BROTLI_QUALITY):<34}{len(brotlied):>10}{after_ms + brotli_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Local stand-in for the Google Calendar events.list API
+
+Serves GET /calendar/v3/calendars/primary/events on 127.0.0.1 the way the
+sync code uses it: pages of at most maxResults events, a nextSyncToken on
+the last page, and incremental responses for a syncToken. The caller is
+identified by its bearer token, "token-<user id>". Every response is
+delayed by `latency` seconds, and a share of incremental requests answer
+410 Gone, so the full-resync path gets exercised too.
+
+install() points google_sync at the server, so main's sync workers talk to
+it instead of googleapis.com.
+"""
+import json
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+EVENTS_PATH = "/calendar/v3/calendars/primary/events"
+
+
+class FakeGoogleCalendar:
+    """Threaded HTTP server with `events_per_user` deterministic events per user"""
+
+    def __init__(self, events_per_user=300, latency=0.08, changes_per_sync=3, gone_rate=0.02, seed=0):
+        self.events_per_user = events_per_user
+        self.latency = latency
+        self.changes_per_sync = changes_per_sync
+        self.gone_rate = gone_rate
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self.start = date.today()
+        self.requests = 0
+        self._versions = {}  # user id -> number of incremental syncs served
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start_serving(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-google", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def event(self, user_id, index, version=0):
+        rng = random.Random(f"{self.seed}:{user_id}:{index}")
+        start = datetime.combine(self.start, datetime.min.time()) + timedelta(
+            days=rng.randrange(56), hours=rng.randrange(7, 20), minutes=15 * rng.randrange(4))
+        return {
+            "id": f"g{user_id}x{index}",
+            "status": "confirmed",
+            "summary": f"Google event {index}" + (f" (v{version})" if version else ""),
+            "location": rng.choice(["", "Zoom", "Library"]),
+            "start": {"dateTime": start.isoformat() + "Z"},
+            "end": {"dateTime": (start + timedelta(minutes=rng.choice([30, 60, 90]))).isoformat() + "Z"},
+        }
+
+    def list_events(self, user_id, query):
+        """Return (status, body) for one events.list request"""
+        max_results = int(query.get("maxResults", ["250"])[0])
+        sync_token = query.get("syncToken", [None])[0]
+
+        with self._lock:
+            self.requests += 1
+            version = self._versions.get(user_id, 0)
+            if sync_token is not None:
+                if self._rng.random() < self.gone_rate:
+                    return 410, {"error": {"code": 410, "message": "Sync token is no longer valid"}}
+                version = self._versions[user_id] = version + 1
+
+        if sync_token is not None:
+            rng = random.Random(f"{self.seed}:{user_id}:sync:{version}")
+            changed = rng.sample(range(self.events_per_user), min(self.changes_per_sync, self.events_per_user))
+            items = [self.event(user_id, i, version) for i in changed]
+            if items and rng.random() < 0.3:
+                items[-1] = {"id": items[-1]["id"], "status": "cancelled"}
+            return 200, {"items": items, "nextSyncToken": f"sync-{user_id}-{version}"}
+
+        offset = int(query.get("pageToken", ["0"])[0])
+        end = min(offset + max_results, self.events_per_user)
+        body = {"items": [self.event(user_id, i) for i in range(offset, end)]}
+        if end < self.events_per_user:
+            body["nextPageToken"] = str(end)
+        else:
+            body["nextSyncToken"] = f"sync-{user_id}-{version}"
+        return 200, body
+
+    def _handler_class(self):
+        calendar = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                time.sleep(calendar.latency)
+                url = urlparse(self.path)
+                token = self.headers.get("Authorization", "").rpartition("token-")[2]
+                if url.path != EVENTS_PATH or not token.isdigit():
+                    status, body = 404, {"error": {"code": 404, "message": "Not found"}}
+                else:
+                    status, body = calendar.list_events(int(token), parse_qs(url.query))
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def install(google_sync, calendar):
+    """Make Calendar clients built by google_sync call `calendar` instead of Google"""
+    document = dict(google_sync.calendar_discovery_document())
+    document["rootUrl"] = calendar.url + "/"
+    document["baseUrl"] = calendar.url + "/calendar/v3/"
+    google_sync._discovery_document = document
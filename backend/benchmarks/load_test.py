@@ -0,0 +1,350 @@
+"""End-to-end load test with a production-like request mix, fully offline.
+
+Drives the real FastAPI app - auth, handlers, caches, sync workers - with
+`--concurrency` virtual users for `--duration` seconds, then reports
+throughput and p50/p95/p99 latency per route. The database is the SQLite
+stand-in from standin_db.py (with --db-latency-ms per statement standing in
+for the MySQL round trip), filled from synthetic.py, and Google Calendar is
+the local fake from fake_google.py. Nothing leaves the machine.
+
+The default mix is mostly event list reads, with availability queries,
+group lists, bursts of logins and the occasional Google sync. Virtual users
+send If-None-Match like the browser does, so unchanged reads get 304s.
+Logins are sent in bursts at the real bcrypt cost, so a heavy login share
+shows the hasher pool's 503 backpressure in the status breakdown.
+
+    python benchmarks/load_test.py                                  # 30 s, 50 users, in-process
+    python benchmarks/load_test.py --concurrency 200 --duration 120
+    python benchmarks/load_test.py --transport http                 # through uvicorn on localhost
+    python benchmarks/load_test.py --mix events=50,login=50 --output login-heavy.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_MIX = "events=40,group_events=30,availability=12,groups=8,login=6,sync=4"
+PASSWORD = "load-test-password"
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Fixture:
+    """The seeded world: users, their groups and tokens"""
+
+    def __init__(self, main, args):
+        import fake_google
+        import google_sync
+        import standin_db
+        from synthetic import generate_group
+
+        self.start = date.today()
+        self.weeks = args.weeks
+        self.db = standin_db.StandInDatabase(latency=args.db_latency_ms / 1000)
+        self.group_of = {}
+        self.members = defaultdict(list)
+        for group in range(args.groups):
+            first_user_id = group * args.group_size + 1
+            dataset = generate_group(
+                args.group_size, args.events_per_week, args.weeks, self.start,
+                seed=args.seed, first_user_id=first_user_id, group_id=group + 1
+            )
+            self.db.load(dataset)
+            for member in dataset["members"]:
+                self.group_of[member["user_id"]] = group + 1
+                self.members[group + 1].append(member["user_id"])
+        self.user_ids = sorted(self.group_of)
+
+        # One real hash at the app's work factor, so logins cost what they do in production
+        password_hash = asyncio.run(main.password_hasher.hash(PASSWORD))
+        rng = random.Random(args.seed)
+        self.google_user_ids = sorted(rng.sample(self.user_ids, int(len(self.user_ids) * args.google_users)))
+        with self.db.lock:
+            self.db.conn.execute("UPDATE users SET password = ?", (password_hash,))
+            self.db.conn.executemany(
+                "UPDATE users SET google_access_token = ?, google_refresh_token = ?, "
+                "google_calendar_connected = 1 WHERE id = ?",
+                [(f"token-{uid}", f"refresh-{uid}", uid) for uid in self.google_user_ids]
+            )
+            self.db.conn.commit()
+
+        standin_db.install(main, self.db)
+        self.google = fake_google.FakeGoogleCalendar(
+            latency=args.google_latency_ms / 1000, seed=args.seed
+        )
+        self.google.start_serving()
+        fake_google.install(google_sync, self.google)
+
+        self.tokens = {
+            uid: main.create_access_token({"user_id": uid, "email": f"user{uid}@example.com"}, timedelta(days=1))
+            for uid in self.user_ids
+        }
+
+
+class VirtualUser:
+    """One simulated browser: a signed-in user with its own ETag cache"""
+
+    def __init__(self, fixture, client, rng, login_burst):
+        self.fixture = fixture
+        self.client = client
+        self.rng = rng
+        self.login_burst = login_burst
+        self.etags = {}
+
+    def switch_user(self):
+        self.user_id = self.rng.choice(self.fixture.user_ids)
+        self.group_id = self.fixture.group_of[self.user_id]
+        self.headers = {"Authorization": f"Bearer {self.fixture.tokens[self.user_id]}"}
+        self.etags.clear()
+
+    def week_window(self):
+        week_start = datetime.combine(self.fixture.start, datetime.min.time()) + timedelta(
+            weeks=self.rng.randrange(self.fixture.weeks))
+        return {"from": week_start.isoformat(), "to": (week_start + timedelta(weeks=1)).isoformat()}
+
+    async def request(self, route, method, path, **kwargs):
+        """Send one request; return (route, status, seconds)"""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            response, status = None, f"error: {type(e).__name__}"
+        return (route, status, time.perf_counter() - started), response
+
+    async def get(self, route, path, params=None):
+        key = (path, tuple(sorted((params or {}).items())))
+        headers = dict(self.headers)
+        if key in self.etags:
+            headers["If-None-Match"] = self.etags[key]
+        sample, response = await self.request(route, "GET", path, params=params, headers=headers)
+        if response is not None and "etag" in response.headers:
+            self.etags[key] = response.headers["etag"]
+        return [sample]
+
+    async def events(self):
+        return await self.get("GET /events", "/events", self.week_window())
+
+    async def group_events(self):
+        return await self.get("GET /groups/{id}/events", f"/groups/{self.group_id}/events", self.week_window())
+
+    async def groups(self):
+        return await self.get("GET /groups", "/groups")
+
+    async def availability(self):
+        body = {
+            "start_time": self.rng.choice(["08:00", "09:00", "10:00"]),
+            "end_time": self.rng.choice(["16:00", "17:00", "18:00"]),
+            "days_of_week": sorted(self.rng.sample(range(7), self.rng.randint(1, 5))),
+            "weeks_ahead": self.rng.randint(1, min(4, self.fixture.weeks)),
+            "min_continuous_hours": self.rng.choice([None, None, 1, 2]),
+        }
+        sample, _ = await self.request(
+            "POST /groups/{id}/availability", "POST", f"/groups/{self.group_id}/availability",
+            json=body, headers=self.headers)
+        return [sample]
+
+    async def login(self):
+        # Logins come in bursts, e.g. everyone opening the app before a meeting
+        async def one():
+            uid = self.rng.choice(self.fixture.user_ids)
+            sample, _ = await self.request(
+                "POST /login", "POST", "/login", json={"username_or_email": f"user{uid}", "password": PASSWORD})
+            return sample
+        return list(await asyncio.gather(*(one() for _ in range(self.login_burst))))
+
+    async def sync(self):
+        if not self.fixture.google_user_ids:
+            return []
+        uid = self.rng.choice(self.fixture.google_user_ids)
+        sample, _ = await self.request(
+            "POST /auth/google/sync", "POST", "/auth/google/sync",
+            headers={"Authorization": f"Bearer {self.fixture.tokens[uid]}"})
+        return [sample]
+
+
+OPERATIONS = {
+    "events": VirtualUser.events,
+    "group_events": VirtualUser.group_events,
+    "groups": VirtualUser.groups,
+    "availability": VirtualUser.availability,
+    "login": VirtualUser.login,
+    "sync": VirtualUser.sync,
+}
+
+
+async def run_users(fixture, client, args, samples):
+    names, weights = zip(*args.mix.items())
+    deadline = time.monotonic() + args.duration
+
+    async def user_loop(index):
+        user = VirtualUser(fixture, client, random.Random(f"{args.seed}:{index}"), args.login_burst)
+        user.switch_user()
+        while time.monotonic() < deadline:
+            if user.rng.random() < 0.05:
+                user.switch_user()
+            operation = OPERATIONS[user.rng.choices(names, weights)[0]]
+            for route, status, elapsed in await operation(user):
+                samples[route].append((elapsed, status))
+            if args.think_ms:
+                await asyncio.sleep(user.rng.expovariate(1000 / args.think_ms))
+
+    await asyncio.gather(*(user_loop(i) for i in range(args.concurrency)))
+
+
+def start_http_server(main):
+    """Serve the app with uvicorn on a free localhost port, without lifespan events"""
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, lifespan="off", log_level="warning"))
+    thread = threading.Thread(target=server.run, name="uvicorn", daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def report(samples, duration):
+    rows = []
+    for route in sorted(samples):
+        latencies = sorted(elapsed * 1000 for elapsed, _ in samples[route])
+        statuses = defaultdict(int)
+        for _, status in samples[route]:
+            statuses[str(status)] += 1
+        errors = sum(n for status, n in statuses.items() if not status.startswith(("2", "3")))
+        rows.append({
+            "route": route,
+            "requests": len(latencies),
+            "errors": errors,
+            "rps": round(len(latencies) / duration, 1),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+            "statuses": dict(statuses),
+        })
+
+    print(f"\n{'route':<34}{'reqs':>8}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for row in rows:
+        print(f"{row['route']:<34}{row['requests']:>8}{row['errors']:>8}{row['rps']:>9}"
+              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}")
+    total = sum(row["requests"] for row in rows)
+    print(f"{'total':<34}{total:>8}{sum(row['errors'] for row in rows):>8}{round(total / duration, 1):>9}")
+    print("\nstatus codes:")
+    for row in rows:
+        print(f"  {row['route']:<32}" + "  ".join(f"{status}: {n}" for status, n in sorted(row["statuses"].items())))
+    return rows
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=50, help="virtual users")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"operation weights (default {DEFAULT_MIX})")
+    parser.add_argument("--login-burst", type=int, default=5, help="logins fired together per login operation")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a user's operations")
+    parser.add_argument("--transport", choices=["asgi", "http"], default="asgi",
+                        help="call the app in-process, or over HTTP through uvicorn")
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--group-size", type=int, default=10)
+    parser.add_argument("--events-per-week", type=int, default=20)
+    parser.add_argument("--weeks", type=int, default=8)
+    parser.add_argument("--google-users", type=float, default=0.3, help="share of users with Google connected")
+    parser.add_argument("--db-latency-ms", type=float, default=0.5, help="added to every SQL statement")
+    parser.add_argument("--google-latency-ms", type=float, default=80, help="fake Google response time")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+    if isinstance(args.mix, str):
+        args.mix = parse_mix(args.mix)
+
+    # Long enough for the JWT library not to warn on every token
+    os.environ.setdefault("SECRET_KEY", "load-test-secret-key-of-at-least-32-bytes")
+    import main
+
+    print(f"Seeding {args.groups} groups x {args.group_size} users, "
+          f"{args.events_per_week} events/user/week over {args.weeks} weeks", flush=True)
+    fixture = Fixture(main, args)
+    main.sync_jobs.start()
+
+    server = None
+    if args.transport == "http":
+        server, thread, base_url = start_http_server(main)
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency))
+    else:
+        base_url = "http://load-test"
+        transport = httpx.ASGITransport(app=main.app)
+
+    samples = defaultdict(list)
+    print(f"Running {args.concurrency} virtual users for {args.duration:g}s over {args.transport}", flush=True)
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+            started = time.perf_counter()
+            await run_users(fixture, client, args, samples)
+            return time.perf_counter() - started
+
+    try:
+        elapsed = asyncio.run(run())
+    finally:
+        main.sync_jobs.stop()
+        fixture.google.stop()
+        if server is not None:
+            server.should_exit = True
+            thread.join(5)
+        main.password_hasher.shutdown()
+
+    rows = report(samples, elapsed)
+    sync_stats = main.sync_jobs.stats()
+    print(f"\nsync jobs: {sync_stats}; fake Google requests: {fixture.google.requests}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "created_at": datetime.now().isoformat(timespec="seconds"),
+                    "duration_s": round(elapsed, 2),
+                    **{key: value for key, value in vars(args).items() if key != "output"},
+                },
+                "routes": rows,
+                "sync_jobs": sync_stats,
+                "google_requests": fixture.google.requests,
+            }, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
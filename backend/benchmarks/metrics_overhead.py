@@ -0,0 +1,94 @@
+"""Per-request cost of the /metrics instrumentation.
+
+Calls a minimal ASGI app directly (no server, no HTTP client) with and
+without MetricsMiddleware, and a no-op cursor with and without TimedCursor,
+so the difference is the instrumentation alone. The budget is 50 µs per
+request; a typical request adds the middleware once plus a few queries.
+
+    python benchmarks/metrics_overhead.py
+    python benchmarks/metrics_overhead.py --requests 200000 --queries 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from metrics import Metrics, MetricsMiddleware, TimedCursor  # noqa: E402
+from query_audit import QueryAuditor  # noqa: E402
+
+
+class Route:
+    path = "/groups/{group_id}/events"
+
+
+class NoopCursor:
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchall(self):
+        return []
+
+
+def make_app(queries, metrics):
+    cursor = TimedCursor(NoopCursor(), metrics) if metrics else NoopCursor()
+
+    async def app(scope, receive, send):
+        scope["route"] = Route
+        for _ in range(queries):
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    return MetricsMiddleware(app, metrics) if metrics else app
+
+
+async def per_request_us(app, requests):
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/groups/1/events"}
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=3, help="queries per simulated request")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    def best(metrics):
+        app = make_app(args.queries, metrics)
+        return min(asyncio.run(per_request_us(app, args.requests)) for _ in range(args.rounds))
+
+    bare = best(None)
+    # As deployed: auditing off, slow-query log on
+    instrumented = best(Metrics(auditor=QueryAuditor()))
+    overhead = instrumented - bare
+    print(f"{args.requests} requests x {args.queries} queries, best of {args.rounds}")
+    print(f"  bare          {bare:8.2f} µs/request")
+    print(f"  instrumented  {instrumented:8.2f} µs/request")
+    print(f"  overhead      {overhead:8.2f} µs/request ({'within' if overhead < 50 else 'OVER'} the 50 µs budget)")
+
+    metrics = Metrics()
+    for status in (200, 304, 404):
+        for route in range(40):
+            metrics.request_duration.observe(0.01, "GET", f"/route/{route}", str(status))
+    started = time.perf_counter()
+    text = metrics.render()
+    print(f"  render        {(time.perf_counter() - started) * 1000:8.2f} ms for {len(text.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""In-memory SQLite stand-in for the MySQL database
+
+Mirrors the tables and indexes of database/init.sql that the benchmarked
+paths use, and wraps SQLite in the two cursor shapes main.py expects:
+mysql-connector style for get_db_connection() and aiomysql style for
+get_async_db_cursor(). install() points main at it, so benchmarks exercise
+the real handlers and SQL without a MySQL server.
+
+All handles share one SQLite connection, serialised by a lock, so
+transactions are not isolated from each other. `latency` adds a fixed
+delay to every statement to stand in for the network round trip to MySQL.
+With `metrics`, cursors are wrapped like the pools' so queries are counted.
+"""
+import asyncio
+import re
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from metrics import AsyncTimedCursor, TimedCursor
+
+SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY,
+    username VARCHAR(255) NOT NULL UNIQUE,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    password VARCHAR(255) NOT NULL,
+    google_access_token TEXT,
+    google_refresh_token TEXT,
+    google_sync_token VARCHAR(255),
+    google_calendar_connected BOOLEAN DEFAULT FALSE,
+    events_version BIGINT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE group_list (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    join_key VARCHAR(8) UNIQUE,
+    creator_id INT NOT NULL,
+    calendar_version BIGINT NOT NULL DEFAULT 0,
+    info_version BIGINT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE group_members (
+    id INTEGER PRIMARY KEY,
+    group_id INT NOT NULL,
+    user_id INT NOT NULL,
+    is_admin BOOLEAN DEFAULT FALSE,
+    joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (group_id, user_id)
+);
+CREATE TABLE events (
+    id INTEGER PRIMARY KEY,
+    title VARCHAR(255) NOT NULL,
+    start DATETIME NOT NULL,
+    end_time DATETIME,
+    location VARCHAR(255),
+    color VARCHAR(7) DEFAULT '#1a73e8',
+    user_id INT NOT NULL,
+    group_id INT,
+    google_event_id VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_events_user_start_end ON events(user_id, start, end_time);
+CREATE INDEX idx_events_start ON events(start);
+CREATE UNIQUE INDEX uniq_user_google_event ON events(user_id, google_event_id);
+CREATE INDEX idx_group_members_group_id ON group_members(group_id);
+CREATE INDEX idx_group_members_user_id ON group_members(user_id);
+"""
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+for _type in ("DATETIME", "TIMESTAMP"):
+    sqlite3.register_converter(_type, lambda raw: datetime.fromisoformat(raw.decode()))
+
+
+# MySQL's "INSERT ... AS new ON DUPLICATE KEY UPDATE x = new.x" upsert
+_MYSQL_UPSERT = re.compile(r"\s+AS new\s+ON DUPLICATE KEY UPDATE", re.IGNORECASE)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+def to_sqlite(sql):
+    """Rewrite the MySQL dialect main.py and google_sync.py use into SQLite's"""
+    if _MYSQL_UPSERT.search(sql):
+        sql = _MYSQL_UPSERT.sub(" ON CONFLICT DO UPDATE SET", sql).replace("new.", "excluded.")
+    return sql.replace("%s", "?")
+
+
+class StandInCursor:
+    """mysql-connector dictionary cursor over SQLite"""
+
+    def __init__(self, db):
+        self._db = db
+        self._cursor = db.conn.cursor()
+        self._first_id = None
+
+    def execute(self, sql, params=()):
+        if self._db.latency:
+            time.sleep(self._db.latency)
+        with self._db.lock:
+            self._first_id = None
+            self._cursor.execute(to_sqlite(sql), tuple(params))
+
+    def executemany(self, sql, seq_params):
+        if self._db.latency:
+            time.sleep(self._db.latency)
+        with self._db.lock:
+            self._cursor.executemany(to_sqlite(sql), [tuple(p) for p in seq_params])
+            # MySQL reports the first id of a multi-row insert; SQLite reports none
+            rows = self._cursor.rowcount
+            self._first_id = None
+            if rows > 0 and sql.lstrip().upper().startswith("INSERT"):
+                self._first_id = self._db.conn.execute("SELECT last_insert_rowid() AS id").fetchone()["id"] - rows + 1
+
+    def fetchone(self):
+        with self._db.lock:
+            return self._cursor.fetchone()
+
+    def fetchall(self):
+        with self._db.lock:
+            return self._cursor.fetchall()
+
+    def fetchmany(self, size):
+        with self._db.lock:
+            return self._cursor.fetchmany(size)
+
+    @property
+    def lastrowid(self):
+        return self._first_id if self._first_id is not None else self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class AsyncStandInCursor(StandInCursor):
+    """aiomysql DictCursor over SQLite"""
+
+    async def execute(self, sql, params=()):
+        if self._db.latency:
+            await asyncio.sleep(self._db.latency)
+        with self._db.lock:
+            self._first_id = None
+            self._cursor.execute(to_sqlite(sql), tuple(params))
+
+    async def fetchone(self):
+        return super().fetchone()
+
+    async def fetchall(self):
+        return super().fetchall()
+
+
+class StandInDatabase:
+    """One shared in-memory database; connections are thin handles onto it"""
+
+    def __init__(self, latency=0.0, metrics=None):
+        self.latency = latency
+        self.metrics = metrics
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        self.conn.row_factory = _dict_row
+        self.conn.executescript(SCHEMA)
+
+    def load(self, dataset):
+        """Insert a dataset from synthetic.generate_group()
+
+        Event ids are left to the database, so several datasets (with
+        distinct user and group ids) can be loaded into one database.
+        """
+        def insert(table, rows, skip=()):
+            rows = iter(rows)
+            first = next(rows, None)
+            if first is None:
+                return
+            columns = [c for c in first if c not in skip]
+            sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            self.conn.execute(sql, [first[c] for c in columns])
+            self.conn.executemany(sql, ([row[c] for c in columns] for row in rows))
+
+        insert("users", dataset["users"])
+        insert("group_list", [dataset["group"]])
+        insert("group_members", dataset["members"])
+        insert("events", dataset["events"](), skip=("id",))
+        self.conn.commit()
+
+    # mysql-connector connection interface
+    def cursor(self, dictionary=False, buffered=True):
+        cursor = StandInCursor(self)
+        return TimedCursor(cursor, self.metrics) if self.metrics else cursor
+
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+
+    def rollback(self):
+        with self.lock:
+            self.conn.rollback()
+
+    def close(self):
+        pass
+
+    @asynccontextmanager
+    async def async_cursor(self):
+        cursor = AsyncStandInCursor(self)
+        try:
+            yield AsyncTimedCursor(cursor, self.metrics) if self.metrics else cursor
+        finally:
+            cursor.close()
+
+
+def install(main, db):
+    """Route main's database access to `db` and reset its in-process caches"""
+    main.get_db_connection = lambda: db
+    main.get_async_db_cursor = db.async_cursor
+    reset_caches(main)
+
+
+def reset_caches(main):
+    main.membership_cache = type(main.membership_cache)(main.membership_cache.max_size, main.membership_cache.ttl)
+    main.availability_cache = type(main.availability_cache)(main.availability_cache.max_size)
+    main.busy_index = type(main.busy_index)(main.busy_index.max_users)
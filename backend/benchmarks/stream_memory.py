@@ -0,0 +1,99 @@
+"""Peak RSS of buffered vs streamed group event feeds.
+
+Each case runs in a fresh interpreter that encodes N synthetic event rows,
+either the buffered way (fetchall + serialize the whole list) or through
+streaming.iter_json_array, and reports how much its peak RSS grew.
+
+    python benchmarks/stream_memory.py
+    python benchmarks/stream_memory.py --rows 10000,100000 --modes stream
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+class SyntheticCursor:
+    """Produces event rows on demand, like an unbuffered MySQL cursor"""
+
+    def __init__(self, total):
+        self.total = total
+        self.produced = 0
+        self.base = datetime(2025, 1, 1, 9, 0)
+
+    def _row(self, i):
+        start = self.base + timedelta(minutes=30 * i)
+        return {
+            "id": i + 1,
+            "title": f"Event {i}",
+            "start": start,
+            "end_time": start + timedelta(hours=1),
+            "location": "Room 101",
+            "color": "#4285f4",
+            "user_id": i % 50 + 1,
+            "group_id": None,
+            "google_event_id": f"g{i:012d}",
+            "created_at": self.base,
+            "creator_username": f"user{i % 50 + 1}",
+        }
+
+    def fetchmany(self, size):
+        end = min(self.produced + size, self.total)
+        rows = [self._row(i) for i in range(self.produced, end)]
+        self.produced = end
+        return rows
+
+    def fetchall(self):
+        return self.fetchmany(self.total - self.produced)
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_case(mode, rows):
+    from streaming import iter_json_array, _json_default
+
+    baseline = peak_rss_mb()
+    cursor = SyntheticCursor(rows)
+    sent = 0
+    if mode == "buffered":
+        body = json.dumps(cursor.fetchall(), default=_json_default)
+        sent = len(body)
+    else:
+        for chunk in iter_json_array(cursor):
+            sent += len(chunk)
+    print(json.dumps({"mode": mode, "rows": rows, "bytes": sent, "rss_growth_mb": round(peak_rss_mb() - baseline, 1)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10000,100000,1000000")
+    parser.add_argument("--modes", default="buffered,stream")
+    parser.add_argument("--case", nargs=2, metavar=("MODE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case[0], int(args.case[1]))
+        return
+
+    print(f"{'mode':<10}{'rows':>10}{'MB sent':>10}{'RSS growth MB':>16}")
+    for mode in args.modes.split(","):
+        for rows in args.rows.split(","):
+            out = subprocess.run(
+                [sys.executable, __file__, "--case", mode, rows],
+                capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(out)
+            print(f"{mode:<10}{result['rows']:>10}{result['bytes'] / 1e6:>10.1f}{result['rss_growth_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
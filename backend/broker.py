@@ -0,0 +1,151 @@
+"""Publish/subscribe of change notices for the /updates push stream
+
+Handlers publish small JSON-able notices to channels such as "user:7" or
+"group:3"; each open /updates connection holds one Subscription covering
+the channels its user cares about. InProcessBroker only reaches clients
+connected to this process - a shared backend (e.g. Redis pub/sub) can be
+added as another Broker implementing the same abstract methods.
+"""
+import asyncio
+import itertools
+import threading
+from abc import ABC, abstractmethod
+
+import orjson
+
+
+class Broker(ABC):
+    """Interface: fan notices out to subscriptions"""
+
+    @abstractmethod
+    def publish(self, channels, notice):
+        """Deliver `notice` once to every subscription listening on any of `channels`
+
+        Must be safe to call from any thread, with or without a running loop.
+        """
+
+    @abstractmethod
+    def subscribe(self, channels):
+        """Return a Subscription to `channels`, bound to the running event loop"""
+
+    @abstractmethod
+    def follow(self, subscription, channel):
+        """Start delivering `channel` to the subscription"""
+
+    @abstractmethod
+    def unfollow(self, subscription, channel):
+        """Stop delivering `channel` to the subscription"""
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        """Stop delivering anything to the subscription"""
+
+    @abstractmethod
+    def stats(self):
+        """JSON-able counters for the metrics endpoint"""
+
+
+class Subscription:
+    """Bounded queue of notices for one client
+
+    When the client falls more than `max_queued` notices behind, the backlog
+    is dropped and a single {"type": "resync"} notice takes its place.
+    """
+
+    def __init__(self, broker, channels, max_queued=100):
+        self._broker = broker
+        self.channels = set(channels)
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=max_queued)
+
+    def deliver(self, notice):
+        """Queue `notice` from any thread; raises RuntimeError once the loop is closed"""
+        self._loop.call_soon_threadsafe(self._deliver, notice)
+
+    def _deliver(self, notice):
+        # Runs on the subscription's own loop
+        if self._queue.full():
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            notice = {"type": "resync"}
+        self._queue.put_nowait(notice)
+
+    async def get(self):
+        return await self._queue.get()
+
+    def add(self, channel):
+        self._broker.follow(self, channel)
+
+    def remove(self, channel):
+        self._broker.unfollow(self, channel)
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+
+class InProcessBroker(Broker):
+    """Broker for subscribers connected to this process"""
+
+    def __init__(self, max_queued=100):
+        self.max_queued = max_queued
+        self._channels = {}  # channel -> set of subscriptions
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._published = 0
+
+    def publish(self, channels, notice):
+        notice = {"id": next(self._ids), **notice}
+        with self._lock:
+            self._published += 1
+            targets = set()
+            for channel in channels:
+                targets |= self._channels.get(channel, set())
+        for subscription in targets:
+            try:
+                subscription.deliver(notice)
+            except RuntimeError:
+                # The subscriber's loop is closed; it will never read again
+                self.unsubscribe(subscription)
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels, self.max_queued)
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def follow(self, subscription, channel):
+        with self._lock:
+            subscription.channels.add(channel)
+            self._channels.setdefault(channel, set()).add(subscription)
+
+    def unfollow(self, subscription, channel):
+        with self._lock:
+            subscription.channels.discard(channel)
+            self._drop(subscription, channel)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._drop(subscription, channel)
+
+    def _drop(self, subscription, channel):
+        subscribers = self._channels.get(channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[channel]
+
+    def stats(self):
+        with self._lock:
+            subscriptions = set().union(*self._channels.values()) if self._channels else set()
+            return {
+                "channels": len(self._channels),
+                "subscriptions": len(subscriptions),
+                "published": self._published,
+            }
+
+
+def encode_sse(notice):
+    """One Server-Sent Events message carrying the notice"""
+    return f"event: {notice['type']}\ndata: {orjson.dumps(notice).decode()}\n\n"
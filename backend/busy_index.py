@@ -0,0 +1,189 @@
+"""Materialized per-user busy intervals
+
+Each user's events are kept pre-merged as sorted epoch-minute arrays: the
+overlapping and touching events coalesced into disjoint [start, end)
+intervals, plus the zero-length events as separate points. A group's busy
+time is then a k-way merge of its members' arrays instead of an events query.
+
+Each entry remembers the users.events_version it was built from, and
+callers pass the versions they just read from the database, so an entry is
+reloaded as soon as any process changes that user's events. Events inserted
+by this process are merged into the entry in place instead; other changes
+(Google sync, disconnect, deleting a group) drop the entry early.
+"""
+import heapq
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+# How far before today a freshly loaded user's events reach
+LOAD_LOOKBACK = timedelta(days=1)
+
+
+def to_minutes(value, round_up=False):
+    # DATETIME columns drop the offset, so aware values are stored by their wall time too
+    seconds = (value.replace(tzinfo=None) - EPOCH).total_seconds()
+    return int(-(-seconds // 60) if round_up else seconds // 60)
+
+
+def from_minutes(minutes):
+    return EPOCH + timedelta(minutes=int(minutes))
+
+
+def merge_into(starts, ends, new_starts, new_ends):
+    """Merge [new_start, new_end) intervals into the disjoint sorted arrays"""
+    all_starts = np.concatenate([starts, new_starts])
+    all_ends = np.concatenate([ends, new_ends])
+    order = np.argsort(all_starts, kind="stable")
+    all_starts, all_ends = all_starts[order], all_ends[order]
+    if not len(all_starts):
+        return all_starts, all_ends
+    # An interval opens a new run when it starts after every earlier interval ended
+    reach = np.maximum.accumulate(all_ends)
+    opens = np.ones(len(all_starts), dtype=bool)
+    opens[1:] = all_starts[1:] > reach[:-1]
+    run = np.cumsum(opens) - 1
+    merged_ends = np.zeros(run[-1] + 1, dtype=np.int64)
+    np.maximum.at(merged_ends, run, all_ends)
+    return all_starts[opens], merged_ends
+
+
+class UserBusy:
+    """One user's merged intervals and zero-length points, all in epoch minutes"""
+
+    __slots__ = ("version", "starts", "ends", "points")
+
+    def __init__(self, version=0):
+        self.version = version
+        self.starts = np.zeros(0, dtype=np.int64)
+        self.ends = np.zeros(0, dtype=np.int64)
+        self.points = np.zeros(0, dtype=np.int64)
+
+    def add(self, spans):
+        """Add (start, end) datetime pairs; events without an end are points"""
+        starts, ends, points = [], [], []
+        for start, end in spans:
+            if end is None or end <= start:
+                points.append(to_minutes(start))
+            else:
+                starts.append(to_minutes(start))
+                ends.append(to_minutes(end, round_up=True))
+        if starts:
+            self.starts, self.ends = merge_into(
+                self.starts, self.ends,
+                np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+            )
+        if points:
+            self.points = np.sort(np.concatenate([self.points, np.array(points, dtype=np.int64)]))
+
+    def overlapping(self, range_start, range_end):
+        """(start, end) minute pairs overlapping [range_start, range_end), sorted by start"""
+        first = np.searchsorted(self.ends, range_start, side="right")
+        last = np.searchsorted(self.starts, range_end, side="left")
+        p_first = np.searchsorted(self.points, range_start, side="left")
+        p_last = np.searchsorted(self.points, range_end, side="left")
+        intervals = zip(self.starts[first:last].tolist(), self.ends[first:last].tolist())
+        points = ((p, p) for p in self.points[p_first:p_last].tolist())
+        return heapq.merge(intervals, points)
+
+
+class BusyIndex:
+    """LRU of UserBusy entries for up to `max_users` users"""
+
+    def __init__(self, max_users=10000):
+        self.max_users = max_users
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin_load(self, versions):
+        """Split {user_id: events_version} into ({user_id: entry} current in the index, {user_id: version} to load)"""
+        with self._lock:
+            entries, to_load = {}, {}
+            for user_id, version in versions.items():
+                entry = self._users.get(user_id)
+                if entry is not None and entry.version == version:
+                    self._users.move_to_end(user_id)
+                    entries[user_id] = entry
+                else:
+                    to_load[user_id] = version
+            return entries, to_load
+
+    def load_query(self, user_ids, today):
+        """SQL and params selecting the events of `user_ids` that end on or after yesterday"""
+        since = datetime.combine(today, datetime.min.time()) - LOAD_LOOKBACK
+        placeholders = ", ".join(["%s"] * len(user_ids))
+        return f"""
+            SELECT user_id, start, end_time FROM events
+            WHERE user_id IN ({placeholders})
+            AND (end_time >= %s OR start >= %s)
+        """, (*user_ids, since, since)
+
+    def finish_load(self, entries, to_load, rows):
+        """Build entries for the loaded users into `entries` and index them
+
+        Each entry is indexed under the version read before its rows. A write
+        committed in between makes the rows newer than that version, which
+        only costs a reload once the new version is seen; an entry the index
+        already holds at a newer version is never replaced.
+        """
+        spans = {user_id: [] for user_id in to_load}
+        for row in rows:
+            spans[row["user_id"]].append((row["start"], row["end_time"]))
+        for user_id, user_spans in spans.items():
+            entries[user_id] = UserBusy(to_load[user_id])
+            entries[user_id].add(user_spans)
+        with self._lock:
+            for user_id, version in to_load.items():
+                current = self._users.get(user_id)
+                if current is None or current.version < version:
+                    self._users[user_id] = entries[user_id]
+                    self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def add_events(self, spans_by_user, versions):
+        """Merge newly inserted events, {user_id: [(start, end), ...]}, into loaded users
+
+        `versions` are the users' events_version after the insert. An entry
+        is only updated in place when it was built from the version right
+        before; otherwise it missed some other write and is dropped.
+        """
+        with self._lock:
+            for user_id, spans in spans_by_user.items():
+                entry = self._users.get(user_id)
+                if entry is None:
+                    continue
+                if entry.version == versions[user_id] - 1:
+                    entry.add(spans)
+                    entry.version = versions[user_id]
+                else:
+                    del self._users[user_id]
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._users.pop(user_id, None)
+
+    def group_intervals(self, entries, range_start, range_end):
+        """k-way merge of the entries' busy time in [range_start, range_end) as (user_id, start, end) by start"""
+        lo, hi = to_minutes(range_start), to_minutes(range_end, round_up=True)
+        with self._lock:
+            streams = [
+                [(start, end, user_id) for start, end in entry.overlapping(lo, hi)]
+                for user_id, entry in entries.items()
+            ]
+        return [
+            (user_id, from_minutes(start), from_minutes(end))
+            for start, end, user_id in heapq.merge(*streams)
+        ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "max_users": self.max_users,
+                "intervals": sum(len(e.starts) + len(e.points) for e in self._users.values()),
+            }
@@ -0,0 +1,55 @@
+"""Availability results cached against each group's calendar version"""
+import threading
+from collections import OrderedDict
+
+
+class AvailabilityCache:
+    """Size-bounded LRU of per-date availability counts
+
+    Keys are (group_id, version, params, date_str), where version is the
+    group's calendar_version column as read for the request. Any process
+    that changes the calendar bumps it, so entries of an old version are
+    never read again and simply age out.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_many(self, group_id, version, params, date_strs):
+        """Return ({date_str: count} for cached dates, [date_strs still missing])"""
+        found, missing = {}, []
+        with self._lock:
+            for date_str in date_strs:
+                key = (group_id, version, params, date_str)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[date_str] = self._entries[key]
+                else:
+                    missing.append(date_str)
+            self._hits += len(found)
+            self._misses += len(missing)
+        return found, missing
+
+    def set_many(self, group_id, version, params, results):
+        with self._lock:
+            for date_str, count in results.items():
+                key = (group_id, version, params, date_str)
+                self._entries[key] = count
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
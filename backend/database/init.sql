@@ -8,7 +8,9 @@ CREATE TABLE IF NOT EXISTS users (
     password VARCHAR(255) NOT NULL,
     google_access_token TEXT,
     google_refresh_token TEXT,
+    google_sync_token VARCHAR(255),
     google_calendar_connected BOOLEAN DEFAULT FALSE,
+    events_version BIGINT NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -44,6 +46,8 @@ CREATE TABLE IF NOT EXISTS group_list (
     name VARCHAR(255) NOT NULL,
     join_key VARCHAR(10) UNIQUE NOT NULL,
     creator_id INT NOT NULL,
+    calendar_version BIGINT NOT NULL DEFAULT 0,
+    info_version BIGINT NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (creator_id) REFERENCES users(id) ON DELETE CASCADE
 );
@@ -61,9 +65,9 @@ CREATE TABLE IF NOT EXISTS group_members (
 );
 
 -- Create indexes for better performance
-CREATE INDEX idx_events_user_id ON events(user_id);
+CREATE INDEX idx_events_user_start_end ON events(user_id, start, end_time);
 CREATE INDEX idx_events_start ON events(start);
-CREATE INDEX idx_user_google_event ON events(user_id, google_event_id);
+CREATE UNIQUE INDEX uniq_user_google_event ON events(user_id, google_event_id);
 CREATE INDEX idx_friends_user_id ON friends(user_id);
 CREATE INDEX idx_group_join_key ON group_list(join_key);
 CREATE INDEX idx_group_members_group_id ON group_members(group_id);
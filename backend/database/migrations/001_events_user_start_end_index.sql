@@ -0,0 +1,19 @@
+-- Composite index for per-user time range queries on events
+--
+-- Availability and slot-finder queries filter one member's events with
+-- half-open ranges on start/end_time. With (user_id, start, end_time) MySQL
+-- seeks straight to the member's events in the requested range and checks
+-- end_time from the index, instead of scanning every event the member has.
+--
+-- Apply to an existing database with:
+--   mysql -u <user> -p scheduler_db < backend/database/migrations/001_events_user_start_end_index.sql
+--
+-- Verify the index is picked up (key should be idx_events_user_start_end):
+--   EXPLAIN SELECT user_id, start, end_time FROM events
+--   WHERE user_id = 1 AND start >= '2025-01-01' AND start < '2025-02-01'
+--   AND (end_time > '2025-01-08' OR start >= '2025-01-08');
+
+CREATE INDEX idx_events_user_start_end ON events(user_id, start, end_time);
+
+-- Covered by the composite index above (also satisfies the user_id foreign key)
+DROP INDEX idx_events_user_id ON events;
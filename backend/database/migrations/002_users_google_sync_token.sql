@@ -0,0 +1,10 @@
+-- Per-user Google Calendar sync token
+--
+-- Stores the nextSyncToken from the last successful sync so the next one
+-- only fetches events that changed since then. NULL means the next sync is
+-- a full resync (never synced, just reconnected, or Google expired the token).
+--
+-- Apply to an existing database with:
+--   mysql -u <user> -p scheduler_db < backend/database/migrations/002_users_google_sync_token.sql
+
+ALTER TABLE users ADD COLUMN google_sync_token VARCHAR(255) NULL AFTER google_refresh_token;
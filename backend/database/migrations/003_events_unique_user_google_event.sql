@@ -0,0 +1,20 @@
+-- Unique (user_id, google_event_id) for batched Google Calendar upserts
+--
+-- Google sync writes each page with a single INSERT ... ON DUPLICATE KEY
+-- UPDATE, which needs a real unique key to detect events it already stored.
+-- Personal events keep google_event_id NULL and are not affected, since
+-- NULLs never collide in a unique index.
+--
+-- Apply to an existing database with:
+--   mysql -u <user> -p scheduler_db < backend/database/migrations/003_events_unique_user_google_event.sql
+
+-- Keep the oldest copy of any Google event that was imported twice
+DELETE newer FROM events newer
+JOIN events older
+  ON newer.user_id = older.user_id
+ AND newer.google_event_id = older.google_event_id
+ AND newer.id > older.id;
+
+ALTER TABLE events
+  DROP INDEX idx_user_google_event,
+  ADD UNIQUE KEY uniq_user_google_event (user_id, google_event_id);
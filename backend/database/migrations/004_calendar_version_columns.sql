@@ -0,0 +1,19 @@
+-- Version counters for conditional GETs and the availability/busy caches
+--
+-- ETags and cache keys used to come from counters held in each API process,
+-- so a second worker, or anything writing to the database directly, left
+-- them stale. The counters now live next to the data and are bumped in the
+-- same transaction as the change they describe:
+--   users.events_version         - the user's own events
+--   group_list.calendar_version  - events of any member, or who the members are
+--   group_list.info_version      - the group's name, members or admins
+-- Scripts that change these rows by hand must bump the matching counter.
+--
+-- Apply to an existing database with:
+--   mysql -u <user> -p scheduler_db < backend/database/migrations/004_calendar_version_columns.sql
+
+ALTER TABLE users ADD COLUMN events_version BIGINT NOT NULL DEFAULT 0 AFTER google_calendar_connected;
+
+ALTER TABLE group_list
+  ADD COLUMN calendar_version BIGINT NOT NULL DEFAULT 0 AFTER creator_id,
+  ADD COLUMN info_version BIGINT NOT NULL DEFAULT 0 AFTER calendar_version;
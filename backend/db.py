@@ -0,0 +1,243 @@
+"""Bounded MySQL connection pools shared by all request handlers"""
+import asyncio
+import threading
+import time
+from collections import deque
+
+import aiomysql
+import mysql.connector
+from mysql.connector import errors as mysql_errors
+
+from metrics import TimedCursor
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out before the timeout"""
+
+
+class PooledConnection:
+    """Thin proxy around a pooled connection - close() hands it back to the pool"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._conn.cursor(*args, **kwargs)
+        metrics = self._pool.metrics
+        return TimedCursor(cursor, metrics) if metrics else cursor
+
+    def close(self):
+        if self._conn is not None:
+            self._pool._release(self._conn)
+            self._conn = None
+
+
+class ConnectionPool:
+    """Fixed-size pool of MySQL connections.
+
+    Connections are opened lazily up to `size`. When every connection is
+    checked out, callers wait up to `timeout` seconds for one to be returned.
+    A connection that sat idle longer than `ping_interval` seconds is pinged
+    before reuse and replaced if the server dropped it. With `metrics`, the
+    checkout wait and every cursor's queries are reported to it.
+    """
+
+    def __init__(self, size=10, timeout=5.0, ping_interval=30.0, metrics=None, **connect_args):
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.metrics = metrics
+        self._connect_args = connect_args
+        self._idle = deque()  # (connection, returned_at)
+        self._in_use = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+
+        # Statistics
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def get_connection(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self._idle and self._in_use >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"No database connection available after {self.timeout}s")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+            # LIFO so the most recently used connections stay warm
+            entry = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            waited = time.monotonic() - started
+            self._checkouts += 1
+            self._wait_time_total += waited
+            self._wait_time_max = max(self._wait_time_max, waited)
+        if self.metrics:
+            self.metrics.observe_pool_wait("sync", waited)
+
+        try:
+            conn = self._check_health(*entry) if entry else None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        return PooledConnection(self, conn)
+
+    def _connect(self):
+        conn = mysql.connector.connect(autocommit=False, **self._connect_args)
+        with self._cond:
+            self._created += 1
+        return conn
+
+    def _check_health(self, conn, returned_at):
+        if time.monotonic() - returned_at < self.ping_interval:
+            return conn
+        try:
+            conn.ping(reconnect=False)
+            return conn
+        except mysql_errors.Error:
+            self._discard(conn)
+            return None
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except mysql_errors.Error:
+            pass
+        with self._cond:
+            self._discarded += 1
+
+    def _release(self, conn):
+        healthy = False
+        try:
+            # Never hand the next request an open transaction or unread rows.
+            # An unbuffered cursor abandoned mid-result (a stream whose client
+            # went away) leaves rows on the wire; read them off first.
+            if conn.unread_result:
+                conn.consume_results()
+            if conn.in_transaction:
+                conn.rollback()
+            healthy = True
+        except mysql_errors.Error:
+            self._discard(conn)
+        finally:
+            # The slot is given back even if cleanup failed unexpectedly
+            with self._cond:
+                self._in_use -= 1
+                if healthy:
+                    self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "connections_created": self._created,
+                "connections_discarded": self._discarded,
+                "wait_time_total_ms": round(self._wait_time_total * 1000, 3),
+                "wait_time_avg_ms": round(self._wait_time_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                "wait_time_max_ms": round(self._wait_time_max * 1000, 3),
+            }
+
+
+class AsyncConnectionPool:
+    """aiomysql pool for `async def` handlers, bounded and timed like ConnectionPool
+
+    Connections run in autocommit mode: the async handlers only read, and this
+    way every query sees the latest committed data.
+    """
+
+    def __init__(self, size=20, timeout=5.0, recycle=3600, metrics=None, **connect_args):
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.metrics = metrics
+        self._connect_args = connect_args
+        self._pool = None
+        self._waiting = 0
+
+        # Statistics
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    async def start(self):
+        self._pool = await aiomysql.create_pool(
+            minsize=0, maxsize=self.size, autocommit=True,
+            pool_recycle=self.recycle, **self._connect_args
+        )
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+    async def acquire(self):
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            conn = await asyncio.wait_for(self._pool.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            raise PoolTimeout(f"No database connection available after {self.timeout}s")
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - started
+        self._checkouts += 1
+        self._wait_time_total += waited
+        self._wait_time_max = max(self._wait_time_max, waited)
+        if self.metrics:
+            self.metrics.observe_pool_wait("async", waited)
+        return conn
+
+    def release(self, conn):
+        self._pool.release(conn)
+
+    def stats(self):
+        opened = self._pool.size if self._pool else 0
+        idle = self._pool.freesize if self._pool else 0
+        return {
+            "size": self.size,
+            "in_use": opened - idle,
+            "idle": idle,
+            "waiting": self._waiting,
+            "checkouts": self._checkouts,
+            "timeouts": self._timeouts,
+            "wait_time_total_ms": round(self._wait_time_total * 1000, 3),
+            "wait_time_avg_ms": round(self._wait_time_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+            "wait_time_max_ms": round(self._wait_time_max * 1000, 3),
+        }
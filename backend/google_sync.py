@@ -0,0 +1,244 @@
+"""Google Calendar -> events table synchronisation helpers"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from google.oauth2.credentials import Credentials
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+
+GOOGLE_EVENT_COLOR = '#4285f4'
+GOOGLE_PAGE_SIZE = 250
+GOOGLE_TOKEN_URI = "https://oauth2.googleapis.com/token"
+
+_discovery_document = None
+_discovery_lock = threading.Lock()
+
+
+class SyncTokenExpired(Exception):
+    """Google answered 410 Gone: the stored sync token must be dropped and a full sync run"""
+
+
+def timed_request_class(observe):
+    """HttpRequest subclass reporting every execute() as observe(method_id, seconds, ok)
+
+    The time includes any access token refresh the call triggers.
+    """
+    class TimedHttpRequest(HttpRequest):
+        def execute(self, *args, **kwargs):
+            started = time.perf_counter()
+            ok = False
+            try:
+                result = super().execute(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                observe(self.methodId, time.perf_counter() - started, ok)
+
+    return TimedHttpRequest
+
+
+def calendar_discovery_document():
+    """Calendar v3 discovery document, parsed once per process
+
+    Uses the copy bundled with google-api-python-client, so building a client
+    never fetches or re-parses the document.
+    """
+    global _discovery_document
+    with _discovery_lock:
+        if _discovery_document is None:
+            _discovery_document = json.loads(discovery_cache.get_static_doc('calendar', 'v3'))
+        return _discovery_document
+
+
+class CalendarClientCache:
+    """Per-user Calendar service objects and credentials, LRU with a TTL
+
+    Reusing the Credentials object keeps a refreshed access token (and its
+    expiry) in memory between syncs. Entries are rebuilt when the user's
+    refresh token changes, i.e. after a reconnect. A service object is not
+    thread-safe; the sync queue never runs two syncs for one user at once.
+    With `observe_call`, every API request the services make is timed (see
+    timed_request_class()).
+    """
+
+    def __init__(self, client_id, client_secret, max_size=256, ttl=3600, observe_call=None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.max_size = max_size
+        self.ttl = ttl
+        self._request_class = timed_request_class(observe_call) if observe_call else HttpRequest
+        self._entries = OrderedDict()  # user id -> (service, credentials, created_at)
+        self._lock = threading.Lock()
+
+    def get(self, user_id, access_token, refresh_token):
+        """Return (service, credentials) for the user, building them if needed"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            if entry and entry[1].refresh_token == refresh_token and now - entry[2] < self.ttl:
+                self._entries[user_id] = entry
+                return entry[0], entry[1]
+
+        credentials = Credentials(
+            token=access_token,
+            refresh_token=refresh_token,
+            token_uri=GOOGLE_TOKEN_URI,
+            client_id=self.client_id,
+            client_secret=self.client_secret
+        )
+        service = build_from_document(
+            calendar_discovery_document(), credentials=credentials, requestBuilder=self._request_class
+        )
+
+        with self._lock:
+            self._entries[user_id] = (service, credentials, now)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return service, credentials
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+def iter_calendar_pages(service, sync_token=None, throttle=None):
+    """Page through the primary calendar, yielding (items, next_sync_token) per page
+
+    Without a sync token this lists every event (a full sync). With one it
+    lists only events changed since that token was issued, including deleted
+    ones with status 'cancelled'. Google only accepts a sync token on requests
+    made without time bounds or ordering, so the full sync omits them too.
+    next_sync_token is None on every page but the last. `throttle`, when
+    given, is called before every request to Google.
+    """
+    params = {
+        'calendarId': 'primary',
+        'singleEvents': True,
+        'maxResults': GOOGLE_PAGE_SIZE,
+    }
+    if sync_token:
+        params['syncToken'] = sync_token
+
+    page_token = None
+    while True:
+        if throttle:
+            throttle()
+        try:
+            result = service.events().list(pageToken=page_token, **params).execute()
+        except HttpError as e:
+            if e.resp.status == 410:
+                raise SyncTokenExpired() from e
+            raise
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            yield result.get('items', []), result.get('nextSyncToken')
+            return
+        yield result.get('items', []), None
+
+
+def _parse_google_datetime(value):
+    # Handle both datetime and date formats
+    if 'T' in value:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return datetime.strptime(value, '%Y-%m-%d')
+
+
+def parse_google_event(event):
+    """Turn a Google event into (title, start, end_time, location), or None if it can't be stored"""
+    try:
+        start = event['start'].get('dateTime', event['start'].get('date'))
+        end_time = event['end'].get('dateTime', event['end'].get('date')) if 'end' in event else None
+        return (
+            event.get('summary', 'No Title'),
+            _parse_google_datetime(start),
+            _parse_google_datetime(end_time) if end_time else None,
+            event.get('location', ''),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def apply_calendar_page(cursor, user_id, items):
+    """Write one page of Google events with at most one upsert and one delete
+
+    Relies on the UNIQUE (user_id, google_event_id) key: new events are
+    inserted and known ones updated by the same multi-row statement.
+    Returns the Google ids the page contained.
+    """
+    # The same event can show up more than once in a page; the last copy wins
+    latest = {event['id']: event for event in items if event.get('id')}
+
+    rows, cancelled = [], []
+    for google_event_id, event in latest.items():
+        if event.get('status') == 'cancelled':
+            cancelled.append(google_event_id)
+            continue
+        parsed = parse_google_event(event)
+        if parsed is not None:
+            rows.append(parsed + (GOOGLE_EVENT_COLOR, user_id, google_event_id))
+
+    if rows:
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(rows))
+        cursor.execute(f"""
+            INSERT INTO events (title, start, end_time, location, color, user_id, google_event_id)
+            VALUES {placeholders} AS new
+            ON DUPLICATE KEY UPDATE
+                title = new.title, start = new.start,
+                end_time = new.end_time, location = new.location
+        """, tuple(value for row in rows for value in row))
+    if cancelled:
+        delete_google_events(cursor, user_id, cancelled)
+
+    return latest.keys()
+
+
+def delete_google_events(cursor, user_id, google_event_ids):
+    placeholders = ", ".join(["%s"] * len(google_event_ids))
+    cursor.execute(f"""
+        DELETE FROM events WHERE user_id = %s AND google_event_id IN ({placeholders})
+    """, (user_id, *google_event_ids))
+
+
+def delete_stale_google_events(cursor, user_id, seen_ids):
+    """After a full sync, delete stored Google events that Google no longer returned"""
+    cursor.execute("""
+        SELECT google_event_id FROM events
+        WHERE user_id = %s AND google_event_id IS NOT NULL
+    """, (user_id,))
+    stale = [row['google_event_id'] for row in cursor.fetchall() if row['google_event_id'] not in seen_ids]
+    if stale:
+        delete_google_events(cursor, user_id, stale)
+    return len(stale)
+
+
+def _write_pages(cursor, user_id, service, sync_token=None, throttle=None):
+    seen_ids = set()
+    next_sync_token = None
+    for items, next_sync_token in iter_calendar_pages(service, sync_token, throttle):
+        seen_ids.update(apply_calendar_page(cursor, user_id, items))
+    return next_sync_token, seen_ids
+
+
+def sync_calendar(cursor, user_id, service, sync_token=None, throttle=None):
+    """Bring the user's Google events up to date
+
+    Runs an incremental sync when a token is given, and a full resync when it
+    isn't or Google has expired it. Returns (next_sync_token, changed), where
+    `changed` is False only when Google reported nothing new, so callers can
+    skip invalidating cached availability. The caller owns the transaction.
+    """
+    if sync_token:
+        try:
+            next_sync_token, seen_ids = _write_pages(cursor, user_id, service, sync_token, throttle)
+            return next_sync_token, bool(seen_ids)
+        except SyncTokenExpired:
+            pass
+
+    next_sync_token, seen_ids = _write_pages(cursor, user_id, service, throttle=throttle)
+    stale = delete_stale_google_events(cursor, user_id, seen_ids)
+    return next_sync_token, bool(seen_ids) or stale > 0
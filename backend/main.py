@@ -1,25 +1,46 @@
-from fastapi import FastAPI, Request, HTTPException, Depends
+from fastapi import FastAPI, Request, Response, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-import mysql.connector
 from mysql.connector import errors as mysql_errors
-import bcrypt
+import asyncio
+import aiomysql
+import pymysql
 import os
 import jwt
+import base64
+import binascii
+import hashlib
 import traceback
-import time
 import random
 import string
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 
+from db import ConnectionPool, AsyncConnectionPool, PoolTimeout
+from metrics import Metrics, MetricsMiddleware, AsyncTimedCursor
+from query_audit import QueryAuditor, query_budget
+from passwords import PasswordHasher, HasherBusy
+from membership import MembershipCache, NOT_CACHED
+from calendar_cache import AvailabilityCache
+from busy_index import BusyIndex
+from broker import InProcessBroker, encode_sse
+from streaming import iter_json_array
+from serialization import json_response, base_etag
+from google_sync import CalendarClientCache, sync_calendar
+from sync_worker import SyncJobQueue, QueueFull
+from availability import (
+    requested_dates, daily_windows,
+    busy_members_by_window, calculate_continuous_availability, best_meeting_slots
+)
+
 os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
 load_dotenv()
 
@@ -31,6 +52,21 @@ GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI")
 
 app = FastAPI()
+# QUERY_AUDIT=warn logs N+1 patterns and routes over their @query_budget;
+# =strict (for test runs) also fails the query that goes over budget
+query_auditor = QueryAuditor(
+    mode=os.getenv("QUERY_AUDIT", "off"),
+    slow_query_ms=float(os.getenv("SLOW_QUERY_MS", "200")),
+    repeat_threshold=int(os.getenv("QUERY_AUDIT_REPEAT_THRESHOLD", "3")),
+    log_path=os.getenv("QUERY_LOG_PATH"),
+)
+metrics = Metrics(auditor=query_auditor)
+
+calendar_clients = CalendarClientCache(
+    GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET,
+    max_size=int(os.getenv("GOOGLE_CLIENT_CACHE_SIZE", "256")),
+    observe_call=metrics.observe_google_call
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -38,32 +74,215 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+# Outermost, so the latency covers the other middleware too
+app.add_middleware(MetricsMiddleware, metrics=metrics)
 
 def generate_join_key(length=8):
     """Generate a unique join key for groups"""
     characters = string.ascii_uppercase + string.digits
     return ''.join(random.choice(characters) for _ in range(length))
 
-def get_db_connection(retries=3, delay=1):
-    for attempt in range(retries):
-        try:
-            return mysql.connector.connect(
-                host=os.getenv("DB_HOST"),
-                port=os.getenv("DB_PORT"),
-                user=os.getenv("DB_USER"),
-                password=os.getenv("DB_PASSWORD"),
-                database=os.getenv("DB_NAME"),
-                autocommit=False,
-                pool_reset_session=True,
-                connection_timeout=10
-            )
-        except (mysql_errors.OperationalError, mysql_errors.InterfaceError) as e:
-            if attempt < retries - 1:
-                time.sleep(delay)
-                delay *= 2
-                continue
-            raise HTTPException(status_code=503, detail="Database connection failed")
+db_pool = ConnectionPool(
+    size=int(os.getenv("DB_POOL_SIZE", "10")),
+    timeout=float(os.getenv("DB_POOL_TIMEOUT", "5")),
+    ping_interval=float(os.getenv("DB_POOL_PING_INTERVAL", "30")),
+    metrics=metrics,
+    host=os.getenv("DB_HOST"),
+    port=os.getenv("DB_PORT"),
+    user=os.getenv("DB_USER"),
+    password=os.getenv("DB_PASSWORD"),
+    database=os.getenv("DB_NAME"),
+    connection_timeout=10
+)
+
+def get_db_connection():
+    """Check out a connection from the shared pool - db.close() returns it"""
+    try:
+        return db_pool.get_connection()
+    except PoolTimeout:
+        raise HTTPException(status_code=503, detail="Database busy, try again shortly")
+    except (mysql_errors.OperationalError, mysql_errors.InterfaceError):
+        raise HTTPException(status_code=503, detail="Database connection failed")
+
+# Separate async pool for the read-heavy `async def` handlers, so they don't
+# hold Starlette threadpool workers while waiting on MySQL
+async_db_pool = AsyncConnectionPool(
+    size=int(os.getenv("DB_ASYNC_POOL_SIZE", "20")),
+    timeout=float(os.getenv("DB_POOL_TIMEOUT", "5")),
+    metrics=metrics,
+    host=os.getenv("DB_HOST"),
+    port=int(os.getenv("DB_PORT") or 3306),
+    user=os.getenv("DB_USER"),
+    password=os.getenv("DB_PASSWORD"),
+    db=os.getenv("DB_NAME"),
+    connect_timeout=10
+)
+
+@asynccontextmanager
+async def get_async_db_cursor():
+    """Async counterpart of get_db_connection(): yields a dict cursor from the async pool"""
+    try:
+        conn = await async_db_pool.acquire()
+    except PoolTimeout:
+        raise HTTPException(status_code=503, detail="Database busy, try again shortly")
+    except pymysql.err.OperationalError:
+        raise HTTPException(status_code=503, detail="Database connection failed")
+    try:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            yield AsyncTimedCursor(cursor, metrics)
+    finally:
+        async_db_pool.release(conn)
+
+@app.on_event("startup")
+async def open_async_db_pool():
+    await async_db_pool.start()
+
+@app.on_event("shutdown")
+async def close_db_pools():
+    db_pool.close_all()
+    await async_db_pool.close()
+
+password_hasher = PasswordHasher(
+    rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+    workers=int(os.getenv("BCRYPT_WORKERS", "2")),
+    max_pending=int(os.getenv("BCRYPT_MAX_PENDING", "16"))
+)
+
+async def run_password_hasher(method, *args):
+    """Await a PasswordHasher method, answering 503 when the hashing pool is saturated"""
+    try:
+        return await method(*args)
+    except HasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again shortly")
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    password_hasher.shutdown()
+
+membership_cache = MembershipCache(
+    max_size=int(os.getenv("MEMBERSHIP_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("MEMBERSHIP_CACHE_TTL", "300"))
+)
+
+MEMBERSHIP_QUERY = "SELECT is_admin FROM group_members WHERE group_id = %s AND user_id = %s"
+
+def require_group_member(cursor, group_id, user_id):
+    """Return the user's is_admin flag for the group, or 403 if they aren't a member"""
+    is_admin = membership_cache.get(group_id, user_id)
+    if is_admin is NOT_CACHED:
+        # Taken before the read, so a fill racing an invalidation isn't kept
+        generation = membership_cache.generation(group_id, user_id)
+        cursor.execute(MEMBERSHIP_QUERY, (group_id, user_id))
+        row = cursor.fetchone()
+        is_admin = row["is_admin"] if row else None
+        membership_cache.set(group_id, user_id, is_admin, generation)
+    if is_admin is None:
+        raise HTTPException(status_code=403, detail="You are not a member of this group")
+    return is_admin
+
+availability_cache = AvailabilityCache(max_size=int(os.getenv("AVAILABILITY_CACHE_SIZE", "10000")))
+
+# ETags and cached results are keyed by version columns that live next to the
+# data (users.events_version, group_list.calendar_version and info_version),
+# so every API process and anything else writing to the database agrees on
+# them. Writes bump them inside their own transaction, before commit.
+
+def bump_user_calendars(cursor, user_ids):
+    """Bump the users' event versions and those of every group they belong to - call before commit
+
+    Returns the ids of those groups.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(user_ids))
+    cursor.execute(f"UPDATE users SET events_version = events_version + 1 WHERE id IN ({placeholders})", tuple(user_ids))
+    cursor.execute(f"SELECT DISTINCT group_id FROM group_members WHERE user_id IN ({placeholders})", tuple(user_ids))
+    group_ids = [row["group_id"] for row in cursor.fetchall()]
+    bump_group_versions(cursor, group_ids, calendar=True)
+    return group_ids
+
+def bump_group_versions(cursor, group_ids, calendar=False, info=False):
+    """Bump the groups' calendar and/or info versions - call before commit"""
+    columns = [name for name, bump in (("calendar_version", calendar), ("info_version", info)) if bump]
+    if not group_ids or not columns:
+        return
+    placeholders = ", ".join(["%s"] * len(group_ids))
+    assignments = ", ".join(f"{column} = {column} + 1" for column in columns)
+    cursor.execute(f"UPDATE group_list SET {assignments} WHERE id IN ({placeholders})", tuple(group_ids))
+
+def read_event_versions(cursor, user_ids):
+    """{user_id: events_version} - inside a write transaction, the versions it bumped to"""
+    placeholders = ", ".join(["%s"] * len(user_ids))
+    cursor.execute(f"SELECT id, events_version FROM users WHERE id IN ({placeholders})", tuple(user_ids))
+    return {row["id"]: row["events_version"] for row in cursor.fetchall()}
+
+async def get_calendar_version(cursor, group_id):
+    await cursor.execute("SELECT calendar_version FROM group_list WHERE id = %s", (group_id,))
+    row = await cursor.fetchone()
+    return row["calendar_version"] if row else 0
+
+broker = InProcessBroker(max_queued=int(os.getenv("UPDATES_QUEUE_SIZE", "100")))
+UPDATES_KEEPALIVE_SECONDS = 15
+
+def publish_notice(notice_type, user_ids=(), group_ids=(), **fields):
+    """Push a change notice to the /updates streams of the users and groups - call after commit"""
+    user_ids, group_ids = sorted(set(user_ids)), sorted(set(group_ids))
+    broker.publish(
+        [f"user:{u}" for u in user_ids] + [f"group:{g}" for g in group_ids],
+        {"type": notice_type, "user_ids": user_ids, "group_ids": group_ids, **fields}
+    )
+
+busy_index = BusyIndex(max_users=int(os.getenv("BUSY_INDEX_MAX_USERS", "10000")))
+
+def load_busy_intervals(cursor, versions, range_start, range_end):
+    """(user_id, start, end) busy intervals of the members in [range_start, range_end), by start
+
+    `versions` maps each member to the events_version just read from users;
+    only members the busy index doesn't hold at that version are read from
+    the events table.
+    """
+    entries, to_load = busy_index.begin_load(versions)
+    if to_load:
+        cursor.execute(*busy_index.load_query(list(to_load), datetime.now().date()))
+        busy_index.finish_load(entries, to_load, cursor.fetchall())
+    return busy_index.group_intervals(entries, range_start, range_end)
+
+async def load_busy_intervals_async(cursor, versions, range_start, range_end):
+    """load_busy_intervals() for handlers on the async pool
+
+    Building and merging the interval arrays takes hundreds of milliseconds
+    for large groups, and the index lock may be held by another thread, so
+    that work runs in the threadpool; only the query runs on the event loop.
+    """
+    entries, to_load = await run_in_threadpool(busy_index.begin_load, versions)
+    rows = []
+    if to_load:
+        await cursor.execute(*busy_index.load_query(list(to_load), datetime.now().date()))
+        rows = await cursor.fetchall()
+
+    def merge():
+        if to_load:
+            busy_index.finish_load(entries, to_load, rows)
+        return busy_index.group_intervals(entries, range_start, range_end)
+
+    return await run_in_threadpool(merge)
+
+async def require_group_member_async(cursor, group_id, user_id):
+    """require_group_member() for handlers on the async pool"""
+    is_admin = membership_cache.get(group_id, user_id)
+    if is_admin is NOT_CACHED:
+        # Taken before the read, so a fill racing an invalidation isn't kept
+        generation = membership_cache.generation(group_id, user_id)
+        await cursor.execute(MEMBERSHIP_QUERY, (group_id, user_id))
+        row = await cursor.fetchone()
+        is_admin = row["is_admin"] if row else None
+        membership_cache.set(group_id, user_id, is_admin, generation)
+    if is_admin is None:
+        raise HTTPException(status_code=403, detail="You are not a member of this group")
+    return is_admin
 
 # Models
 class RegisterData(BaseModel):
@@ -138,16 +357,123 @@ def decode_token(token: str):
 def get_current_user(token: str = Depends(oauth2_scheme)):
     payload = decode_token(token)
     user_id = payload.get("user_id")
-    if not user_id:
+    # Stream tickets only open /updates
+    if not user_id or payload.get("purpose"):
         raise HTTPException(status_code=401, detail="Invalid token payload")
     return user_id
 
+# Event list pagination
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+
+def encode_event_cursor(event):
+    raw = f"{event['start'].isoformat()}|{event['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_event_cursor(cursor: str):
+    try:
+        start, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(start), int(event_id)
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def event_window_clause(window_from, window_to):
+    """SQL fragment and params restricting events (aliased `e`) to those overlapping [from, to)
+
+    Events that started before `from` but are still running are included,
+    however long they are.
+    """
+    clauses, params = [], []
+    if window_from:
+        window_from = window_from.replace(tzinfo=None)
+        clauses.append("(e.end_time > %s OR e.start >= %s)")
+        params += [window_from, window_from]
+    if window_to:
+        clauses.append("e.start < %s")
+        params.append(window_to.replace(tzinfo=None))
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+def event_page_clause(window_from, window_to, cursor, limit):
+    """Window fragment plus (start, id) keyset ordering and limit for one page of events"""
+    sql, params = event_window_clause(window_from, window_to)
+    if cursor:
+        after_start, after_id = decode_event_cursor(cursor)
+        sql += " AND (e.start > %s OR (e.start = %s AND e.id > %s))"
+        params += [after_start, after_start, after_id]
+
+    sql += " ORDER BY e.start ASC, e.id ASC LIMIT %s"
+    # One extra row tells us whether another page follows
+    params.append(limit + 1)
+    return sql, params
+
+def make_etag(*parts):
+    """Strong ETag from change markers such as version columns and query parameters
+
+    Only built from what the database holds, so every worker agrees on it.
+    """
+    return '"%s"' % hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+def not_modified(request: Request, response: Response, etag: str):
+    """Attach the ETag and return a 304 response if the client's If-None-Match already has it"""
+    response.headers["ETag"] = etag
+    # Browsers revalidate on every fetch and answer a 304 from their own cache
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.headers["Vary"] = "Authorization"
+    for tag in request.headers.get("if-none-match", "").split(","):
+        tag = tag.strip().removeprefix("W/")
+        # The client may hold the compressed representation, whose tag has a suffix
+        if tag == "*" or base_etag(tag) == etag:
+            headers = {**response.headers, "etag": tag if tag != "*" else etag, "vary": "Authorization, Accept-Encoding"}
+            return Response(status_code=304, headers=headers)
+    return None
+
+def paginate_events(rows, limit, response: Response):
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_event_cursor(rows[-1])
+    return rows
+
 @app.get("/test")
 def test():
     return {"message": "Backend is up!"}
 
+@app.get("/db/pool")
+def db_pool_stats():
+    """Runtime statistics for the database connection pools"""
+    return {**db_pool.stats(), "async": async_db_pool.stats()}
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters for the in-process caches"""
+    return {
+        "membership": membership_cache.stats(),
+        "availability": availability_cache.stats(),
+        "busy_index": busy_index.stats(),
+    }
+
+def pool_gauge(key):
+    return lambda: [(("sync",), db_pool.stats()[key]), (("async",), async_db_pool.stats()[key])]
+
+metrics.register_gauges("db_pool_connections_in_use", "Pooled connections checked out", ("pool",), pool_gauge("in_use"))
+metrics.register_gauges("db_pool_waiting", "Callers waiting for a pooled connection", ("pool",), pool_gauge("waiting"))
+metrics.register_gauges("db_pool_timeouts_total", "Checkouts that gave up waiting", ("pool",), pool_gauge("timeouts"), "counter")
+metrics.register_gauges("google_sync_jobs", "Sync jobs kept in the job history, by status", ("status",),
+                        lambda: [((status,), count) for status, count in sync_jobs.stats().items()])
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Request, database and Google API metrics in Prometheus text format"""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/register")
-def register(data: RegisterData):
+@query_budget(3)
+async def register(data: RegisterData):
+    # Hash before checking out a connection so it isn't held for the bcrypt round trip
+    hashed_pw = await run_password_hasher(password_hasher.hash, data.password)
+    await run_in_threadpool(insert_user, data, hashed_pw)
+    return {"message": "User registered successfully!"}
+
+def insert_user(data: RegisterData, hashed_pw):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
     try:
@@ -161,37 +487,60 @@ def register(data: RegisterData):
         if cursor.fetchone():
             raise HTTPException(status_code=400, detail="Username already taken")
 
-        hashed_pw = bcrypt.hashpw(data.password.encode(), bcrypt.gensalt()).decode()
         cursor.execute("INSERT INTO users (username, email, password) VALUES (%s, %s, %s)",
                        (data.username, data.email, hashed_pw))
         db.commit()
-        return {"message": "User registered successfully!"}
     finally:
         cursor.close()
         db.close()
 
 @app.post("/login", response_model=TokenData)
-def login(data: LoginData):
+@query_budget(2)
+async def login(data: LoginData):
+    user = await run_in_threadpool(find_login_user, data.username_or_email)
+
+    if not user or not await run_password_hasher(password_hasher.verify, data.password, user["password"]):
+        raise HTTPException(status_code=401, detail="Incorrect username/email or password")
+
+    # Upgrade hashes made with a different work factor while we have the plain password
+    if password_hasher.needs_rehash(user["password"]):
+        try:
+            new_hash = await password_hasher.hash(data.password)
+            await run_in_threadpool(rehash_password, user["id"], user["password"], new_hash)
+        except HasherBusy:
+            pass
+
+    token = create_access_token({"user_id": user["id"], "email": user["email"]})
+    return {"access_token": token, "token_type": "bearer"}
+
+def find_login_user(username_or_email):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
     try:
         # Check if the input is an email or username
-        if "@" in data.username_or_email:
-            cursor.execute("SELECT * FROM users WHERE email = %s", (data.username_or_email,))
+        if "@" in username_or_email:
+            cursor.execute("SELECT * FROM users WHERE email = %s", (username_or_email,))
         else:
-            cursor.execute("SELECT * FROM users WHERE username = %s", (data.username_or_email,))
-        
-        user = cursor.fetchone()
-        if not user or not bcrypt.checkpw(data.password.encode(), user["password"].encode()):
-            raise HTTPException(status_code=401, detail="Incorrect username/email or password")
+            cursor.execute("SELECT * FROM users WHERE username = %s", (username_or_email,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+        db.close()
 
-        token = create_access_token({"user_id": user["id"], "email": user["email"]})
-        return {"access_token": token, "token_type": "bearer"}
+def rehash_password(user_id, old_hash, new_hash):
+    db = get_db_connection()
+    cursor = db.cursor()
+    try:
+        # Skip if the password changed since we read it
+        cursor.execute("UPDATE users SET password = %s WHERE id = %s AND password = %s",
+                       (new_hash, user_id, old_hash))
+        db.commit()
     finally:
         cursor.close()
         db.close()
 
 @app.get("/me")
+@query_budget(1)
 def me(user_id: int = Depends(get_current_user)):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
@@ -207,6 +556,7 @@ def me(user_id: int = Depends(get_current_user)):
         db.close()
 
 @app.post("/friends")
+@query_budget(3)
 def add_friend(data: FriendIn, user_id: int = Depends(get_current_user)):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
@@ -228,6 +578,7 @@ def add_friend(data: FriendIn, user_id: int = Depends(get_current_user)):
         db.close()
 
 @app.get("/friends")
+@query_budget(1)
 def list_friends(user_id: int = Depends(get_current_user)):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
@@ -244,6 +595,7 @@ def list_friends(user_id: int = Depends(get_current_user)):
         db.close()
 
 @app.post("/groups")
+@query_budget(8)
 def create_group(data: GroupCreate, user_id: int = Depends(get_current_user)):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
@@ -262,25 +614,45 @@ def create_group(data: GroupCreate, user_id: int = Depends(get_current_user)):
         group_id = cursor.fetchone()["id"]
 
         cursor.execute("INSERT INTO group_members (group_id, user_id, is_admin) VALUES (%s, %s, TRUE)", (group_id, user_id))
+        member_ids = [user_id]
 
-        for email in data.member_emails:
-            cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
-            user = cursor.fetchone()
-            if user:
-                cursor.execute("INSERT INTO group_members (group_id, user_id) VALUES (%s, %s)", (group_id, user["id"]))
+        # Look up and add all invited members in one query each, not one per email
+        if data.member_emails:
+            placeholders = ", ".join(["%s"] * len(data.member_emails))
+            cursor.execute(f"SELECT id FROM users WHERE email IN ({placeholders})", tuple(data.member_emails))
+            invited = [row["id"] for row in cursor.fetchall() if row["id"] != user_id]
+            if invited:
+                cursor.executemany("INSERT INTO group_members (group_id, user_id) VALUES (%s, %s)",
+                                   [(group_id, uid) for uid in invited])
+                member_ids += invited
 
         db.commit()
+        membership_cache.invalidate(group_id)
+        publish_notice("member_joined", member_ids, [group_id])
         return {"message": "Group created successfully", "group_id": group_id, "join_key": join_key}
     finally:
         cursor.close()
         db.close()
 
 @app.get("/groups")
-def get_user_groups(user_id: int = Depends(get_current_user)):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    try:
-        cursor.execute("""
+@query_budget(3)
+async def get_user_groups(request: Request, response: Response, user_id: int = Depends(get_current_user)):
+    async with get_async_db_cursor() as cursor:
+        # The user's group ids plus each group's version is enough to tell if the list changed
+        await cursor.execute("""
+            SELECT gm.group_id, gl.info_version
+            FROM group_members gm
+            JOIN group_list gl ON gl.id = gm.group_id
+            WHERE gm.user_id = %s
+            ORDER BY gm.group_id
+        """, (user_id,))
+        versions = [(row['group_id'], row['info_version']) for row in await cursor.fetchall()]
+        etag = make_etag("groups", user_id, versions)
+        cached = not_modified(request, response, etag)
+        if cached:
+            return cached
+
+        await cursor.execute("""
             SELECT gl.id AS group_id, gl.name AS group_name, gl.join_key,
                    CASE WHEN gl.creator_id = %s THEN 1 ELSE 0 END AS is_creator,
                    gm.is_admin
@@ -289,27 +661,103 @@ def get_user_groups(user_id: int = Depends(get_current_user)):
             WHERE gm.user_id = %s
         """, (user_id, user_id))
         
-        groups = cursor.fetchall()
+        groups = await cursor.fetchall()
+        
+        # Get the member usernames of all those groups in one query
+        await cursor.execute("""
+            SELECT gm.group_id, u.username, gm.is_admin,
+                   CASE WHEN gl.creator_id = u.id THEN 1 ELSE 0 END AS is_creator
+            FROM group_members mine
+            JOIN group_members gm ON gm.group_id = mine.group_id
+            JOIN users u ON gm.user_id = u.id
+            JOIN group_list gl ON gm.group_id = gl.id
+            WHERE mine.user_id = %s
+            ORDER BY gm.group_id, gm.is_admin DESC, u.username
+        """, (user_id,))
+        
+        members_by_group = {}
+        for member in await cursor.fetchall():
+            members_by_group.setdefault(member.pop('group_id'), []).append(member)
         
-        # For each group, get the member usernames
         for group in groups:
-            cursor.execute("""
-                SELECT u.username, gm.is_admin,
-                       CASE WHEN gl.creator_id = u.id THEN 1 ELSE 0 END AS is_creator
-                FROM group_members gm
-                JOIN users u ON gm.user_id = u.id
-                JOIN group_list gl ON gm.group_id = gl.id
-                WHERE gm.group_id = %s
-                ORDER BY gm.is_admin DESC, u.username
-            """, (group['group_id'],))
-            group['members'] = cursor.fetchall()
+            group['members'] = members_by_group.get(group['group_id'], [])
         
-        return groups
-    finally:
-        cursor.close()
-        db.close()
+        return json_response(request, groups, headers=response.headers)
+
+# EventSource can't send headers, so browsers open /updates with a ticket in
+# the query string. Access logs record the URL, so the ticket is short-lived
+# and good for nothing else, unlike the login token.
+STREAM_TICKET_SECONDS = 60
+
+@app.post("/updates/ticket")
+def create_stream_ticket(user_id: int = Depends(get_current_user)):
+    """Short-lived token for opening GET /updates?ticket="""
+    ticket = create_access_token({"user_id": user_id, "purpose": "updates"}, timedelta(seconds=STREAM_TICKET_SECONDS))
+    return {"ticket": ticket, "expires_in": STREAM_TICKET_SECONDS}
+
+def get_stream_user(request: Request, ticket: str | None = None):
+    """User from ?ticket= (see create_stream_ticket), or from the Authorization header like get_current_user()"""
+    if ticket:
+        payload = decode_token(ticket)
+        if payload.get("purpose") != "updates" or not payload.get("user_id"):
+            raise HTTPException(status_code=401, detail="Invalid stream ticket")
+        return payload["user_id"]
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return get_current_user(token)
+
+def follow_membership(subscription, user_id, notice):
+    """Keep a stream's group channels in step with the user's memberships"""
+    for group_id in notice["group_ids"]:
+        if notice["type"] == "member_joined" and user_id in notice["user_ids"]:
+            subscription.add(f"group:{group_id}")
+        elif notice["type"] == "group_deleted" or (notice["type"] == "member_kicked" and user_id in notice["user_ids"]):
+            subscription.remove(f"group:{group_id}")
+
+@app.get("/updates")
+@query_budget(1)
+async def stream_updates(user_id: int = Depends(get_stream_user)):
+    """Server-Sent Events stream of change notices for the user and their groups
+
+    Each notice names what changed (events_created, events_synced,
+    events_deleted, member_joined, member_kicked, ...) and the affected user
+    and group ids, so clients refetch only the lists that changed. A
+    "resync" notice means notices were dropped and everything should be refetched.
+    """
+    async with get_async_db_cursor() as cursor:
+        await cursor.execute("SELECT group_id FROM group_members WHERE user_id = %s", (user_id,))
+        group_ids = [row['group_id'] for row in await cursor.fetchall()]
+    subscription = broker.subscribe([f"user:{user_id}"] + [f"group:{g}" for g in group_ids])
+
+    async def generate():
+        # Runs until the client disconnects, which cancels the generator
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    notice = await asyncio.wait_for(subscription.get(), UPDATES_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if notice["type"] != "resync":
+                    follow_membership(subscription, user_id, notice)
+                yield encode_sse(notice)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        generate(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/updates/stats")
+def update_stream_stats():
+    """Open /updates streams and notices published by this process"""
+    return broker.stats()
 
 @app.post("/groups/join")
+@query_budget(4)
 def join_group(data: GroupJoin, user_id: int = Depends(get_current_user)):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
@@ -330,8 +778,11 @@ def join_group(data: GroupJoin, user_id: int = Depends(get_current_user)):
         # Add user to group
         cursor.execute("INSERT INTO group_members (group_id, user_id) VALUES (%s, %s)", 
                       (group["id"], user_id))
+        bump_group_versions(cursor, [group["id"]], calendar=True, info=True)
         
         db.commit()
+        membership_cache.invalidate(group["id"], user_id)
+        publish_notice("member_joined", [user_id], [group["id"]])
         
         return {"message": f"Successfully joined group '{group['name']}'", "group_id": group["id"]}
     finally:
@@ -341,39 +792,107 @@ def join_group(data: GroupJoin, user_id: int = Depends(get_current_user)):
 # Removed sync functions - groups now show live personal events instead of copies
 
 @app.get("/groups/{group_id}/events")
-def get_group_events(group_id: int, user_id: int = Depends(get_current_user)):
-    """Get all personal events from all group members (unified view)"""
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    try:
+@query_budget(3)
+async def get_group_events(
+    group_id: int,
+    request: Request,
+    response: Response,
+    window_from: datetime | None = Query(None, alias="from"),
+    window_to: datetime | None = Query(None, alias="to"),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user_id: int = Depends(get_current_user)
+):
+    """Get personal events from all group members (unified view), one page at a time
+
+    Pass the X-Next-Cursor response header back as `cursor` to get the next page.
+    """
+    async with get_async_db_cursor() as db_cursor:
         # Check if user is a member of the group
-        cursor.execute("""
-            SELECT 1 FROM group_members 
-            WHERE group_id = %s AND user_id = %s
-        """, (group_id, user_id))
-        
-        if not cursor.fetchone():
-            raise HTTPException(status_code=403, detail="You are not a member of this group")
+        await require_group_member_async(db_cursor, group_id, user_id)
+
+        version = await get_calendar_version(db_cursor, group_id)
+        etag = make_etag("group-events", group_id, version, window_from, window_to, cursor, limit)
+        cached = not_modified(request, response, etag)
+        if cached:
+            return cached
         
         # Get all personal events from all group members
         # This includes personal events (group_id IS NULL) and Google Calendar events
-        cursor.execute("""
+        page_sql, page_params = event_page_clause(window_from, window_to, cursor, limit)
+        await db_cursor.execute("""
             SELECT e.*, u.username as creator_username
             FROM events e
             JOIN users u ON e.user_id = u.id
             JOIN group_members gm ON e.user_id = gm.user_id
             WHERE gm.group_id = %s 
             AND (e.group_id IS NULL OR e.google_event_id IS NOT NULL)
-            ORDER BY e.start ASC
-        """, (group_id,))
+        """ + page_sql, [group_id] + page_params)
         
-        events = cursor.fetchall()
-        return events
+        return json_response(request, paginate_events(await db_cursor.fetchall(), limit, response), headers=response.headers)
+
+def close_stream(stream_cursor, db):
+    """Close an unbuffered cursor and always hand its connection back
+
+    Closing the cursor with rows still unread - the client disconnected
+    mid-stream - raises; the pool reads the leftover rows off on release.
+    """
+    try:
+        if stream_cursor is not None:
+            stream_cursor.close()
+    except mysql_errors.Error:
+        pass
     finally:
-        cursor.close()
         db.close()
 
+@app.get("/groups/{group_id}/events/stream")
+@query_budget(2)
+def stream_group_events(
+    group_id: int,
+    window_from: datetime | None = Query(None, alias="from"),
+    window_to: datetime | None = Query(None, alias="to"),
+    user_id: int = Depends(get_current_user)
+):
+    """Stream every group event in [from, to) as one JSON array
+
+    Rows are read from an unbuffered cursor and encoded in chunks, so memory
+    use does not grow with the size of the group's calendar.
+    """
+    db = get_db_connection()
+    db_cursor = db.cursor(dictionary=True)
+    stream_cursor = None
+    try:
+        require_group_member(db_cursor, group_id, user_id)
+        # Free the connection's result set before the unbuffered query starts
+        db_cursor.close()
+
+        window_sql, window_params = event_window_clause(window_from, window_to)
+        stream_cursor = db.cursor(dictionary=True, buffered=False)
+        stream_cursor.execute("""
+            SELECT e.*, u.username as creator_username
+            FROM events e
+            JOIN users u ON e.user_id = u.id
+            JOIN group_members gm ON e.user_id = gm.user_id
+            WHERE gm.group_id = %s 
+            AND (e.group_id IS NULL OR e.google_event_id IS NOT NULL)
+        """ + window_sql + " ORDER BY e.start ASC, e.id ASC", [group_id] + window_params)
+    except Exception:
+        close_stream(stream_cursor, db)
+        raise
+    finally:
+        db_cursor.close()
+
+    def generate():
+        # Keeps the connection checked out until the last row has been sent
+        try:
+            yield from iter_json_array(stream_cursor)
+        finally:
+            close_stream(stream_cursor, db)
+
+    return StreamingResponse(generate(), media_type="application/json")
+
 @app.get("/groups/search/{join_key}")
+@query_budget(1)
 def search_group(join_key: str, user_id: int = Depends(get_current_user)):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
@@ -399,19 +918,13 @@ def search_group(join_key: str, user_id: int = Depends(get_current_user)):
         db.close()
 
 @app.get("/groups/{group_id}/members")
+@query_budget(2)
 def get_group_members(group_id: int, user_id: int = Depends(get_current_user)):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
     try:
         # Check if user is a member of the group
-        cursor.execute("""
-            SELECT gm.is_admin FROM group_members gm 
-            WHERE gm.group_id = %s AND gm.user_id = %s
-        """, (group_id, user_id))
-        
-        member_status = cursor.fetchone()
-        if not member_status:
-            raise HTTPException(status_code=403, detail="You are not a member of this group")
+        is_admin = require_group_member(cursor, group_id, user_id)
         
         # Get all group members
         cursor.execute("""
@@ -428,30 +941,20 @@ def get_group_members(group_id: int, user_id: int = Depends(get_current_user)):
         return {
             "group_id": group_id,
             "members": members,
-            "user_is_admin": member_status["is_admin"]
+            "user_is_admin": is_admin
         }
     finally:
         cursor.close()
         db.close()
 
 @app.post("/groups/admin-action")
+@query_budget(4)
 def perform_admin_action(data: AdminAction, user_id: int = Depends(get_current_user)):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
     try:
         # Check if the requesting user is an admin of the group
-        cursor.execute("""
-            SELECT gm.is_admin, gl.creator_id
-            FROM group_members gm
-            JOIN group_list gl ON gm.group_id = gl.id
-            WHERE gm.group_id = %s AND gm.user_id = %s
-        """, (data.group_id, user_id))
-        
-        admin_status = cursor.fetchone()
-        if not admin_status:
-            raise HTTPException(status_code=403, detail="You are not a member of this group")
-        
-        if not admin_status["is_admin"]:
+        if not require_group_member(cursor, data.group_id, user_id):
             raise HTTPException(status_code=403, detail="You do not have admin privileges")
         
         # Don't allow actions on the group creator unless you are the creator
@@ -467,6 +970,7 @@ def perform_admin_action(data: AdminAction, user_id: int = Depends(get_current_u
                 WHERE group_id = %s AND user_id = %s
             """, (data.group_id, data.user_id))
             message = "User promoted to admin"
+            notice_type = "member_promoted"
             
         elif data.action == "demote":
             # Don't allow demoting the creator
@@ -478,6 +982,7 @@ def perform_admin_action(data: AdminAction, user_id: int = Depends(get_current_u
                 WHERE group_id = %s AND user_id = %s
             """, (data.group_id, data.user_id))
             message = "User demoted from admin"
+            notice_type = "member_demoted"
             
         elif data.action == "kick":
             # Don't allow kicking the creator
@@ -489,11 +994,15 @@ def perform_admin_action(data: AdminAction, user_id: int = Depends(get_current_u
                 WHERE group_id = %s AND user_id = %s
             """, (data.group_id, data.user_id))
             message = "User kicked from group"
+            notice_type = "member_kicked"
             
         else:
             raise HTTPException(status_code=400, detail="Invalid action")
         
+        bump_group_versions(cursor, [data.group_id], calendar=data.action == "kick", info=True)
         db.commit()
+        membership_cache.invalidate(data.group_id, data.user_id)
+        publish_notice(notice_type, [data.user_id], [data.group_id])
         return {"message": message}
         
     finally:
@@ -501,32 +1010,25 @@ def perform_admin_action(data: AdminAction, user_id: int = Depends(get_current_u
         db.close()
 
 @app.put("/groups/{group_id}/name")
+@query_budget(2)
 def update_group_name(group_id: int, data: GroupNameUpdate, user_id: int = Depends(get_current_user)):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
     try:
         # Check if user is an admin of the group
-        cursor.execute("""
-            SELECT gm.is_admin FROM group_members gm
-            WHERE gm.group_id = %s AND gm.user_id = %s
-        """, (group_id, user_id))
-        
-        admin_status = cursor.fetchone()
-        if not admin_status:
-            raise HTTPException(status_code=403, detail="You are not a member of this group")
-        
-        if not admin_status["is_admin"]:
+        if not require_group_member(cursor, group_id, user_id):
             raise HTTPException(status_code=403, detail="You do not have admin privileges")
         
         # Update the group name
         cursor.execute("""
-            UPDATE group_list SET name = %s WHERE id = %s
+            UPDATE group_list SET name = %s, info_version = info_version + 1 WHERE id = %s
         """, (data.name.strip(), group_id))
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Group not found")
         
         db.commit()
+        publish_notice("group_updated", group_ids=[group_id])
         return {"message": "Group name updated successfully"}
         
     finally:
@@ -534,6 +1036,7 @@ def update_group_name(group_id: int, data: GroupNameUpdate, user_id: int = Depen
         db.close()
 
 @app.delete("/groups/{group_id}")
+@query_budget(8)
 def delete_group(group_id: int, user_id: int = Depends(get_current_user)):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
@@ -551,6 +1054,8 @@ def delete_group(group_id: int, user_id: int = Depends(get_current_user)):
             raise HTTPException(status_code=403, detail="Only the group creator can delete the group")
         
         # Delete related events for this group
+        cursor.execute("SELECT DISTINCT user_id FROM events WHERE group_id = %s", (group_id,))
+        event_owners = [row["user_id"] for row in cursor.fetchall()]
         cursor.execute("DELETE FROM events WHERE group_id = %s", (group_id,))
         
         # Delete group members
@@ -558,8 +1063,14 @@ def delete_group(group_id: int, user_id: int = Depends(get_current_user)):
         
         # Delete the group itself
         cursor.execute("DELETE FROM group_list WHERE id = %s", (group_id,))
+        owner_group_ids = bump_user_calendars(cursor, event_owners)
         
         db.commit()
+        membership_cache.invalidate(group_id)
+        busy_index.invalidate(*event_owners)
+        publish_notice("group_deleted", group_ids=[group_id])
+        if event_owners:
+            publish_notice("events_deleted", event_owners, owner_group_ids)
         return {"message": "Group deleted successfully"}
         
     finally:
@@ -567,40 +1078,130 @@ def delete_group(group_id: int, user_id: int = Depends(get_current_user)):
         db.close()
 
 @app.get("/events", response_model=list[EventOut])
-def get_events(user_id: int = Depends(get_current_user)):
+@query_budget(2)
+async def get_events(
+    request: Request,
+    response: Response,
+    window_from: datetime | None = Query(None, alias="from"),
+    window_to: datetime | None = Query(None, alias="to"),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user_id: int = Depends(get_current_user)
+):
+    """Get the user's events, optionally limited to [from, to), one page at a time
+
+    Pass the X-Next-Cursor response header back as `cursor` to get the next page.
+    Rows are encoded as selected, bypassing the response_model validation.
+    """
+    async with get_async_db_cursor() as db_cursor:
+        await db_cursor.execute("SELECT events_version FROM users WHERE id = %s", (user_id,))
+        row = await db_cursor.fetchone()
+        etag = make_etag("events", user_id, row["events_version"] if row else 0, window_from, window_to, cursor, limit)
+        cached = not_modified(request, response, etag)
+        if cached:
+            return cached
+
+        page_sql, page_params = event_page_clause(window_from, window_to, cursor, limit)
+        # Exactly the EventOut fields, so the response matches the declared model
+        await db_cursor.execute("""
+            SELECT e.id, e.title, e.start, e.end_time, e.location, e.color, e.group_id, e.google_event_id
+            FROM events e WHERE e.user_id = %s
+        """ + page_sql, [user_id] + page_params)
+        return json_response(request, paginate_events(await db_cursor.fetchall(), limit, response), headers=response.headers)
+
+MAX_BULK_EVENTS = 1000
+
+def insert_events(cursor, events: list[EventIn]):
+    """Insert events and their attendee copies with one lookup and two multi-row INSERTs
+
+    Returns the creators' rows in the same order as `events`, and the
+    inserted (start, end_time) spans keyed by the user who got them.
+    """
+    emails = {email.lower() for event in events for email in event.friend_emails}
+    user_id_by_email = {}
+    if emails:
+        placeholders = ", ".join(["%s"] * len(emails))
+        cursor.execute(f"SELECT id, email FROM users WHERE email IN ({placeholders})", tuple(emails))
+        user_id_by_email = {row["email"].lower(): row["id"] for row in cursor.fetchall()}
+
+    def values(event, uid):
+        return (event.title, event.start, event.end_time, event.location, event.color, uid, event.group_id)
+
+    insert_sql = """
+        INSERT INTO events (title, start, end_time, location, color, user_id, group_id) 
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """
+    cursor.executemany(insert_sql, [values(event, event.user_id) for event in events])
+    # A multi-row INSERT gets a consecutive block of ids starting at lastrowid
+    first_id = cursor.lastrowid
+
+    attendee_rows = []
+    spans_by_user = {}
+    for event in events:
+        spans_by_user.setdefault(event.user_id, []).append((event.start, event.end_time))
+        attendee_ids = {user_id_by_email[e.lower()] for e in event.friend_emails if e.lower() in user_id_by_email}
+        attendee_ids.discard(event.user_id)
+        attendee_rows += [values(event, uid) for uid in sorted(attendee_ids)]
+        for uid in attendee_ids:
+            spans_by_user.setdefault(uid, []).append((event.start, event.end_time))
+    if attendee_rows:
+        cursor.executemany(insert_sql, attendee_rows)
+
+    return [
+        {
+            "id": first_id + i,
+            "title": event.title,
+            "start": event.start,
+            "end_time": event.end_time,
+            "location": event.location,
+            "color": event.color,
+            "group_id": event.group_id,
+            "google_event_id": None,
+        }
+        for i, event in enumerate(events)
+    ], spans_by_user
+
+@app.post("/events", response_model=EventOut)
+@query_budget(7)
+def create_event(event: EventIn):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
     try:
-        # Get all events for the user - let frontend handle date filtering to avoid timezone issues
-        cursor.execute("SELECT * FROM events WHERE user_id = %s", (user_id,))
-        events = cursor.fetchall()
-        return events
+        created, spans_by_user = insert_events(cursor, [event])
+        group_ids = bump_user_calendars(cursor, spans_by_user)
+        versions = read_event_versions(cursor, list(spans_by_user))
+        db.commit()
+        busy_index.add_events(spans_by_user, versions)
+        publish_notice("events_created", spans_by_user, group_ids, event_ids=[created[0]["id"]])
+        return created[0]
     finally:
         cursor.close()
         db.close()
 
-@app.post("/events", response_model=EventOut)
-def create_event(event: EventIn):
+@app.post("/events/bulk", response_model=list[EventOut])
+@query_budget(7)
+def create_events_bulk(events: list[EventIn], user_id: int = Depends(get_current_user)):
+    """Create many of the current user's events in a single transaction"""
+    if len(events) > MAX_BULK_EVENTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_EVENTS} events per request")
+    if any(event.user_id != user_id for event in events):
+        raise HTTPException(status_code=403, detail="Events can only be created in your own calendar")
+    if not events:
+        return []
+
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
     try:
-        user_ids = [event.user_id]
-
-        for email in event.friend_emails:
-            cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
-            friend = cursor.fetchone()
-            if friend:
-                user_ids.append(friend["id"])
-
-        for uid in set(user_ids):
-            cursor.execute("""
-                INSERT INTO events (title, start, end_time, location, color, user_id, group_id) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (event.title, event.start, event.end_time, event.location, event.color, uid, event.group_id))
+        created, spans_by_user = insert_events(cursor, events)
+        group_ids = bump_user_calendars(cursor, spans_by_user)
+        versions = read_event_versions(cursor, list(spans_by_user))
         db.commit()
-
-        cursor.execute("SELECT * FROM events WHERE user_id = %s ORDER BY id DESC LIMIT 1", (event.user_id,))
-        return cursor.fetchone()
+        busy_index.add_events(spans_by_user, versions)
+        publish_notice("events_created", spans_by_user, group_ids, event_ids=[e["id"] for e in created])
+        return created
+    except mysql_errors.Error:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Failed to create events")
     finally:
         cursor.close()
         db.close()
@@ -639,6 +1240,7 @@ def google_login(user_id: int = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=f"Failed to generate auth URL: {str(e)}")
 
 @app.get("/auth/google/callback")
+@query_budget(1)
 def google_callback(code: str, state: str):
     try:
         user_id = int(state)
@@ -660,7 +1262,8 @@ def google_callback(code: str, state: str):
         )
         flow.redirect_uri = GOOGLE_REDIRECT_URI
         
-        flow.fetch_token(code=code)
+        with metrics.google_call("oauth2.token"):
+            flow.fetch_token(code=code)
         
         credentials = flow.credentials
         
@@ -671,20 +1274,22 @@ def google_callback(code: str, state: str):
                 UPDATE users SET 
                 google_access_token = %s,
                 google_refresh_token = %s,
+                google_sync_token = NULL,
                 google_calendar_connected = TRUE
                 WHERE id = %s
             """, (credentials.token, credentials.refresh_token, user_id))
             db.commit()
+            calendar_clients.invalidate(user_id)
         finally:
             cursor.close()
             db.close()
         
         
-        # Trigger Google Calendar sync after successful connection
+        # Sync in the background so the browser is redirected right away
         try:
-            sync_google_calendar_events(user_id)
-        except Exception as sync_error:
-            # Don't fail the OAuth flow if sync fails
+            sync_jobs.submit(user_id, reason="connected")
+        except QueueFull:
+            # Don't fail the OAuth flow; the periodic re-sync will pick the user up
             pass
         
         return RedirectResponse(url="http://localhost:3000/calendar?connected=true")
@@ -694,107 +1299,100 @@ def google_callback(code: str, state: str):
         traceback.print_exc()
         return RedirectResponse(url="http://localhost:3000/calendar?error=auth_failed")
 
-def sync_google_calendar_events(user_id: int):
-    """Sync Google Calendar events to the database"""
+def sync_google_calendar_events(user_id: int, throttle=None):
+    """Sync Google Calendar events to the database
+
+    Uses the stored sync token to fetch only what changed since the last sync,
+    and falls back to a full resync when there is no token or Google expired it.
+    Runs on the sync worker pool; `throttle` rate-limits the Google API calls.
+    """
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
     try:
-        cursor.execute("SELECT google_access_token, google_refresh_token FROM users WHERE id = %s", (user_id,))
+        cursor.execute("""
+            SELECT google_access_token, google_refresh_token, google_sync_token
+            FROM users WHERE id = %s
+        """, (user_id,))
         user = cursor.fetchone()
         
         if not user or not user.get('google_access_token'):
             return
         
-        from google.oauth2.credentials import Credentials
-        
-        credentials = Credentials(
-            token=user['google_access_token'],
-            refresh_token=user['google_refresh_token'],
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=GOOGLE_CLIENT_ID,
-            client_secret=GOOGLE_CLIENT_SECRET
+        service, credentials = calendar_clients.get(
+            user_id, user['google_access_token'], user['google_refresh_token']
         )
         
-        service = build('calendar', 'v3', credentials=credentials)
-        
-        # Fetch events from start of current year to end of next year
-        current_year = datetime.now().year
-        start_of_year = datetime(current_year, 1, 1).isoformat() + 'Z'
-        end_of_next_year = datetime(current_year + 1, 12, 31, 23, 59, 59).isoformat() + 'Z'
-        
-        
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=start_of_year,
-            timeMax=end_of_next_year,
-            maxResults=100,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        synced_count = 0
-        skipped_count = 0
-        
-        for event in events:
-            google_event_id = event.get('id')
-            start = event['start'].get('dateTime', event['start'].get('date'))
-            end_time = event['end'].get('dateTime', event['end'].get('date')) if 'end' in event else None
-            event_title = event.get('summary', 'No Title')
-            location = event.get('location', '')
-            
-            # Check if event already exists for this user
-            cursor.execute("SELECT id FROM events WHERE google_event_id = %s AND user_id = %s", (google_event_id, user_id))
-            existing_event = cursor.fetchone()
-            
-            if existing_event:
-                skipped_count += 1
-                continue
-            
-            # Parse datetime strings to datetime objects
-            try:
-                # Handle both datetime and date formats
-                if 'T' in start:
-                    start_dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
-                else:
-                    start_dt = datetime.strptime(start, '%Y-%m-%d')
-                
-                end_dt = None
-                if end_time:
-                    if 'T' in end_time:
-                        end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-                    else:
-                        end_dt = datetime.strptime(end_time, '%Y-%m-%d')
-                
-                # Insert new Google event into database
-                cursor.execute("""
-                    INSERT INTO events (title, start, end_time, location, color, user_id, google_event_id)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """, (event_title, start_dt, end_dt, location, '#4285f4', user_id, google_event_id))
-                
-                synced_count += 1
-                
-            except Exception as parse_error:
-                continue
+        next_sync_token, changed = sync_calendar(cursor, user_id, service, user['google_sync_token'], throttle)
+        cursor.execute("UPDATE users SET google_sync_token = %s WHERE id = %s", (next_sync_token, user_id))
         
+        # Keep a refreshed access token so later syncs don't have to refresh again
+        if credentials.token and credentials.token != user['google_access_token']:
+            cursor.execute("UPDATE users SET google_access_token = %s WHERE id = %s", (credentials.token, user_id))
+        group_ids = bump_user_calendars(cursor, [user_id]) if changed else []
         db.commit()
+        if changed:
+            busy_index.invalidate(user_id)
+            publish_notice("events_synced", [user_id], group_ids)
         
-    except Exception as e:
+    except Exception:
         db.rollback()
+        raise
     finally:
         cursor.close()
         db.close()
 
-@app.post("/auth/google/sync")
+def list_google_connected_users():
+    db = get_db_connection()
+    cursor = db.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT id FROM users WHERE google_calendar_connected = TRUE")
+        return [row["id"] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        db.close()
+
+sync_jobs = SyncJobQueue(
+    sync_google_calendar_events,
+    workers=int(os.getenv("GOOGLE_SYNC_WORKERS", "4")),
+    max_queued=int(os.getenv("GOOGLE_SYNC_QUEUE_SIZE", "100")),
+    global_rate=float(os.getenv("GOOGLE_API_RATE", "10")),
+    user_rate=float(os.getenv("GOOGLE_API_USER_RATE", "2"))
+)
+GOOGLE_RESYNC_INTERVAL_MINUTES = int(os.getenv("GOOGLE_RESYNC_INTERVAL_MINUTES", "30"))
+
+@app.on_event("startup")
+def start_sync_workers():
+    sync_jobs.start()
+    if GOOGLE_RESYNC_INTERVAL_MINUTES > 0:
+        sync_jobs.schedule_periodic(list_google_connected_users, GOOGLE_RESYNC_INTERVAL_MINUTES * 60)
+
+@app.on_event("shutdown")
+def stop_sync_workers():
+    sync_jobs.stop()
+
+@app.post("/auth/google/sync", status_code=202)
 def sync_google_calendar(user_id: int = Depends(get_current_user)):
-    """Manually trigger Google Calendar sync"""
+    """Queue a Google Calendar sync - poll /auth/google/sync/status for the outcome"""
     try:
-        sync_google_calendar_events(user_id)
-        return {"message": "Google Calendar sync completed successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Failed to sync Google Calendar")
+        job = sync_jobs.submit(user_id)
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Too many syncs in progress, try again shortly")
+    return {"message": "Google Calendar sync queued", "job": job}
+
+@app.get("/auth/google/sync/status")
+def get_sync_status(user_id: int = Depends(get_current_user)):
+    """Most recent sync job for the current user"""
+    return sync_jobs.latest_for_user(user_id) or {"status": "none"}
+
+@app.get("/auth/google/sync/jobs/{job_id}")
+def get_sync_job(job_id: int, user_id: int = Depends(get_current_user)):
+    job = sync_jobs.get(job_id)
+    if not job or job["user_id"] != user_id:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
 
 @app.get("/auth/google/events")
+@query_budget(1)
 def get_google_calendar_events(user_id: int = Depends(get_current_user)):
     """Legacy endpoint - now returns events from database instead of Google API"""
     db = get_db_connection()
@@ -823,13 +1421,15 @@ def get_google_calendar_events(user_id: int = Depends(get_current_user)):
         
         return formatted_events
         
-    except Exception as e:
+    except Exception:
+        traceback.print_exc()
         raise HTTPException(status_code=500, detail="Failed to fetch Google Calendar events")
     finally:
         cursor.close()
         db.close()
 
 @app.post("/auth/google/disconnect")
+@query_budget(5)
 def disconnect_google_calendar(user_id: int = Depends(get_current_user)):
     db = get_db_connection()
     cursor = db.cursor(dictionary=True)
@@ -843,10 +1443,16 @@ def disconnect_google_calendar(user_id: int = Depends(get_current_user)):
             UPDATE users SET 
             google_access_token = NULL,
             google_refresh_token = NULL,
+            google_sync_token = NULL,
             google_calendar_connected = FALSE
             WHERE id = %s
         """, (user_id,))
+        group_ids = bump_user_calendars(cursor, [user_id]) if deleted_events else []
         db.commit()
+        calendar_clients.invalidate(user_id)
+        if deleted_events:
+            busy_index.invalidate(user_id)
+            publish_notice("events_deleted", [user_id], group_ids)
         
         return {"message": f"Google Calendar disconnected successfully. Removed {deleted_events} Google events."}
     finally:
@@ -861,170 +1467,125 @@ class AvailabilityRequest(BaseModel):
     min_continuous_hours: int | None = None  # Optional: minimum continuous hours required
 
 @app.post("/groups/{group_id}/availability")
-def calculate_group_availability(
+@query_budget(4)
+async def calculate_group_availability(
     group_id: int, 
     request: AvailabilityRequest,
     user_id: int = Depends(get_current_user)
 ):
-    """Calculate when group members are available for a given time range"""
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    try:
+    """Calculate when group members are available for a given time range
+
+    Per-date results are cached against the group's calendar version, so only
+    dates not answered since the calendar last changed are computed.
+    """
+    dates = requested_dates(request.days_of_week, request.weeks_ahead, datetime.now().date())
+    date_strs = [d.strftime('%Y-%m-%d') for d in dates]
+    params = (request.start_time, request.end_time, request.min_continuous_hours)
+
+    async with get_async_db_cursor() as cursor:
         # Check if user is a member of the group
-        cursor.execute("""
-            SELECT 1 FROM group_members 
-            WHERE group_id = %s AND user_id = %s
-        """, (group_id, user_id))
-        
-        if not cursor.fetchone():
-            raise HTTPException(status_code=403, detail="You are not a member of this group")
+        await require_group_member_async(cursor, group_id, user_id)
+
+        # Read the version before the events so a concurrent change can't be cached under it
+        version = await get_calendar_version(cursor, group_id)
+        cached, missing = availability_cache.get_many(group_id, version, params, date_strs)
+        if not missing:
+            return cached
+        missing = set(missing)
+        dates = [d for d, date_str in zip(dates, date_strs) if date_str in missing]
         
         # Get all group members
-        cursor.execute("""
-            SELECT u.id, u.username 
+        await cursor.execute("""
+            SELECT u.id, u.username, u.events_version
             FROM users u
             JOIN group_members gm ON u.id = gm.user_id
             WHERE gm.group_id = %s
         """, (group_id,))
         
-        group_members = cursor.fetchall()
+        group_members = await cursor.fetchall()
         total_members = len(group_members)
         
         if total_members == 0:
             return {}
-        
-        # Generate dates for the next few weeks
-        from datetime import datetime, timedelta
-        import calendar
-        
-        availability = {}
-        today = datetime.now().date()
-        
-        for week_offset in range(request.weeks_ahead):
-            # Check each day in the week
-            for days_ahead in range(7 * week_offset, 7 * (week_offset + 1)):
-                check_date = today + timedelta(days=days_ahead)
-                day_of_week = check_date.weekday()  # 0=Monday, 6=Sunday
-                
-                # Convert to our format (0=Sunday, 1=Monday, etc.)
-                day_of_week_sunday_first = (day_of_week + 1) % 7
-                
-                # Skip if not in selected days
-                if day_of_week_sunday_first not in request.days_of_week:
-                    continue
-                
-                date_str = check_date.strftime('%Y-%m-%d')
-                
-                if request.min_continuous_hours:
-                    available_count = calculate_continuous_availability(
-                        cursor, group_members, date_str, 
-                        request.start_time, request.end_time, 
-                        request.min_continuous_hours
-                    )
-                else:
-                    # Count available members for this date/time (any time in range)
-                    available_count = 0
-                    
-                    for member in group_members:
-                        # Check if member has any conflicting events
-                        cursor.execute("""
-                            SELECT COUNT(*) as conflict_count
-                            FROM events 
-                            WHERE user_id = %s 
-                            AND DATE(start) = %s
-                            AND (
-                                (TIME(start) < %s AND TIME(COALESCE(end_time, start)) > %s) OR
-                                (TIME(start) >= %s AND TIME(start) < %s) OR
-                                (TIME(COALESCE(end_time, start)) > %s AND TIME(COALESCE(end_time, start)) <= %s)
-                            )
-                        """, (
-                            member['id'], 
-                            date_str,
-                            request.end_time, request.start_time,  # event ends after start or starts before end
-                            request.start_time, request.end_time,  # event starts within range
-                            request.start_time, request.end_time   # event ends within range
-                        ))
-                        
-                        conflict_count = cursor.fetchone()['conflict_count']
-                        
-                        if conflict_count == 0:
-                            available_count += 1
-                
-                availability[date_str] = available_count
-        
-        return availability
-        
+
+        # Members' busy time for the missing dates, from the busy index
+        events = await load_busy_intervals_async(
+            cursor, {member['id']: member['events_version'] for member in group_members},
+            datetime.combine(min(dates), datetime.min.time()),
+            datetime.combine(max(dates) + timedelta(days=1), datetime.min.time())
+        )
+
+    # The number crunching runs in the threadpool to keep the event loop free
+    if request.min_continuous_hours:
+        computed = await run_in_threadpool(
+            calculate_continuous_availability,
+            events, [member['id'] for member in group_members], dates,
+            request.start_time, request.end_time,
+            request.min_continuous_hours
+        )
+    else:
+        def count_available():
+            # Count available members for this date/time (any time in range)
+            windows = daily_windows(dates, request.start_time, request.end_time)
+            busy = busy_members_by_window(events, windows)
+            return {date_str: total_members - len(busy.get(date_str, ())) for date_str, _, _ in windows}
+
+        computed = await run_in_threadpool(count_available)
+
+    availability_cache.set_many(group_id, version, params, computed)
+    return {date_str: cached[date_str] if date_str in cached else computed[date_str] for date_str in date_strs}
+
+class MeetingSlotRequest(BaseModel):
+    start_time: str  # HH:MM format
+    end_time: str    # HH:MM format
+    days_of_week: list[int]  # 0=Sunday, 1=Monday, etc.
+    weeks_ahead: int = 4
+    duration_minutes: int = 60
+    limit: int = 10
+
+MAX_MEETING_SLOTS = 50
+
+@app.post("/groups/{group_id}/best-slots")
+@query_budget(3)
+def find_best_meeting_slots(
+    group_id: int,
+    request: MeetingSlotRequest,
+    user_id: int = Depends(get_current_user)
+):
+    """Rank concrete meeting windows by how many group members are free"""
+    if request.duration_minutes <= 0:
+        raise HTTPException(status_code=400, detail="duration_minutes must be positive")
+
+    db = get_db_connection()
+    cursor = db.cursor(dictionary=True)
+    try:
+        # Check if user is a member of the group
+        require_group_member(cursor, group_id, user_id)
+
+        cursor.execute("""
+            SELECT gm.user_id, u.events_version
+            FROM group_members gm
+            JOIN users u ON u.id = gm.user_id
+            WHERE gm.group_id = %s
+        """, (group_id,))
+        versions = {row['user_id']: row['events_version'] for row in cursor.fetchall()}
+        member_ids = list(versions)
+
+        dates = requested_dates(request.days_of_week, request.weeks_ahead, datetime.now().date())
+        if not dates or not member_ids:
+            return []
+
+        events = load_busy_intervals(
+            cursor, versions,
+            datetime.combine(min(dates), datetime.min.time()),
+            datetime.combine(max(dates) + timedelta(days=1), datetime.min.time())
+        )
+        windows = daily_windows(dates, request.start_time, request.end_time)
+        return best_meeting_slots(
+            events, member_ids, windows,
+            timedelta(minutes=request.duration_minutes),
+            max(1, min(request.limit, MAX_MEETING_SLOTS))
+        )
     finally:
         cursor.close()
         db.close()
-
-def calculate_continuous_availability(cursor, group_members, date_str, start_time, end_time, min_hours):
-    """Calculate availability for continuous time blocks"""
-    from datetime import datetime, timedelta
-    
-    start_dt = datetime.strptime(start_time, '%H:%M').time()
-    end_dt = datetime.strptime(end_time, '%H:%M').time()
-    
-    # Create time slots (15-minute intervals)
-    slots = []
-    current = datetime.combine(datetime.today(), start_dt)
-    end_datetime = datetime.combine(datetime.today(), end_dt)
-    
-    while current < end_datetime:
-        slots.append(current.time())
-        current += timedelta(minutes=15)
-    
-    # For each member, find their availability across all slots
-    member_availability = {}
-    
-    for member in group_members:
-        # Get all events for this member on this date
-        cursor.execute("""
-            SELECT TIME(start) as start_time, TIME(COALESCE(end_time, start)) as end_time
-            FROM events 
-            WHERE user_id = %s AND DATE(start) = %s
-            ORDER BY start
-        """, (member['id'], date_str))
-        
-        events = cursor.fetchall()
-        member_free_slots = []
-        
-        # Check each slot for availability
-        for slot in slots:
-            is_free = True
-            for event in events:
-                event_start = event['start_time']
-                event_end = event['end_time']
-                
-                # Check if slot conflicts with event
-                slot_end = (datetime.combine(datetime.today(), slot) + timedelta(minutes=15)).time()
-                
-                if (slot < event_end and slot_end > event_start):
-                    is_free = False
-                    break
-            
-            member_free_slots.append(is_free)
-        
-        member_availability[member['id']] = member_free_slots
-    
-    # Find continuous blocks that meet the minimum hours requirement
-    required_slots = min_hours * 4  # 15-minute slots
-    max_available = 0
-    
-    # Check each possible continuous block
-    for start_idx in range(len(slots) - required_slots + 1):
-        available_count = 0
-        
-        for member_id in member_availability:
-            # Check if this member is free for the entire block
-            is_free_for_block = all(
-                member_availability[member_id][i] 
-                for i in range(start_idx, start_idx + required_slots)
-            )
-            
-            if is_free_for_block:
-                available_count += 1
-        
-        max_available = max(max_available, available_count)
-    
-    return max_available
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""In-process cache of group membership and admin rights"""
+import threading
+import time
+from collections import OrderedDict
+
+NOT_CACHED = object()
+
+
+class MembershipCache:
+    """LRU cache with a TTL mapping (group_id, user_id) to the member's is_admin flag
+
+    Non-members are cached as None, so repeated 403s don't hit the database
+    either. Handlers that change group_members must call invalidate(); the
+    TTL only bounds staleness from writes made outside this process.
+
+    A fill takes the key's generation() before reading the row and hands it
+    to set(), which drops the value if an invalidation came in between: the
+    row may predate that write, and would otherwise be served for a full TTL.
+    """
+
+    def __init__(self, max_size=4096, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (group_id, user_id) -> (is_admin, cached_at)
+        # Bumped by invalidate(), per member and per group
+        self._member_generations = {}
+        self._group_generations = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, group_id, user_id):
+        """Cached is_admin flag, None for a non-member, or NOT_CACHED"""
+        key = (group_id, user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[1] >= self.ttl:
+                self._entries.pop(key, None)
+                self._misses += 1
+                return NOT_CACHED
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def _generation(self, group_id, user_id):
+        return self._group_generations.get(group_id, 0), self._member_generations.get((group_id, user_id), 0)
+
+    def generation(self, group_id, user_id):
+        """Marker to pass to set(); changes whenever the entry is invalidated"""
+        with self._lock:
+            return self._generation(group_id, user_id)
+
+    def set(self, group_id, user_id, is_admin, generation):
+        """Cache the flag read after generation() returned `generation`, unless invalidated since"""
+        with self._lock:
+            if self._generation(group_id, user_id) != generation:
+                return
+            self._entries[(group_id, user_id)] = (is_admin, time.monotonic())
+            self._entries.move_to_end((group_id, user_id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, group_id, user_id=None):
+        """Drop one member's entry, or every entry of the group when user_id is None"""
+        with self._lock:
+            if user_id is not None:
+                key = (group_id, user_id)
+                self._member_generations[key] = self._member_generations.get(key, 0) + 1
+                self._entries.pop(key, None)
+                return
+            self._group_generations[group_id] = self._group_generations.get(group_id, 0) + 1
+            for key in [key for key in self._entries if key[0] == group_id]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,306 @@
+"""Request latency, database and Google API metrics in Prometheus text format
+
+Kept in-process and dependency-free: a histogram observation is a bisect
+and a few integer updates under a lock, and a query only bumps its
+request's own counters, so instrumenting every request and query stays in
+the low microseconds (see benchmarks/metrics_overhead.py). The exposition
+text is only built when /metrics is scraped.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Prometheus histogram with one series per combination of label values"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [per-bucket counts (last is +Inf), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][index] += 1
+            series[1] += value
+
+    def expose(self):
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = (("le", _number(bound)),)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Prometheus counter with one value per combination of label values"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def expose(self):
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in snapshot)
+        return lines
+
+
+class RequestStats:
+    """Database work done on behalf of the current request
+
+    `statements` collects statement shapes only while query auditing is on.
+    """
+
+    __slots__ = ("queries", "db_seconds", "scope", "statements")
+
+    def __init__(self, scope, audit=False):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.scope = scope
+        self.statements = [] if audit else None
+
+
+# Set by MetricsMiddleware; threadpool calls run in a copy of the request's
+# context, so queries made there still find (and update) the same object
+_request_stats = ContextVar("request_stats", default=None)
+
+
+class Metrics:
+    """All application metrics, plus collectors read only at scrape time"""
+
+    def __init__(self, auditor=None):
+        self.auditor = auditor  # query_audit.QueryAuditor, optional
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Time to handle a request, until the response is sent",
+            ("method", "route", "status"))
+        self.request_queries = Histogram(
+            "http_request_db_queries", "Database queries executed per request",
+            ("method", "route"), QUERY_COUNT_BUCKETS)
+        self.request_db_time = Histogram(
+            "http_request_db_seconds", "Time per request spent in database queries",
+            ("method", "route"))
+        # Request queries only touch the request's RequestStats; the shared
+        # series are updated once, when the request finishes
+        self.background_queries = Counter(
+            "db_background_queries_total", "Database queries made outside any request (sync jobs)")
+        self.background_db_time = Counter(
+            "db_background_query_seconds_total", "Time in database queries made outside any request")
+        self.pool_wait = Histogram(
+            "db_pool_wait_seconds", "Time spent waiting to check out a pooled connection",
+            ("pool",), WAIT_BUCKETS)
+        self.google_calls = Histogram(
+            "google_api_request_duration_seconds", "Google API call latency by method and outcome",
+            ("method", "outcome"))
+        self._families = [
+            self.request_duration, self.request_queries, self.request_db_time,
+            self.background_queries, self.background_db_time, self.pool_wait, self.google_calls,
+        ]
+        self._collectors = []
+
+    def observe_request(self, method, route, status, seconds, stats):
+        self.request_duration.observe(seconds, method, route, str(status))
+        self.request_queries.observe(stats.queries, method, route)
+        self.request_db_time.observe(stats.db_seconds, method, route)
+        if stats.statements is not None:
+            self.auditor.finish_request(method, route, stats)
+
+    def observe_query(self, seconds, statement=(), ok=True):
+        """Account one execute(); `statement` is its arguments, and `ok` whether it succeeded, for the auditor"""
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+        else:
+            self.background_queries.inc()
+            self.background_db_time.inc(seconds)
+        auditor = self.auditor
+        if auditor is not None and (auditor.enabled or seconds >= auditor.slow_query_seconds):
+            auditor.on_query(stats, statement, seconds, ok)
+
+    def observe_pool_wait(self, pool, seconds):
+        self.pool_wait.observe(seconds, pool)
+
+    def observe_google_call(self, method, seconds, ok):
+        self.google_calls.observe(seconds, method or "unknown", "ok" if ok else "error")
+
+    @contextmanager
+    def google_call(self, method):
+        """Time a Google call that doesn't go through a Calendar service object"""
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.observe_google_call(method, time.perf_counter() - started, ok)
+
+    def register_gauges(self, name, documentation, labelnames, read, metric_type="gauge"):
+        """Expose values computed at scrape time
+
+        `read()` returns an iterable of (label values tuple, value).
+        """
+        self._collectors.append((name, documentation, tuple(labelnames), read, metric_type))
+
+    def render(self):
+        lines = []
+        for family in self._families:
+            lines.extend(family.expose())
+        for name, documentation, labelnames, read, metric_type in self._collectors:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in read():
+                lines.append(f"{name}{_labels(labelnames, labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and database work per route template
+
+    Routes are labelled by their template ("/groups/{group_id}/events"), so
+    the number of series stays bounded; requests matching no route share
+    one label. Plain ASGI rather than BaseHTTPMiddleware, which would add a
+    task and a memory stream to every request.
+    """
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        auditor = self.metrics.auditor
+        stats = RequestStats(scope, auditor is not None and auditor.enabled)
+        token = _request_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            self.metrics.observe_request(scope["method"], route, status, elapsed, stats)
+
+
+class TimedCursor:
+    """mysql-connector cursor proxy reporting each execute() to Metrics
+
+    Buffered cursors (the default here) read every row inside execute(), so
+    that is the query time. Only fetchmany(), which the unbuffered streaming
+    cursor uses, is timed as well, adding to the request's DB time.
+    """
+
+    def __init__(self, cursor, metrics):
+        self._cursor = cursor
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        # Only for rarely used attributes (rowcount, lastrowid): a failed
+        # lookup costs about a microsecond, so hot methods are defined below
+        return getattr(self._cursor, name)
+
+    def execute(self, *args):
+        started, ok = time.perf_counter(), False
+        try:
+            result = self._cursor.execute(*args)
+            ok = True
+            return result
+        finally:
+            self._metrics.observe_query(time.perf_counter() - started, args, ok)
+
+    def executemany(self, *args):
+        started, ok = time.perf_counter(), False
+        try:
+            result = self._cursor.executemany(*args)
+            ok = True
+            return result
+        finally:
+            self._metrics.observe_query(time.perf_counter() - started, args, ok)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        return self._cursor.close()
+
+    def fetchmany(self, *args):
+        started = time.perf_counter()
+        try:
+            return self._cursor.fetchmany(*args)
+        finally:
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.db_seconds += time.perf_counter() - started
+
+
+class AsyncTimedCursor(TimedCursor):
+    """TimedCursor for aiomysql, whose execute() is a coroutine"""
+
+    async def execute(self, *args):
+        started, ok = time.perf_counter(), False
+        try:
+            result = await self._cursor.execute(*args)
+            ok = True
+            return result
+        finally:
+            self._metrics.observe_query(time.perf_counter() - started, args, ok)
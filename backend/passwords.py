@@ -0,0 +1,105 @@
+"""bcrypt hashing on a dedicated process pool
+
+bcrypt is deliberately slow CPU work. Running it in request threads lets a
+burst of logins take over the threadpool (and the GIL), so hashes are
+computed in worker processes instead, with a cap on how many may be queued.
+
+Workers are started with forkserver (spawn where that is unavailable), not
+fork: by the time the first password is hashed the server process runs
+several threads, and forking a threaded process can deadlock the child.
+
+The public methods are coroutines: they await the worker's result instead
+of parking a threadpool thread on it for the length of a bcrypt round.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool already has `max_pending` calls in flight,
+    or lost a worker process and is being restarted"""
+
+
+def _start_method():
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode()
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+def hash_cost(hashed):
+    """Work factor recorded in a bcrypt hash, e.g. 12 for '$2b$12$...'"""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Bounded bcrypt pool: `workers` processes, at most `max_pending` calls queued or running
+
+    Callers await their result; a call that would exceed the limit fails
+    fast with HasherBusy instead of waiting. If a worker process
+    dies, the calls in flight fail with HasherBusy and the next call starts a
+    fresh pool.
+    """
+
+    def __init__(self, rounds=12, workers=2, max_pending=16):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    async def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy("Too many password hashes in progress")
+        executor = None
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context(_start_method())
+                    )
+                executor = self._executor
+                future = executor.submit(fn, *args)
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise HasherBusy("Password hashing workers are restarting")
+        finally:
+            self._slots.release()
+
+    def _discard(self, executor):
+        """Drop a broken executor, unless another call already replaced it"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def hash(self, password):
+        return await self._submit(_hash, password.encode(), self.rounds)
+
+    async def verify(self, password, hashed):
+        return await self._submit(_check, password.encode(), hashed.encode())
+
+    def needs_rehash(self, hashed):
+        return hash_cost(hashed) != self.rounds
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,143 @@
+"""Development/test query auditing: N+1 detection, query budgets, slow-query log
+
+With auditing on, every statement a request issues is recorded (through
+the cursors metrics.py already wraps). When the request finishes, statement
+shapes repeated `repeat_threshold` or more times are reported as a likely
+N+1, and routes declared with @query_budget(n) are checked against their
+budget. In "strict" mode - meant for test runs - the query that takes a
+route over its budget raises QueryBudgetExceeded, so the request fails.
+
+Slow queries are logged in every mode, including "off", with parameter
+values replaced by their types. Findings are written as JSON lines to the
+"query_audit" logger: stderr, or the file QUERY_LOG_PATH names.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+AUDIT_MODES = ("off", "warn", "strict")
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+_ROW_LIST = re.compile(r"\(%s, \.\.\.\)(?:\s*,\s*\(%s, \.\.\.\))+")
+
+
+class QueryBudgetExceeded(Exception):
+    """A route ran more queries than its @query_budget allows (strict mode only)"""
+
+
+def query_budget(max_queries):
+    """Declare the most queries one request to the decorated route may run
+
+    Put it below the @app.get/@app.post decorator.
+    """
+    def decorate(endpoint):
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorate
+
+
+def statement_shape(sql):
+    """SQL with literals and placeholder lists collapsed, so repeats compare equal
+
+    "WHERE id IN (%s, %s, %s)" and "... IN (%s, %s)" share one shape, as do
+    multi-row VALUES lists of any length.
+    """
+    shape = _WHITESPACE.sub(" ", sql).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("%s, ...", shape)
+    return _ROW_LIST.sub("(%s, ...), ...", shape)
+
+
+def redact(params):
+    """Parameter types instead of values, e.g. ["int", "str", null]
+
+    executemany() rows are summarised as the first row's types and a count.
+    """
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: redact_value(value) for key, value in params.items()}
+    params = list(params)
+    if params and isinstance(params[0], (list, tuple, dict)):
+        return {"rows": len(params), "first": redact(params[0])}
+    return [redact_value(value) for value in params]
+
+
+def redact_value(value):
+    return None if value is None else type(value).__name__
+
+
+def route_budget(scope):
+    endpoint = getattr(scope.get("route"), "endpoint", None)
+    return getattr(endpoint, "query_budget", None)
+
+
+class QueryAuditor:
+    """Checks requests' statements; see the module docstring"""
+
+    def __init__(self, mode="off", slow_query_ms=200, repeat_threshold=3, log_path=None):
+        if mode not in AUDIT_MODES:
+            raise ValueError(f"Query audit mode must be one of {', '.join(AUDIT_MODES)}")
+        self.mode = mode
+        self.enabled = mode != "off"
+        self.strict = mode == "strict"
+        self.slow_query_seconds = slow_query_ms / 1000 if slow_query_ms > 0 else float("inf")
+        self.repeat_threshold = repeat_threshold
+        self.logger = logging.getLogger("query_audit")
+        if log_path:
+            self.logger.addHandler(logging.FileHandler(log_path))
+            self.logger.propagate = False
+
+    def _log(self, kind, **fields):
+        self.logger.warning(json.dumps({"kind": kind, "at": time.time(), **fields}, default=str))
+
+    def on_query(self, stats, statement, seconds, ok=True):
+        """Called by the timed cursors after every execute() / executemany()
+
+        `statement` is the cursor call's arguments: (sql,) or (sql, params).
+        `stats` is the current request's RequestStats, or None outside a request.
+        A statement that failed (`ok` false) still counts, but never raises
+        QueryBudgetExceeded, so the database error reaches the handler.
+        """
+        sql = statement[0] if statement else ""
+        if not isinstance(sql, str):
+            sql = sql.decode(errors="replace")
+        shape = None
+        if stats is not None and stats.statements is not None:
+            shape = statement_shape(sql)
+            stats.statements.append(shape)
+            if self.strict and ok:
+                budget = route_budget(stats.scope)
+                if budget is not None and stats.queries > budget:
+                    raise QueryBudgetExceeded(
+                        f"{stats.scope.get('method')} {getattr(stats.scope.get('route'), 'path', '?')} "
+                        f"ran {stats.queries} queries, over its budget of {budget}"
+                    )
+
+        if seconds >= self.slow_query_seconds:
+            self._log(
+                "slow_query",
+                ms=round(seconds * 1000, 3),
+                statement=shape or statement_shape(sql),
+                params=redact(statement[1]) if len(statement) > 1 else None,
+                route=getattr(stats.scope.get("route"), "path", None) if stats is not None else None,
+            )
+
+    def finish_request(self, method, route, stats):
+        """Report repeated statement shapes and budget overruns for a finished request"""
+        repeated = {
+            shape: count for shape, count in Counter(stats.statements).items()
+            if count >= self.repeat_threshold
+        }
+        if repeated:
+            self._log("n_plus_one", method=method, route=route, queries=stats.queries, repeated=repeated)
+
+        budget = route_budget(stats.scope)
+        if budget is not None and stats.queries > budget:
+            self._log("over_budget", method=method, route=route, queries=stats.queries, budget=budget)
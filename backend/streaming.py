@@ -0,0 +1,36 @@
+"""Incremental JSON encoding for large result sets"""
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+STREAM_CHUNK_SIZE = 1000
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def iter_json_array(cursor, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield a JSON array of the cursor's rows, `chunk_size` rows at a time
+
+    Only one chunk of rows is held in memory, so with an unbuffered cursor the
+    peak memory stays flat however many rows the query returns.
+    """
+    yield "["
+    first = True
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        encoded = ",".join(json.dumps(row, default=_json_default, separators=(",", ":")) for row in rows)
+        yield encoded if first else "," + encoded
+        first = False
+    yield "]"
@@ -0,0 +1,196 @@
+"""Background Google Calendar sync jobs
+
+Syncs run on a small pool of worker threads instead of inside request
+handlers. A user has at most one sync queued or running at a time, and
+every Google API call goes through a global and a per-user rate limiter.
+"""
+import itertools
+import queue
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+
+
+class QueueFull(Exception):
+    """Raised when the sync queue has no room for another job"""
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` calls per second in bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Take the token even when it isn't there yet, so waiters queue up in order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class SyncJobQueue:
+    """Bounded worker pool that runs `sync_fn(user_id, throttle)` jobs
+
+    `throttle` must be called before each Google API request; it blocks until
+    both the global and the user's rate limiter allow the call.
+    """
+
+    def __init__(self, sync_fn, workers=4, max_queued=100, global_rate=10.0,
+                 user_rate=2.0, history=1000):
+        self.sync_fn = sync_fn
+        self.workers = workers
+        self.user_rate = user_rate
+        self.history = history
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._global_limiter = RateLimiter(global_rate, burst=max(1, int(global_rate)))
+        self._user_limiters = OrderedDict()
+        self._jobs = OrderedDict()  # job id -> job, oldest first
+        self._active_by_user = {}
+        self._latest_by_user = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._stopping = threading.Event()
+
+    def start(self):
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"google-sync-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, user_id, reason="manual"):
+        """Queue a sync for the user, or return the one already queued or running"""
+        with self._lock:
+            active_id = self._active_by_user.get(user_id)
+            if active_id is not None:
+                return dict(self._jobs[active_id])
+
+            job = {
+                "id": next(self._ids),
+                "user_id": user_id,
+                "reason": reason,
+                "status": "queued",
+                "created_at": datetime.utcnow(),
+                "started_at": None,
+                "finished_at": None,
+                "error": None,
+            }
+            try:
+                self._queue.put_nowait(job["id"])
+            except queue.Full:
+                raise QueueFull("Too many Google Calendar syncs queued")
+
+            self._jobs[job["id"]] = job
+            self._active_by_user[user_id] = job["id"]
+            self._latest_by_user[user_id] = job["id"]
+            self._prune()
+            return dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def latest_for_user(self, user_id):
+        with self._lock:
+            job = self._jobs.get(self._latest_by_user.get(user_id))
+            return dict(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            statuses = [job["status"] for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "succeeded", "failed")}
+
+    def schedule_periodic(self, list_user_ids, interval):
+        """Re-sync every user from `list_user_ids()` once per `interval` seconds
+
+        Submissions are spread evenly over the interval instead of all at once.
+        """
+        def run():
+            while not self._stopping.is_set():
+                try:
+                    user_ids = list_user_ids()
+                except Exception:
+                    traceback.print_exc()
+                    user_ids = []
+                spacing = interval / max(len(user_ids), 1)
+                for user_id in user_ids:
+                    if self._stopping.wait(spacing):
+                        return
+                    try:
+                        self.submit(user_id, reason="scheduled")
+                    except QueueFull:
+                        pass
+                if not user_ids and self._stopping.wait(interval):
+                    return
+
+        thread = threading.Thread(target=run, name="google-sync-scheduler", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _user_limiter(self, user_id):
+        with self._lock:
+            limiter = self._user_limiters.pop(user_id, None) or RateLimiter(self.user_rate)
+            self._user_limiters[user_id] = limiter
+            while len(self._user_limiters) > self.history:
+                self._user_limiters.popitem(last=False)
+            return limiter
+
+    def _prune(self):
+        # Forget the oldest finished jobs once the history is full
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.history:
+                break
+            if self._jobs[job_id]["status"] in ("succeeded", "failed"):
+                del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            with self._lock:
+                job = self._jobs[job_id]
+                job["status"] = "running"
+                job["started_at"] = datetime.utcnow()
+            user_limiter = self._user_limiter(job["user_id"])
+
+            def throttle():
+                self._global_limiter.acquire()
+                user_limiter.acquire()
+
+            try:
+                self.sync_fn(job["user_id"], throttle)
+                status, error = "succeeded", None
+            except Exception as e:
+                traceback.print_exc()
+                status, error = "failed", str(e)
+
+            with self._lock:
+                job["status"] = status
+                job["error"] = error
+                job["finished_at"] = datetime.utcnow()
+                self._active_by_user.pop(job["user_id"], None)
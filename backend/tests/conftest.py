@@ -0,0 +1,47 @@
+import os
+import sys
+from datetime import timedelta
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+
+# Long enough for the JWT library not to warn on every token
+os.environ.setdefault("SECRET_KEY", "test-secret-key-of-at-least-32-bytes")
+# A route going over its @query_budget fails the request, and so the test
+os.environ.setdefault("QUERY_AUDIT", "strict")
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Empty SQLite stand-in (benchmarks/standin_db.py) that main's handlers use"""
+    import main
+    import standin_db
+
+    database = standin_db.StandInDatabase(metrics=main.metrics)
+    monkeypatch.setattr(main, "get_db_connection", lambda: database)
+    monkeypatch.setattr(main, "get_async_db_cursor", database.async_cursor)
+    # Fresh caches for the test, the originals put back afterwards
+    for name in ("membership_cache", "availability_cache", "busy_index"):
+        monkeypatch.setattr(main, name, getattr(main, name))
+    standin_db.reset_caches(main)
+    return database
+
+
+@pytest.fixture
+def client(db):
+    """TestClient without the lifespan, so no MySQL pools or sync workers start"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    return TestClient(main.app)
+
+
+def auth(user_id):
+    import main
+
+    token = main.create_access_token({"user_id": user_id, "email": f"user{user_id}@example.com"}, timedelta(days=1))
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,84 @@
+"""Cached availability is dropped by every write that changes a group's calendar"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from conftest import auth
+from test_google_sync import FakeCalendar
+
+TOMORROW = datetime.now().date() + timedelta(days=1)
+BODY = {"start_time": "08:00", "end_time": "12:00", "days_of_week": [(TOMORROW.weekday() + 1) % 7], "weeks_ahead": 1}
+
+
+@pytest.fixture
+def group(db):
+    db.conn.executemany(
+        "INSERT INTO users (id, username, email, password) VALUES (?, ?, ?, 'x')",
+        [(uid, f"user{uid}", f"user{uid}@example.com") for uid in (1, 2)],
+    )
+    db.conn.execute("INSERT INTO group_list (id, name, join_key, creator_id) VALUES (1, 'g', 'K1', 1)")
+    db.conn.executemany("INSERT INTO group_members (group_id, user_id, is_admin) VALUES (1, ?, ?)", [(1, 1), (2, 0)])
+
+
+def available(client):
+    response = client.post("/groups/1/availability", json=BODY, headers=auth(1))
+    assert response.status_code == 200
+    return response.json()[TOMORROW.isoformat()]
+
+
+def cached(client):
+    """Ask twice and check the second answer came from the cache"""
+    first = available(client)
+    hits = main.availability_cache.stats()["hits"]
+    assert available(client) == first
+    assert main.availability_cache.stats()["hits"] == hits + 1
+    return first
+
+
+def at(hour):
+    return datetime.combine(TOMORROW, datetime.min.time()) + timedelta(hours=hour)
+
+
+def test_create_event(group, client):
+    assert cached(client) == 2
+
+    event = {"title": "Busy", "start": at(9).isoformat(), "end_time": at(10).isoformat(),
+             "color": "#1a73e8", "user_id": 2}
+    assert client.post("/events", json=event, headers=auth(2)).status_code == 200
+
+    assert cached(client) == 1
+
+
+def test_google_sync(db, group, client, monkeypatch):
+    calendar = FakeCalendar()
+    calendar.put("g1", "Busy", start=at(9).isoformat() + "Z", end=at(10).isoformat() + "Z")
+    db.conn.execute("UPDATE users SET google_access_token = 'token', google_refresh_token = 'refresh' WHERE id = 2")
+    credentials = SimpleNamespace(token="token")
+    monkeypatch.setattr(main.calendar_clients, "get", lambda *args: (calendar, credentials))
+    assert cached(client) == 2
+
+    main.sync_google_calendar_events(2)
+
+    assert cached(client) == 1
+
+
+def test_kick(group, client):
+    assert cached(client) == 2
+
+    response = client.post("/groups/admin-action", json={"group_id": 1, "user_id": 2, "action": "kick"}, headers=auth(1))
+    assert response.status_code == 200
+
+    assert cached(client) == 1
+
+
+def test_write_from_another_process(db, group, client):
+    assert cached(client) == 2
+
+    # What another worker's create_event commits
+    db.conn.execute("INSERT INTO events (title, start, end_time, user_id) VALUES ('Busy', ?, ?, 2)", (at(9), at(10)))
+    db.conn.execute("UPDATE users SET events_version = events_version + 1 WHERE id = 2")
+    db.conn.execute("UPDATE group_list SET calendar_version = calendar_version + 1 WHERE id = 1")
+
+    assert cached(client) == 1
@@ -0,0 +1,92 @@
+"""best_meeting_slots against a brute-force scan of the 15-minute grid"""
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from availability import best_meeting_slots, daily_windows, requested_dates
+
+STEP = timedelta(minutes=15)
+
+
+def random_group(rng, n_members, events_per_day, days):
+    members = list(range(1, n_members + 1))
+    dates = requested_dates(list(range(7)), 1, date(2026, 1, 5))[:days]
+    events = []
+    for member_id in members:
+        for d in dates:
+            for _ in range(events_per_day):
+                start = datetime.combine(d, datetime.min.time()) + STEP * rng.randrange(24, 80)
+                events.append((member_id, start, start + STEP * rng.randrange(0, 9)))
+    events.sort(key=lambda e: e[1])
+    return members, dates, events
+
+
+def conflicts(event_start, event_end, start, end):
+    """The shared rule: overlap, or a zero-length event strictly inside"""
+    if event_start == event_end:
+        return start < event_start < end
+    return event_start < end and event_end > start
+
+
+def brute_force(events, members, windows, duration, limit):
+    """Every grid start where an attendee's free time begins, best first"""
+    def busy(member_id, start, end):
+        return any(u == member_id and conflicts(s, e, start, end) for u, s, e in events)
+
+    def point_at(member_id, t):
+        return any(u == member_id and s == e == t for u, s, e in events)
+
+    candidates = []
+    for _, win_start, win_end in windows:
+        t = win_start
+        while t + duration <= win_end:
+            free = [m for m in members if not busy(m, t, t + duration)]
+            if free and (t == win_start or any(busy(m, t - STEP, t) or point_at(m, t) for m in free)):
+                candidates.append((-len(free), t, free))
+            t += STEP
+    candidates.sort(key=lambda c: c[:2])
+    return [(t, free) for _, t, free in candidates[:limit]]
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    members, dates, events = random_group(rng, rng.randint(2, 12), rng.randint(1, 6), rng.randint(1, 3))
+    windows = daily_windows(dates, "08:00", "18:00")
+    duration = STEP * rng.randint(1, 8)
+    limit = rng.randint(1, 8)
+
+    slots = best_meeting_slots(events, members, windows, duration, limit)
+    expected = brute_force(events, members, windows, duration, limit)
+
+    assert [(s["start"], s["member_ids"]) for s in slots] == expected
+    for slot in slots:
+        assert slot["available_count"] == len(slot["member_ids"])
+        assert slot["end"] - slot["start"] >= duration
+        for member_id in slot["member_ids"]:
+            assert not any(
+                u == member_id and conflicts(s, e, slot["start"], slot["end"])
+                for u, s, e in events
+            )
+
+
+def test_ranks_subsets_of_free_members():
+    d = date(2026, 1, 5)
+    at = lambda hour: datetime.combine(d, datetime.min.time()) + timedelta(hours=hour)  # noqa: E731
+    windows = daily_windows([d], "09:00", "17:00")
+    # Nobody is free all day together: 1 and 2 share 9-11, 2 and 3 share 13-15
+    events = [
+        (1, at(11), at(17)),
+        (2, at(11), at(13)),
+        (2, at(15), at(17)),
+        (3, at(9), at(13)),
+        (3, at(16), at(17)),
+    ]
+
+    slots = best_meeting_slots(events, [1, 2, 3], windows, timedelta(hours=2), 3)
+
+    assert [(s["start"], s["end"], s["member_ids"]) for s in slots] == [
+        (at(9), at(11), [1, 2]),
+        (at(13), at(15), [2, 3]),
+    ]
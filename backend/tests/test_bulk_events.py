@@ -0,0 +1,33 @@
+"""POST /events/bulk only writes to the caller's own calendar"""
+from conftest import auth
+
+
+def event(user_id, title="Lecture"):
+    return {"title": title, "start": "2026-03-02T09:00:00", "end_time": "2026-03-02T10:00:00",
+            "color": "#1a73e8", "user_id": user_id}
+
+
+def count_events(db):
+    return db.conn.execute("SELECT COUNT(*) AS n FROM events").fetchone()["n"]
+
+
+def test_requires_authentication(db, client):
+    response = client.post("/events/bulk", json=[event(1)])
+
+    assert response.status_code == 401
+    assert count_events(db) == 0
+
+
+def test_rejects_events_for_other_users(db, client):
+    response = client.post("/events/bulk", json=[event(1), event(2)], headers=auth(1))
+
+    assert response.status_code == 403
+    assert count_events(db) == 0
+
+
+def test_creates_own_events(db, client):
+    response = client.post("/events/bulk", json=[event(1, "a"), event(1, "b")], headers=auth(1))
+
+    assert response.status_code == 200
+    assert [e["title"] for e in response.json()] == ["a", "b"]
+    assert count_events(db) == 2
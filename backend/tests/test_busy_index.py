@@ -0,0 +1,82 @@
+"""BusyIndex entries are only served at the events_version they were built from"""
+from datetime import datetime
+
+from busy_index import BusyIndex
+
+DAY = datetime(2026, 3, 2)
+
+
+def row(user_id, start_hour, end_hour):
+    return {"user_id": user_id, "start": DAY.replace(hour=start_hour), "end_time": DAY.replace(hour=end_hour)}
+
+
+def busy_hours(index, entries):
+    return [(user_id, start.hour, end.hour) for user_id, start, end in
+            index.group_intervals(entries, DAY, DAY.replace(hour=23))]
+
+
+def load(index, versions, rows):
+    entries, to_load = index.begin_load(versions)
+    index.finish_load(entries, to_load, rows)
+    return entries
+
+
+def test_loaded_user_is_reused_at_the_same_version():
+    index = BusyIndex()
+    load(index, {1: 3}, [row(1, 9, 10)])
+
+    entries, to_load = index.begin_load({1: 3})
+
+    assert to_load == {}
+    assert busy_hours(index, entries) == [(1, 9, 10)]
+
+
+def test_write_between_begin_and_finish_load_is_not_served():
+    index = BusyIndex()
+    entries, to_load = index.begin_load({1: 0})
+    # Another request inserts an event and commits version 1 while the rows are read
+    index.add_events({1: [(DAY.replace(hour=11), DAY.replace(hour=12))]}, {1: 1})
+    index.finish_load(entries, to_load, [row(1, 9, 10)])
+
+    # That request still answers from what it read...
+    assert busy_hours(index, entries) == [(1, 9, 10)]
+    # ...but whoever reads version 1 next loads the user again
+    entries, to_load = index.begin_load({1: 1})
+    assert to_load == {1: 1}
+    index.finish_load(entries, to_load, [row(1, 9, 10), row(1, 11, 12)])
+    assert busy_hours(index, entries) == [(1, 9, 10), (1, 11, 12)]
+
+
+def test_write_from_another_process_reloads_the_user():
+    index = BusyIndex()
+    load(index, {1: 0}, [row(1, 9, 10)])
+
+    entries, to_load = index.begin_load({1: 1})
+
+    assert to_load == {1: 1}
+
+
+def test_insert_merges_in_place_only_after_the_indexed_version():
+    index = BusyIndex()
+    load(index, {1: 0, 2: 0}, [row(1, 9, 10), row(2, 9, 10)])
+    spans = [(DAY.replace(hour=10), DAY.replace(hour=12))]
+
+    # User 2 was also changed elsewhere (version 1), so this insert made it version 2
+    index.add_events({1: spans, 2: spans}, {1: 1, 2: 2})
+
+    entries, to_load = index.begin_load({1: 1, 2: 2})
+    assert to_load == {2: 2}
+    assert busy_hours(index, entries) == [(1, 9, 12)]
+
+
+def test_slow_load_does_not_replace_a_newer_entry():
+    index = BusyIndex()
+    stale_entries, stale_to_load = index.begin_load({1: 0})
+    load(index, {1: 1}, [row(1, 9, 10), row(1, 11, 12)])
+
+    index.finish_load(stale_entries, stale_to_load, [row(1, 9, 10)])
+
+    entries, to_load = index.begin_load({1: 1})
+    assert to_load == {}
+    assert busy_hours(index, entries) == [(1, 9, 10), (1, 11, 12)]
+
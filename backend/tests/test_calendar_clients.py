@@ -0,0 +1,46 @@
+"""CalendarClientCache reuses a user's client until the refresh token changes"""
+import pytest
+
+from google_sync import CalendarClientCache
+
+
+@pytest.fixture
+def clients():
+    return CalendarClientCache("client-id", "client-secret", max_size=2)
+
+
+def test_same_refresh_token_reuses_the_client(clients):
+    service, credentials = clients.get(1, "access", "refresh")
+
+    assert clients.get(1, "newer-access", "refresh") == (service, credentials)
+
+
+def test_new_refresh_token_rebuilds_the_client(clients):
+    service, credentials = clients.get(1, "access", "refresh")
+
+    new_service, new_credentials = clients.get(1, "access-2", "refresh-2")
+
+    assert new_service is not service
+    assert new_credentials.refresh_token == "refresh-2"
+    assert new_credentials.token == "access-2"
+    assert clients.get(1, "access-2", "refresh-2") == (new_service, new_credentials)
+
+
+def test_invalidate_and_ttl_rebuild_the_client(clients):
+    service, _ = clients.get(1, "access", "refresh")
+    clients.invalidate(1)
+    rebuilt, _ = clients.get(1, "access", "refresh")
+    assert rebuilt is not service
+
+    clients.ttl = 0
+    assert clients.get(1, "access", "refresh")[0] is not rebuilt
+
+
+def test_least_recently_used_client_is_evicted(clients):
+    first, _ = clients.get(1, "access", "refresh")
+    second, _ = clients.get(2, "access", "refresh")
+    clients.get(1, "access", "refresh")
+    clients.get(3, "access", "refresh")
+
+    assert clients.get(1, "access", "refresh")[0] is first
+    assert clients.get(2, "access", "refresh")[0] is not second
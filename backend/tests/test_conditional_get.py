@@ -0,0 +1,81 @@
+"""ETags follow the version columns in the database, not per-process state"""
+from conftest import auth
+
+
+def add_user(db, user_id):
+    db.conn.execute(
+        "INSERT INTO users (id, username, email, password) VALUES (?, ?, ?, 'x')",
+        (user_id, f"user{user_id}", f"user{user_id}@example.com"),
+    )
+
+
+def add_group(db, group_id, member_ids):
+    db.conn.execute(
+        "INSERT INTO group_list (id, name, join_key, creator_id) VALUES (?, 'g', ?, ?)",
+        (group_id, f"K{group_id}", member_ids[0]),
+    )
+    for user_id in member_ids:
+        db.conn.execute("INSERT INTO group_members (group_id, user_id) VALUES (?, ?)", (group_id, user_id))
+
+
+def event(user_id, title):
+    return {"title": title, "start": "2026-03-02T09:00:00", "end_time": "2026-03-02T10:00:00",
+            "color": "#1a73e8", "user_id": user_id}
+
+
+def revalidate(client, url, etag, user_id):
+    return client.get(url, headers={**auth(user_id), "If-None-Match": etag, "Accept-Encoding": "identity"})
+
+
+def titles(response):
+    return sorted(e["title"] for e in response.json())
+
+
+def test_write_then_conditional_get_returns_new_body(db, client):
+    add_user(db, 1)
+    add_user(db, 2)
+    add_group(db, 1, [1, 2])
+
+    first = client.get("/events", headers=auth(1))
+    group_first = client.get("/groups/1/events", headers=auth(2))
+    assert first.status_code == group_first.status_code == 200
+    assert revalidate(client, "/events", first.headers["etag"], 1).status_code == 304
+
+    assert client.post("/events", json=event(1, "Lecture"), headers=auth(1)).status_code == 200
+
+    after = revalidate(client, "/events", first.headers["etag"], 1)
+    assert after.status_code == 200
+    assert titles(after) == ["Lecture"]
+    group_after = revalidate(client, "/groups/1/events", group_first.headers["etag"], 2)
+    assert group_after.status_code == 200
+    assert titles(group_after) == ["Lecture"]
+
+
+def test_write_from_another_process_is_seen(db, client):
+    add_user(db, 1)
+    add_group(db, 1, [1])
+    first = client.get("/events", headers=auth(1))
+    groups_first = client.get("/groups", headers=auth(1))
+
+    # What another worker's create_event and rename commit, bypassing this process entirely
+    db.conn.execute("INSERT INTO events (title, start, end_time, user_id) VALUES ('Elsewhere', '2026-03-02 09:00:00', NULL, 1)")
+    db.conn.execute("UPDATE users SET events_version = events_version + 1 WHERE id = 1")
+    db.conn.execute("UPDATE group_list SET name = 'renamed', info_version = info_version + 1 WHERE id = 1")
+
+    after = revalidate(client, "/events", first.headers["etag"], 1)
+    assert after.status_code == 200
+    assert titles(after) == ["Elsewhere"]
+    groups_after = revalidate(client, "/groups", groups_first.headers["etag"], 1)
+    assert groups_after.status_code == 200
+    assert groups_after.json()[0]["group_name"] == "renamed"
+
+
+def test_etag_survives_a_restart(db, client):
+    import main
+    import standin_db
+
+    add_user(db, 1)
+    first = client.get("/events", headers=auth(1))
+    # A fresh process only has the database to go on, and must agree with the old one
+    standin_db.reset_caches(main)
+    assert revalidate(client, "/events", first.headers["etag"], 1).status_code == 304
@@ -0,0 +1,56 @@
+"""ConnectionPool hand-back of connections left in a bad state"""
+import pytest
+from mysql.connector import errors as mysql_errors
+
+from db import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """Refuses to roll back over unread rows, like mysql-connector"""
+
+    def __init__(self, unread_result=False, in_transaction=False):
+        self.unread_result = unread_result
+        self.in_transaction = in_transaction
+        self.closed = False
+
+    def consume_results(self):
+        self.unread_result = False
+
+    def rollback(self):
+        if self.unread_result:
+            raise mysql_errors.InternalError("Unread result found")
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+def pool_of(conn):
+    pool = ConnectionPool(size=1, timeout=0.05)
+    pool._connect = lambda: conn
+    return pool
+
+
+def test_release_reads_off_unread_rows():
+    conn = FakeConnection(unread_result=True, in_transaction=True)
+    pool = pool_of(conn)
+
+    pool.get_connection().close()
+
+    assert not conn.unread_result and not conn.in_transaction
+    assert pool.get_connection()._conn is conn
+
+
+def test_failed_cleanup_discards_but_frees_the_slot():
+    conn = FakeConnection(in_transaction=True)
+    conn.rollback = lambda: (_ for _ in ()).throw(mysql_errors.OperationalError("gone"))
+    pool = pool_of(conn)
+
+    pool.get_connection().close()
+
+    assert conn.closed
+    assert pool.stats()["in_use"] == 0
+    pool._connect = lambda: FakeConnection()
+    pool.get_connection()
+    with pytest.raises(PoolTimeout):
+        pool.get_connection()
@@ -0,0 +1,32 @@
+"""Connection hand-back when a group event stream is abandoned"""
+from mysql.connector import errors as mysql_errors
+
+import main
+
+
+class AbandonedCursor:
+    def close(self):
+        raise mysql_errors.InternalError("Unread result found")
+
+
+class Connection:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_close_stream_returns_connection_when_cursor_close_fails():
+    db = Connection()
+
+    main.close_stream(AbandonedCursor(), db)
+
+    assert db.closed
+
+
+def test_close_stream_without_cursor():
+    db = Connection()
+
+    main.close_stream(None, db)
+
+    assert db.closed
@@ -0,0 +1,40 @@
+"""from/to windows on the event list endpoints"""
+from datetime import datetime
+
+from conftest import auth
+
+
+def add_user(db, user_id):
+    db.conn.execute(
+        "INSERT INTO users (id, username, email, password) VALUES (?, ?, ?, 'x')",
+        (user_id, f"user{user_id}", f"user{user_id}@example.com"),
+    )
+
+
+def add_event(db, user_id, title, start, end):
+    db.conn.execute(
+        "INSERT INTO events (title, start, end_time, user_id) VALUES (?, ?, ?, ?)",
+        (title, start, end, user_id),
+    )
+
+
+def titles(response):
+    assert response.status_code == 200
+    return sorted(event["title"] for event in response.json())
+
+
+def test_window_includes_events_of_any_length(db, client):
+    add_user(db, 1)
+    add_event(db, 1, "month", datetime(2026, 10, 1), datetime(2026, 10, 31))
+    add_event(db, 1, "inside", datetime(2026, 10, 17, 9), datetime(2026, 10, 17, 10))
+    add_event(db, 1, "overnight", datetime(2026, 10, 16, 22), datetime(2026, 10, 17, 2))
+    add_event(db, 1, "ended", datetime(2026, 10, 16, 9), datetime(2026, 10, 17))
+    add_event(db, 1, "later", datetime(2026, 10, 18), datetime(2026, 10, 18, 1))
+    add_event(db, 1, "no end", datetime(2026, 10, 17, 12), None)
+    db.conn.execute("INSERT INTO group_list (id, name, join_key, creator_id) VALUES (1, 'g', 'K1', 1)")
+    db.conn.execute("INSERT INTO group_members (group_id, user_id) VALUES (1, 1)")
+
+    window = {"from": "2026-10-17T00:00:00", "to": "2026-10-18T00:00:00"}
+    expected = ["inside", "month", "no end", "overnight"]
+    assert titles(client.get("/events", params=window, headers=auth(1))) == expected
+    assert titles(client.get("/groups/1/events", params=window, headers=auth(1))) == expected
@@ -0,0 +1,153 @@
+"""sync_calendar against a local fake of the Calendar events.list API"""
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import google_sync
+from google_sync import sync_calendar
+
+
+class FakeCalendar:
+    """In-memory primary calendar whose sync tokens index its change log
+
+    Serves service.events().list(...).execute() the way Google does: a full
+    listing skips cancelled events, an incremental one returns everything
+    changed since the token, cancellations included, and tokens in `expired`
+    answer 410 Gone.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.changes = []
+        self.expired = set()
+        self.requests = []
+
+    def put(self, event_id, summary, start="2026-03-02T09:00:00Z", end="2026-03-02T10:00:00Z"):
+        self.items[event_id] = {
+            "id": event_id, "status": "confirmed", "summary": summary,
+            "start": {"dateTime": start}, "end": {"dateTime": end},
+        }
+        self.changes.append(event_id)
+
+    def cancel(self, event_id):
+        self.items[event_id] = {"id": event_id, "status": "cancelled"}
+        self.changes.append(event_id)
+
+    # service.events()
+    def events(self):
+        return self
+
+    def list(self, calendarId, singleEvents, maxResults, pageToken=None, syncToken=None):
+        self.requests.append({"syncToken": syncToken, "pageToken": pageToken})
+        return FakeRequest(lambda: self._list(maxResults, pageToken, syncToken))
+
+    def _list(self, max_results, page_token, sync_token):
+        if sync_token in self.expired:
+            raise HttpError(httplib2.Response({"status": 410}), b'{"error": {"code": 410}}')
+        if sync_token is None:
+            items = [event for event in self.items.values() if event["status"] != "cancelled"]
+        else:
+            changed = dict.fromkeys(self.changes[int(sync_token):])
+            items = [self.items[event_id] for event_id in changed]
+
+        offset = int(page_token or 0)
+        result = {"items": items[offset:offset + max_results]}
+        if offset + max_results < len(items):
+            result["nextPageToken"] = str(offset + max_results)
+        else:
+            result["nextSyncToken"] = str(len(self.changes))
+        return result
+
+
+class FakeRequest:
+    def __init__(self, execute):
+        self.execute = execute
+
+
+@pytest.fixture
+def calendar():
+    calendar = FakeCalendar()
+    for i in range(5):
+        calendar.put(f"g{i}", f"Event {i}")
+    return calendar
+
+
+def stored(db, user_id=1):
+    rows = db.conn.execute(
+        "SELECT google_event_id, title FROM events WHERE user_id = ? ORDER BY google_event_id", (user_id,)
+    ).fetchall()
+    return {row["google_event_id"]: row["title"] for row in rows}
+
+
+def sync(db, calendar, sync_token=None, user_id=1):
+    cursor = db.cursor(dictionary=True)
+    try:
+        return sync_calendar(cursor, user_id, calendar, sync_token)
+    finally:
+        cursor.close()
+
+
+def test_full_sync_pages_through_everything(db, calendar, monkeypatch):
+    monkeypatch.setattr(google_sync, "GOOGLE_PAGE_SIZE", 2)
+
+    token, changed = sync(db, calendar)
+
+    assert changed
+    assert token == "5"
+    assert stored(db) == {f"g{i}": f"Event {i}" for i in range(5)}
+    assert [r["pageToken"] for r in calendar.requests] == [None, "2", "4"]
+
+
+def test_incremental_sync_applies_inserts_updates_and_deletes(db, calendar):
+    token, _ = sync(db, calendar)
+    calendar.put("g5", "New")
+    calendar.put("g1", "Renamed")
+    calendar.cancel("g3")
+    calendar.cancel("never-stored")
+
+    next_token, changed = sync(db, calendar, token)
+
+    assert changed
+    assert next_token == str(len(calendar.changes))
+    assert calendar.requests[-1]["syncToken"] == token
+    assert stored(db) == {"g0": "Event 0", "g1": "Renamed", "g2": "Event 2", "g4": "Event 4", "g5": "New"}
+
+
+def test_incremental_sync_without_changes(db, calendar):
+    token, _ = sync(db, calendar)
+
+    next_token, changed = sync(db, calendar, token)
+
+    assert not changed
+    assert next_token == token
+    assert len(stored(db)) == 5
+
+
+def test_repeated_change_in_one_page_keeps_the_last(db, calendar):
+    token, _ = sync(db, calendar)
+    calendar.put("g2", "First edit")
+    calendar.put("g2", "Second edit")
+
+    sync(db, calendar, token)
+
+    assert stored(db)["g2"] == "Second edit"
+
+
+def test_expired_token_falls_back_to_full_resync(db, calendar):
+    token, _ = sync(db, calendar)
+    # Changes the stored token will never hear about: a deletion and an edit
+    calendar.items.pop("g0")
+    calendar.put("g4", "Edited")
+    calendar.expired.add(token)
+    # Someone else's events are left alone
+    db.conn.execute(
+        "INSERT INTO events (title, start, user_id, google_event_id) VALUES ('Theirs', '2026-03-02 09:00:00', 2, 'g0')"
+    )
+
+    next_token, changed = sync(db, calendar, token)
+
+    assert changed
+    assert next_token == str(len(calendar.changes))
+    assert [r["syncToken"] for r in calendar.requests[-2:]] == [token, None]
+    assert stored(db) == {"g1": "Event 1", "g2": "Event 2", "g3": "Event 3", "g4": "Edited"}
+    assert stored(db, user_id=2) == {"g0": "Theirs"}
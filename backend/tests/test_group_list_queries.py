@@ -0,0 +1,46 @@
+"""GET /groups runs the same number of queries however many groups the user is in"""
+import re
+
+import pytest
+
+from conftest import auth
+
+
+def add_groups(db, n_groups, members_per_group=5):
+    """User 1 plus `n_groups` groups, each with user 1 and other members"""
+    users = range(1, n_groups * members_per_group + 2)
+    db.conn.executemany(
+        "INSERT INTO users (id, username, email, password) VALUES (?, ?, ?, 'x')",
+        [(uid, f"user{uid}", f"user{uid}@example.com") for uid in users],
+    )
+    for group_id in range(1, n_groups + 1):
+        db.conn.execute(
+            "INSERT INTO group_list (id, name, join_key, creator_id) VALUES (?, ?, ?, 1)",
+            (group_id, f"Group {group_id}", f"K{group_id}"),
+        )
+        first = 2 + (group_id - 1) * members_per_group
+        db.conn.executemany(
+            "INSERT INTO group_members (group_id, user_id, is_admin) VALUES (?, ?, ?)",
+            [(group_id, 1, True)] + [(group_id, uid, False) for uid in range(first, first + members_per_group - 1)],
+        )
+
+
+def groups_queries(client):
+    """Sum of per-request query counts recorded for GET /groups so far"""
+    text = client.get("/metrics").text
+    match = re.search(r'^http_request_db_queries_sum\{method="GET",route="/groups"\} (\S+)$', text, re.M)
+    return float(match.group(1)) if match else 0
+
+
+@pytest.mark.parametrize("n_groups", [1, 40])
+def test_query_count_does_not_grow_with_groups(db, client, n_groups):
+    add_groups(db, n_groups)
+    before = groups_queries(client)
+
+    response = client.get("/groups", headers=auth(1))
+
+    assert response.status_code == 200
+    groups = response.json()
+    assert len(groups) == n_groups
+    assert all(len(group["members"]) == 5 for group in groups)
+    assert groups_queries(client) - before == 3
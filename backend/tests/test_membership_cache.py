@@ -0,0 +1,35 @@
+"""MembershipCache fills that race an invalidation"""
+from membership import NOT_CACHED, MembershipCache
+
+
+def test_fill_after_member_invalidation_is_dropped():
+    cache = MembershipCache()
+    generation = cache.generation(1, 2)
+    # The member is kicked between the fill's read and its set()
+    cache.invalidate(1, 2)
+    cache.set(1, 2, False, generation)
+
+    assert cache.get(1, 2) is NOT_CACHED
+
+
+def test_fill_after_group_invalidation_is_dropped():
+    cache = MembershipCache()
+    generation = cache.generation(1, 2)
+    cache.invalidate(1)
+    cache.set(1, 2, None, generation)
+
+    assert cache.get(1, 2) is NOT_CACHED
+
+
+def test_fill_without_invalidation_is_kept():
+    cache = MembershipCache()
+    cache.invalidate(1, 3)
+    cache.invalidate(2)
+    generation = cache.generation(1, 2)
+    cache.set(1, 2, True, generation)
+
+    assert cache.get(1, 2) is True
+    # A later fill with a fresh generation is cached again
+    cache.invalidate(1, 2)
+    cache.set(1, 2, False, cache.generation(1, 2))
+    assert cache.get(1, 2) is False
@@ -0,0 +1,66 @@
+"""PasswordHasher process pool start method and recovery from a dead worker"""
+import asyncio
+import os
+import signal
+
+import pytest
+
+from passwords import HasherBusy, PasswordHasher, hash_cost
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=4)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_workers_are_not_forked(hasher):
+    hashed = asyncio.run(hasher.hash("secret"))
+
+    assert asyncio.run(hasher.verify("secret", hashed))
+    assert hasher._executor._mp_context.get_start_method() in ("forkserver", "spawn")
+
+
+def test_dead_worker_gives_busy_then_recovers(hasher):
+    hashed = asyncio.run(hasher.hash("secret"))
+    broken = hasher._executor
+
+    # The only worker kills itself, which breaks the pool
+    worker_pid = next(iter(broken._processes))
+    with pytest.raises(HasherBusy):
+        asyncio.run(hasher._submit(os.kill, worker_pid, signal.SIGKILL))
+
+    assert hasher._executor is None
+    assert asyncio.run(hasher.verify("secret", hashed))
+    assert hasher._executor is not broken
+
+
+@pytest.fixture
+def app_hasher(monkeypatch):
+    import main
+
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=4)
+    monkeypatch.setattr(main, "password_hasher", hasher)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_register_then_login(db, client, app_hasher):
+    response = client.post("/register", json={"username": "ada", "email": "ada@example.com", "password": "secret"})
+    assert response.status_code == 200
+
+    assert client.post("/login", json={"username_or_email": "ada", "password": "secret"}).status_code == 200
+    assert client.post("/login", json={"username_or_email": "ada@example.com", "password": "wrong"}).status_code == 401
+
+
+def test_login_upgrades_the_work_factor(db, client, app_hasher):
+    old_hasher = PasswordHasher(rounds=5, workers=1)
+    old_hash = asyncio.run(old_hasher.hash("secret"))
+    old_hasher.shutdown()
+    db.conn.execute("INSERT INTO users (id, username, email, password) VALUES (1, 'ada', 'ada@example.com', ?)", (old_hash,))
+
+    assert client.post("/login", json={"username_or_email": "ada", "password": "secret"}).status_code == 200
+
+    new_hash = db.conn.execute("SELECT password FROM users WHERE id = 1").fetchone()["password"]
+    assert hash_cost(new_hash) == 4
@@ -0,0 +1,61 @@
+"""Zero-length events block the same windows in every availability path"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from availability import (best_meeting_slots, busy_members_by_window,
+                          calculate_continuous_availability, daily_windows)
+from busy_index import BusyIndex
+
+DAY = date(2026, 1, 5)
+
+
+def at(hour, minute=0):
+    return datetime.combine(DAY, datetime.min.time()) + timedelta(hours=hour, minutes=minute)
+
+
+def through_busy_index(events):
+    """The events as the handlers get them, from the busy index"""
+    index = BusyIndex()
+    entries, to_load = index.begin_load({1: 0, 2: 0})
+    index.finish_load(entries, to_load, [{"user_id": u, "start": s, "end_time": e} for u, s, e in events])
+    return index.group_intervals(entries, at(0), at(23))
+
+
+def free_in_window(events, start, end):
+    """Is member 1 free for all of [start, end), by each path?"""
+    windows = daily_windows([DAY], start, end)
+    hours = (windows[0][2] - windows[0][1]).total_seconds() / 3600
+    slots = best_meeting_slots(events, [1], windows, windows[0][2] - windows[0][1], 1)
+    return {
+        "window": 1 not in busy_members_by_window(events, windows).get(DAY.isoformat(), ()),
+        "continuous": calculate_continuous_availability(events, [1], [DAY], start, end, hours)[DAY.isoformat()] == 1,
+        "best_slots": bool(slots and slots[0]["member_ids"] == [1]),
+    }
+
+
+@pytest.mark.parametrize("point, start, end, free", [
+    (at(10), "09:00", "11:00", False),          # strictly inside
+    (at(10, 7), "09:00", "11:00", False),       # inside, off the slot grid
+    (at(10), "10:00", "11:00", True),           # on the window's start
+    (at(10), "09:00", "10:00", True),           # on the window's end
+    (at(12), "09:00", "11:00", True),           # outside
+])
+def test_every_path_applies_the_same_rule(point, start, end, free):
+    events = through_busy_index([(1, point, None)])
+    assert events == [(1, point, point)]
+
+    assert free_in_window(events, start, end) == {"window": free, "continuous": free, "best_slots": free}
+
+
+def test_meeting_can_start_or_end_on_a_point():
+    windows = daily_windows([DAY], "09:00", "12:00")
+    events = through_busy_index([(1, at(10), None), (2, at(9), at(11))])
+
+    slots = best_meeting_slots(events, [1, 2], windows, timedelta(hours=1), 3)
+
+    assert [(s["start"], s["end"], s["member_ids"]) for s in slots] == [
+        (at(11), at(12), [1, 2]),
+        (at(9), at(10), [1]),
+        (at(10), at(12), [1]),
+    ]
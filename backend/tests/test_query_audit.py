@@ -0,0 +1,55 @@
+"""Strict query auditing fails over-budget routes without hiding database errors"""
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from conftest import auth
+from metrics import Metrics, RequestStats, TimedCursor, _request_stats
+from query_audit import QueryAuditor, QueryBudgetExceeded
+
+
+class FakeCursor:
+    def execute(self, sql, params=None):
+        if sql.startswith("BROKEN"):
+            raise sqlite3.OperationalError("syntax error")
+
+
+@pytest.fixture
+def cursor():
+    route = SimpleNamespace(path="/x", endpoint=SimpleNamespace(query_budget=1))
+    token = _request_stats.set(RequestStats({"method": "GET", "route": route}, audit=True))
+    yield TimedCursor(FakeCursor(), Metrics(QueryAuditor("strict")))
+    _request_stats.reset(token)
+
+
+def test_over_budget_statement_raises(cursor):
+    cursor.execute("SELECT 1")
+    with pytest.raises(QueryBudgetExceeded):
+        cursor.execute("SELECT 2")
+
+
+def test_failed_statement_keeps_its_own_error(cursor):
+    cursor.execute("SELECT 1")
+    with pytest.raises(sqlite3.OperationalError):
+        cursor.execute("BROKEN")
+    assert _request_stats.get().queries == 2
+
+
+@pytest.mark.parametrize("path", ["/auth/google/callback", "/auth/google/events", "/auth/google/disconnect"])
+def test_google_routes_have_budgets(path):
+    route = next(route for route in main.app.routes if getattr(route, "path", None) == path)
+    assert route.endpoint.query_budget is not None
+
+
+def test_disconnect_fits_its_budget(db, client):
+    db.conn.execute("INSERT INTO users (id, username, email, password, google_access_token) VALUES (1, 'a', 'a@example.com', 'x', 't')")
+    db.conn.execute("INSERT INTO group_list (id, name, join_key, creator_id) VALUES (1, 'g', 'K1', 1)")
+    db.conn.execute("INSERT INTO group_members (group_id, user_id) VALUES (1, 1)")
+    db.conn.execute("INSERT INTO events (title, start, user_id, google_event_id) VALUES ('e', '2026-03-02 09:00:00', 1, 'g1')")
+
+    response = client.post("/auth/google/disconnect", headers=auth(1))
+
+    assert response.status_code == 200
+    assert "Removed 1 Google events" in response.json()["message"]
@@ -0,0 +1,68 @@
+"""Compression, Vary and per-encoding ETags of json_response, through GET /events"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import auth
+from serialization import COMPRESSION_MIN_SIZE, negotiate_encoding
+
+
+@pytest.fixture
+def user(db):
+    db.conn.execute("INSERT INTO users (id, username, email, password) VALUES (1, 'user1', 'user1@example.com', 'x')")
+
+
+def add_events(db, count):
+    start = datetime(2026, 3, 2, 9)
+    db.conn.executemany(
+        "INSERT INTO events (title, start, end_time, location, user_id) VALUES (?, ?, ?, 'Library', 1)",
+        [(f"Event {i}", start + timedelta(days=i), start + timedelta(days=i, hours=1)) for i in range(count)],
+    )
+
+
+def get_events(client, encoding, **headers):
+    return client.get("/events", headers={**auth(1), "Accept-Encoding": encoding, **headers})
+
+
+def test_small_body_is_not_compressed(db, client, user):
+    add_events(db, 1)
+
+    response = get_events(client, "br, gzip")
+
+    assert len(response.content) < COMPRESSION_MIN_SIZE
+    assert "content-encoding" not in response.headers
+    assert not response.headers["etag"].endswith('-br"')
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+@pytest.mark.parametrize("accept, encoding", [("gzip, br", "br"), ("br;q=0.5, gzip", "gzip"), ("gzip", "gzip")])
+def test_large_body_is_compressed_with_its_own_etag(db, client, user, accept, encoding):
+    add_events(db, 40)
+    plain = get_events(client, "identity")
+    assert len(plain.content) >= COMPRESSION_MIN_SIZE
+
+    response = get_events(client, accept)
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.json() == plain.json()
+    assert response.headers["etag"] == plain.headers["etag"][:-1] + f'-{encoding}"'
+    assert {"Authorization", "Accept-Encoding"} <= {v.strip() for v in response.headers["vary"].split(",")}
+
+
+def test_encoded_representation_revalidates(db, client, user):
+    add_events(db, 40)
+    etag = get_events(client, "br").headers["etag"]
+
+    response = get_events(client, "br", **{"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("br;q=0, *") == "gzip"
+    assert negotiate_encoding("gzip;q=0.8, br;q=0.9") == "br"
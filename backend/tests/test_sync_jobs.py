@@ -0,0 +1,84 @@
+"""SyncJobQueue runs at most one sync per user at a time"""
+import threading
+
+import pytest
+
+from sync_worker import QueueFull, SyncJobQueue
+
+
+class BlockingSync:
+    """sync_fn that records its calls and waits until released"""
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Semaphore(0)
+        self.release = threading.Event()
+
+    def __call__(self, user_id, throttle):
+        self.calls.append(user_id)
+        self.started.release()
+        self.release.wait(5)
+
+
+@pytest.fixture
+def sync():
+    return BlockingSync()
+
+
+@pytest.fixture
+def jobs(sync):
+    jobs = SyncJobQueue(sync, workers=1, max_queued=2, global_rate=1000, user_rate=1000)
+    yield jobs
+    sync.release.set()
+    jobs.stop()
+
+
+def wait_finished(jobs, job_id):
+    for _ in range(500):
+        if jobs.get(job_id)["status"] in ("succeeded", "failed"):
+            return jobs.get(job_id)
+        threading.Event().wait(0.01)
+    raise AssertionError("sync job did not finish")
+
+
+def test_duplicate_requests_share_the_queued_job(jobs, sync):
+    first = jobs.submit(1)
+    again = jobs.submit(1, reason="scheduled")
+
+    assert again["id"] == first["id"]
+    assert again["reason"] == "manual"
+
+    jobs.start()
+    sync.release.set()
+    wait_finished(jobs, first["id"])
+    assert sync.calls == [1]
+
+
+def test_request_while_running_shares_the_running_job(jobs, sync):
+    jobs.start()
+    first = jobs.submit(1)
+    assert sync.started.acquire(timeout=5)
+
+    assert jobs.submit(1)["id"] == first["id"]
+
+    sync.release.set()
+    assert wait_finished(jobs, first["id"])["status"] == "succeeded"
+    # Once it has finished, the next request is a new sync
+    second = jobs.submit(1)
+    assert second["id"] != first["id"]
+    wait_finished(jobs, second["id"])
+    assert sync.calls == [1, 1]
+
+
+def test_other_users_are_not_coalesced(jobs):
+    assert jobs.submit(1)["id"] != jobs.submit(2)["id"]
+    assert jobs.stats()["queued"] == 2
+
+
+def test_full_queue_rejects_new_users_but_not_duplicates(jobs):
+    jobs.submit(1)
+    jobs.submit(2)
+
+    with pytest.raises(QueueFull):
+        jobs.submit(3)
+    assert jobs.submit(2)["user_id"] == 2
@@ -0,0 +1,14 @@
+"""The benchmarks' synthetic groups are reproducible"""
+from datetime import date
+
+from synthetic import generate_group
+
+
+def test_events_are_the_same_on_every_call():
+    dataset = generate_group(5, 10, 2, date(2026, 1, 5), seed=7)
+
+    first = list(dataset["events"]())
+
+    assert len(first) == 5 * 10 * 2
+    assert list(dataset["events"]()) == first
+    assert list(generate_group(5, 10, 2, date(2026, 1, 5), seed=7)["events"]()) == first
@@ -0,0 +1,117 @@
+"""Range predicates on events: index use and events that cross midnight
+
+The EXPLAIN tests need a scratch MySQL database, named by TEST_DB_NAME and
+reached with the usual DB_HOST / DB_PORT / DB_USER / DB_PASSWORD. Its tables
+are dropped and recreated from database/init.sql. Without it they are skipped.
+"""
+import os
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import main
+from availability import calculate_continuous_availability, requested_dates
+from conftest import BACKEND_DIR, auth
+
+INDEX = "idx_events_user_start_end"
+TABLES = ("group_members", "group_list", "friends", "events", "users")
+
+
+@pytest.fixture(scope="module")
+def mysql_cursor():
+    mysql = pytest.importorskip("mysql.connector")
+    if not os.getenv("TEST_DB_NAME"):
+        pytest.skip("TEST_DB_NAME is not set")
+    try:
+        conn = mysql.connect(
+            host=os.getenv("DB_HOST"), port=os.getenv("DB_PORT") or 3306,
+            user=os.getenv("DB_USER"), password=os.getenv("DB_PASSWORD"),
+            database=os.getenv("TEST_DB_NAME"), connection_timeout=5,
+        )
+    except mysql.Error as e:
+        pytest.skip(f"No MySQL test database: {e}")
+
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    for table in TABLES:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+    with open(os.path.join(BACKEND_DIR, "database", "init.sql")) as f:
+        for statement in f.read().split(";"):
+            if statement.strip():
+                cursor.execute(statement)
+
+    # Enough rows per user that a range seek beats scanning the user's events
+    rng = random.Random(0)
+    cursor.executemany(
+        "INSERT INTO users (id, username, email, password) VALUES (%s, %s, %s, 'x')",
+        [(uid, f"user{uid}", f"user{uid}@example.com") for uid in range(1, 51)],
+    )
+    events = []
+    for uid in range(1, 51):
+        for _ in range(400):
+            start = datetime(2025, 1, 1) + timedelta(minutes=15 * rng.randrange(4 * 24 * 365))
+            events.append(("e", start, start + timedelta(minutes=rng.choice([30, 60, 90])), uid))
+    cursor.executemany("INSERT INTO events (title, start, end_time, user_id) VALUES (%s, %s, %s, %s)", events)
+    conn.commit()
+    cursor.execute("ANALYZE TABLE events")
+    cursor.fetchall()
+
+    yield cursor
+    cursor.close()
+    conn.close()
+
+
+def explain(cursor, sql, params):
+    cursor.execute("EXPLAIN " + sql, params)
+    return {row["table"]: row for row in cursor.fetchall()}
+
+
+def test_event_page_query_uses_composite_index(mysql_cursor):
+    page_sql, page_params = main.event_page_clause(datetime(2025, 3, 1), datetime(2025, 4, 1), None, 500)
+    plan = explain(mysql_cursor, "SELECT e.* FROM events e WHERE e.user_id = %s" + page_sql, [7] + page_params)
+
+    assert plan["e"]["key"] == INDEX
+    assert plan["e"]["type"] == "range"
+
+
+def test_busy_index_load_uses_composite_index(mysql_cursor):
+    sql, params = main.busy_index.load_query([3, 7, 11], date(2025, 6, 1))
+    plan = explain(mysql_cursor, sql, params)
+
+    assert plan["events"]["key"] == INDEX
+
+
+def test_event_crossing_midnight_blocks_next_morning():
+    evening = datetime(2026, 1, 5, 22, 0)
+    events = [(1, evening, evening + timedelta(hours=12))]  # until 10:00 on the 6th
+    dates = [date(2026, 1, 5), date(2026, 1, 6), date(2026, 1, 7)]
+
+    result = calculate_continuous_availability(events, [1, 2], dates, "08:00", "12:00", 3)
+
+    assert result == {"2026-01-05": 2, "2026-01-06": 1, "2026-01-07": 2}
+
+
+def test_availability_endpoint_sees_overnight_event(db, client):
+    today = datetime.now().date()
+    tomorrow = today + timedelta(days=1)
+    db.conn.executemany(
+        "INSERT INTO users (id, username, email, password) VALUES (?, ?, ?, 'x')",
+        [(uid, f"user{uid}", f"user{uid}@example.com") for uid in (1, 2)],
+    )
+    db.conn.execute("INSERT INTO group_list (id, name, join_key, creator_id) VALUES (1, 'g', 'K1', 1)")
+    db.conn.executemany("INSERT INTO group_members (group_id, user_id) VALUES (1, ?)", [(1,), (2,)])
+    evening = datetime.combine(today, datetime.min.time()) + timedelta(hours=22)
+    db.conn.execute(
+        "INSERT INTO events (title, start, end_time, user_id) VALUES ('late', ?, ?, 1)",
+        (evening, evening + timedelta(hours=11)),
+    )
+
+    weekday = (tomorrow.weekday() + 1) % 7
+    assert requested_dates([weekday], 1, today) == [tomorrow]
+    body = {"start_time": "08:00", "end_time": "12:00", "days_of_week": [weekday], "weeks_ahead": 1}
+
+    response = client.post("/groups/1/availability", json=body, headers=auth(1))
+
+    assert response.json() == {tomorrow.isoformat(): 1}
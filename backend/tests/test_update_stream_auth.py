@@ -0,0 +1,80 @@
+"""Opening /updates with a short-lived ticket instead of the login token"""
+import asyncio
+
+import pytest
+
+import main
+from broker import Broker, Subscription
+from conftest import auth
+
+
+def test_broker_is_abstract():
+    with pytest.raises(TypeError):
+        Broker()
+
+
+class PublishOnlyBroker(Broker):
+    def publish(self, channels, notice):
+        pass
+
+    def subscribe(self, channels):
+        pass
+
+
+class RecordingBroker(PublishOnlyBroker):
+    def __init__(self):
+        self.calls = []
+
+    def subscribe(self, channels):
+        return Subscription(self, channels)
+
+    def follow(self, subscription, channel):
+        self.calls.append(("follow", channel))
+
+    def unfollow(self, subscription, channel):
+        self.calls.append(("unfollow", channel))
+
+    def unsubscribe(self, subscription):
+        self.calls.append(("unsubscribe",))
+
+    def stats(self):
+        return {}
+
+
+def test_broker_must_implement_the_whole_interface():
+    with pytest.raises(TypeError):
+        PublishOnlyBroker()
+
+
+def test_subscription_only_uses_the_public_interface():
+    async def run():
+        broker = RecordingBroker()
+        subscription = broker.subscribe(["user:1"])
+        subscription.add("group:2")
+        subscription.remove("group:2")
+        subscription.close()
+        return broker.calls
+
+    assert asyncio.run(run()) == [("follow", "group:2"), ("unfollow", "group:2"), ("unsubscribe",)]
+
+
+def test_ticket_is_not_a_login_token(db, client):
+    ticket = client.post("/updates/ticket", headers=auth(1)).json()["ticket"]
+
+    response = client.get("/events", headers={"Authorization": f"Bearer {ticket}"})
+
+    assert response.status_code == 401
+
+
+def test_login_token_is_not_a_ticket(db, client):
+    token = auth(1)["Authorization"].split()[1]
+
+    assert client.get("/updates", params={"ticket": token}).status_code == 401
+    assert client.post("/updates/ticket").status_code == 401
+
+
+def test_ticket_identifies_the_stream_user(db, client):
+    ticket = client.post("/updates/ticket", headers=auth(7)).json()["ticket"]
+
+    # The stream itself never ends, so check the dependency that guards it
+    assert main.get_stream_user(request=None, ticket=ticket) == 7
@@ -1,4 +1,5 @@
-import React, { createContext, useContext, useState, useEffect } from 'react';
+import React, { createContext, useContext, useState, useEffect, useRef } from 'react';
+import { getVisibleRange } from '../utils/dateHelpers';
 
 const AppContext = createContext();
 
@@ -12,13 +13,50 @@ export const useApp = () => {
 
 const API_URL = process.env.REACT_APP_API_URL || "http://localhost:8000";
 
+// Event lists are paginated: follow X-Next-Cursor until the (optionally
+// windowed) range is fully loaded. range = { from, to } as local ISO strings.
+const fetchEventPages = async (path, token, range = {}) => {
+  const params = new URLSearchParams();
+  if (range.from) params.set("from", range.from);
+  if (range.to) params.set("to", range.to);
+
+  let events = [];
+  let cursor = null;
+  do {
+    if (cursor) params.set("cursor", cursor);
+    const res = await fetch(`${API_URL}${path}?${params}`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    if (!res.ok) {
+      throw new Error(`HTTP error! status: ${res.status}`);
+    }
+    const data = await res.json();
+    if (!Array.isArray(data)) break;
+    events = events.concat(data);
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+
+  return events;
+};
+
+// Change notices pushed by GET /updates (Server-Sent Events)
+const NOTICE_TYPES = [
+  "events_created", "events_synced", "events_deleted",
+  "member_joined", "member_kicked", "member_promoted", "member_demoted",
+  "group_updated", "group_deleted", "resync",
+];
+
 export const AppProvider = ({ children }) => {
   const [groups, setGroups] = useState([]);
   const [visibleGroups, setVisibleGroups] = useState([]);
   const [showMyEvents, setShowMyEvents] = useState(true);
   const [events, setEvents] = useState([]);
+  const [lastNotice, setLastNotice] = useState(null);
+  // Range of the last refreshEvents() call, reused when a notice triggers a refresh.
+  // Calendar pages set it to their visible range; until then it is this month's.
+  const eventsRange = useRef(getVisibleRange());
 
-  // Fetch groups and events when the app loads
+  // Fetch groups when the app loads
   useEffect(() => {
     const token = localStorage.getItem("token");
     if (!token) return;
@@ -37,26 +75,7 @@ export const AppProvider = ({ children }) => {
         setVisibleGroups([]);
       });
 
-    // Fetch events
-    fetch(`${API_URL}/events`, {
-      headers: { Authorization: `Bearer ${token}` },
-    })
-      .then((res) => {
-        if (!res.ok) {
-          throw new Error(`HTTP error! status: ${res.status}`);
-        }
-        return res.json();
-      })
-      .then((data) => {
-        if (Array.isArray(data)) {
-          setEvents(data);
-        } else {
-          setEvents([]);
-        }
-      })
-      .catch((err) => {
-        setEvents([]);
-      });
+    // Events are fetched by the calendar pages, for the range they show
   }, []);
 
   const toggleGroupVisibility = (groupId) => {
@@ -87,44 +106,95 @@ export const AppProvider = ({ children }) => {
     }
   };
 
-  const refreshEvents = async () => {
+  const refreshEvents = async (range) => {
     const token = localStorage.getItem("token");
     if (!token) return;
+    if (range !== undefined) eventsRange.current = range;
 
     try {
-      const res = await fetch(`${API_URL}/events`, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
-      if (!res.ok) {
-        throw new Error(`HTTP error! status: ${res.status}`);
-      }
-      const data = await res.json();
-      if (Array.isArray(data)) {
-        setEvents(data);
-      }
+      const data = await fetchEventPages("/events", token, eventsRange.current);
+      setEvents(data);
     } catch (err) {
       // Handle error silently
     }
   };
 
-  const fetchGroupEvents = async (groupId) => {
+  const fetchGroupEvents = async (groupId, range) => {
     const token = localStorage.getItem("token");
     if (!token) return [];
 
     try {
-      const res = await fetch(`${API_URL}/groups/${groupId}/events`, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
-      if (!res.ok) {
-        throw new Error(`HTTP error! status: ${res.status}`);
-      }
-      const data = await res.json();
-      return Array.isArray(data) ? data : [];
+      return await fetchEventPages(`/groups/${groupId}/events`, token, range);
     } catch (err) {
       return [];
     }
   };
 
+  // Subscribe to pushed change notices instead of polling
+  useEffect(() => {
+    const token = localStorage.getItem("token");
+    if (!token) return;
+
+    let source = null;
+    let retry = null;
+    let stopped = false;
+    let reconnecting = false;
+    const handleNotice = (e) => setLastNotice(JSON.parse(e.data));
+
+    // EventSource can't send the Authorization header, so the stream is opened
+    // with a short-lived ticket. It may have expired by the time EventSource
+    // would retry by itself, so every reconnect fetches a new one.
+    const reconnectLater = () => {
+      reconnecting = true;
+      retry = setTimeout(connect, 5000);
+    };
+    const connect = async () => {
+      try {
+        const res = await fetch(`${API_URL}/updates/ticket`, {
+          method: "POST",
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        if (!res.ok) throw new Error(`HTTP error! status: ${res.status}`);
+        const { ticket } = await res.json();
+        if (stopped) return;
+
+        source = new EventSource(`${API_URL}/updates?ticket=${encodeURIComponent(ticket)}`);
+        NOTICE_TYPES.forEach((type) => source.addEventListener(type, handleNotice));
+        source.onopen = () => {
+          // Notices sent while disconnected are lost: refetch everything
+          if (reconnecting) setLastNotice({ type: "resync" });
+          reconnecting = false;
+        };
+        source.onerror = () => {
+          source.close();
+          reconnectLater();
+        };
+      } catch (err) {
+        reconnectLater();
+      }
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      clearTimeout(retry);
+      if (source) source.close();
+    };
+  }, []);
+
+  // Refetch only the lists a notice affects; unchanged pages come back as 304s
+  useEffect(() => {
+    if (!lastNotice) return;
+    const { type } = lastNotice;
+    if (type.startsWith("events_") || type === "resync") {
+      refreshEvents();
+    }
+    if (type.startsWith("member_") || type.startsWith("group_") || type === "resync") {
+      refreshGroups();
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [lastNotice]);
+
   const value = {
     groups,
     setGroups,
@@ -139,6 +209,7 @@ export const AppProvider = ({ children }) => {
     refreshGroups,
     refreshEvents,
     fetchGroupEvents,
+    lastNotice,
   };
 
   return <AppContext.Provider value={value}>{children}</AppContext.Provider>;
@@ -1,7 +1,9 @@
-import React, { useState } from "react";
+import React, { useState, useEffect } from "react";
+import { useApp } from "../contexts/AppContext";
 import { useEventCreation } from "./useEventCreation";
 import { useEventFiltering } from "./useEventFiltering";
 import { useGroupEvents } from "./useGroupEvents";
+import { getVisibleRange } from "../utils/dateHelpers";
 
 export const useCalendarPage = (events, addEvent, filteringOptions = {}) => {
   // Shared state
@@ -13,8 +15,19 @@ export const useCalendarPage = (events, addEvent, filteringOptions = {}) => {
   // Extract selectedGroupId from filtering options
   const { selectedGroupId, ...otherFilteringOptions } = filteringOptions;
 
+  // Only the visible part of the calendar is fetched, for personal and group views alike
+  const visibleRange = getVisibleRange(currentDate);
+  const { refreshEvents } = useApp();
+
   // Group events hook - only fetch if we have a specific group selected
-  const { groupEvents, loading: groupEventsLoading } = useGroupEvents(selectedGroupId);
+  const { groupEvents, loading: groupEventsLoading } = useGroupEvents(selectedGroupId, visibleRange);
+
+  // Personal events follow the visible range as the user navigates
+  useEffect(() => {
+    if (selectedGroupId) return;
+    refreshEvents(visibleRange);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [selectedGroupId, visibleRange.from, visibleRange.to]);
 
   // Determine which events to use based on whether we're viewing a specific group
   const eventsToFilter = selectedGroupId ? groupEvents : events;
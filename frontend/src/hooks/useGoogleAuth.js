@@ -3,6 +3,23 @@ import { useAuth } from "./useAuth";
 
 const API_URL = process.env.REACT_APP_API_URL || "http://localhost:8000";
 
+// Syncs run in the background on the server; poll until the latest one is done
+const waitForSync = async (token, attempts = 60) => {
+  for (let i = 0; i < attempts; i++) {
+    try {
+      const res = await fetch(`${API_URL}/auth/google/sync/status`, {
+        headers: { Authorization: `Bearer ${token}` },
+      });
+      const job = await res.json();
+      if (job.status !== "queued" && job.status !== "running") return job;
+    } catch (error) {
+      return null;
+    }
+    await new Promise((resolve) => setTimeout(resolve, 1000));
+  }
+  return null;
+};
+
 export const useGoogleAuth = (refreshEvents) => {
   const [isGoogleConnected, setIsGoogleConnected] = useState(false);
   const { checkAuthAndRedirect, handleAuthError } = useAuth();
@@ -42,20 +59,16 @@ export const useGoogleAuth = (refreshEvents) => {
           .then((userData) => {
             if (userData.google_calendar_connected) {
               setIsGoogleConnected(true);
-              // Refresh the main events list to include newly synced Google events
-              if (refreshEvents) refreshEvents();
             }
           });
+
+        // Refresh the main events list once the initial sync has finished
+        waitForSync(token).then(() => {
+          if (refreshEvents) refreshEvents();
+        });
       }
       // Clean up URL parameters
       window.history.replaceState({}, document.title, window.location.pathname);
-      
-      // Force a refresh of events after successful connection
-      setTimeout(() => {
-        if (refreshEvents) {
-          refreshEvents();
-        }
-      }, 1000); // Small delay to ensure backend sync is complete
     } else if (urlParams.get('error') === 'auth_failed') {
       alert('Google Calendar connection failed. Please try again.');
       // Clean up URL parameters
@@ -129,10 +142,9 @@ export const useGoogleAuth = (refreshEvents) => {
       });
       
       if (res.ok) {
-        // Refresh events after sync
-        setTimeout(() => {
-          if (refreshEvents) refreshEvents();
-        }, 1000);
+        // Refresh events once the queued sync has finished
+        await waitForSync(token);
+        if (refreshEvents) refreshEvents();
       }
     } catch (error) {
       // Handle error silently
@@ -1,10 +1,12 @@
 import { useState, useEffect } from "react";
 import { useApp } from "../contexts/AppContext";
 
-export const useGroupEvents = (selectedGroupId) => {
+// range = { from, to } limits the fetch to the visible part of the calendar
+export const useGroupEvents = (selectedGroupId, range = {}) => {
   const [groupEvents, setGroupEvents] = useState([]);
   const [loading, setLoading] = useState(false);
-  const { fetchGroupEvents } = useApp();
+  const { fetchGroupEvents, lastNotice } = useApp();
+  const { from, to } = range;
 
   useEffect(() => {
     if (!selectedGroupId) {
@@ -15,7 +17,7 @@ export const useGroupEvents = (selectedGroupId) => {
     const loadGroupEvents = async () => {
       setLoading(true);
       try {
-        const events = await fetchGroupEvents(selectedGroupId);
+        const events = await fetchGroupEvents(selectedGroupId, { from, to });
         setGroupEvents(events);
       } catch (error) {
         setGroupEvents([]);
@@ -25,16 +27,28 @@ export const useGroupEvents = (selectedGroupId) => {
     };
 
     loadGroupEvents();
-  }, [selectedGroupId, fetchGroupEvents]);
+  }, [selectedGroupId, from, to, fetchGroupEvents]);
 
-  // Removed duplicate refresh logic - the main useEffect handles all refreshing
+  // Reload when a pushed notice says this group's calendar changed
+  useEffect(() => {
+    if (!selectedGroupId || !lastNotice) return;
+    const affectsGroup =
+      lastNotice.type === "resync" ||
+      (lastNotice.type !== "group_updated" && lastNotice.group_ids.includes(selectedGroupId));
+    if (!affectsGroup) return;
+
+    fetchGroupEvents(selectedGroupId, { from, to })
+      .then(setGroupEvents)
+      .catch(() => {});
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [lastNotice]);
 
   const refreshGroupEvents = async () => {
     if (!selectedGroupId) return;
     
     setLoading(true);
     try {
-      const events = await fetchGroupEvents(selectedGroupId);
+      const events = await fetchGroupEvents(selectedGroupId, { from, to });
       setGroupEvents(events);
     } catch (error) {
       // Handle error silently
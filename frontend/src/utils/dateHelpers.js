@@ -1,4 +1,4 @@
-import { format } from "date-fns";
+import { format, startOfMonth, endOfMonth, startOfWeek, endOfWeek, addDays } from "date-fns";
 
 // Helper function to format date with ordinal numbers (1st, 2nd, 3rd, etc.)
 export const formatDateWithOrdinal = (date) => {
@@ -91,4 +91,24 @@ export const formatForAPI = (date, time = null) => {
     return new Date(`${date}T${time}`).toISOString();
   }
   return new Date(date).toISOString();
-};
\ No newline at end of file
+};
+
+// Format a date as local wall-clock time for API query parameters
+export const formatForQuery = (date) => {
+  return format(date, "yyyy-MM-dd'T'HH:mm:ss");
+};
+
+// Range of events the calendar can show: the month grid around currentDate
+// plus the list views, which look up to a year ahead of today
+export const getVisibleRange = (currentDate = new Date()) => {
+  const today = new Date();
+  today.setHours(0, 0, 0, 0);
+  const gridStart = startOfWeek(startOfMonth(currentDate));
+  const gridEnd = addDays(endOfWeek(endOfMonth(currentDate)), 1);
+  const { end: listEnd } = getDateRange('upcoming', today);
+
+  return {
+    from: formatForQuery(gridStart < today ? gridStart : today),
+    to: formatForQuery(gridEnd > listEnd ? gridEnd : listEnd)
+  };
+};